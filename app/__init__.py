@@ -2,10 +2,8 @@ from flask import Flask
 import os
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from werkzeug.middleware.proxy_fix import ProxyFix
-from .extensions import db, login_manager, mail
+from .extensions import db, login_manager, mail, contadores_cache, indice_qr, cache_usuarios, limiter
 
 # Blueprints
 from .routes.estudiantes_routes import estudiante_bp
@@ -36,6 +34,9 @@ from .models.materia import Materia
 from .models.periodo import Periodo
 from .models.competencia_materia import CompetenciaMateria
 from .models.indicador_logro import IndicadorLogro
+from .models.estadistica_plataforma import EstadisticaDiaria, EstadisticaColegio
+from .models.cambio_roster import CambioRoster, VersionRoster
+from .models.cierre_periodo import CierrePeriodo, ResultadoPeriodo
 
 migrate = Migrate()
 
@@ -57,8 +58,11 @@ def create_app():
 
     app.config.from_object("config.Config")
 
+    # Detrás del proxy de Fly/Render: remote_addr es el cliente (X-Forwarded-For),
+    # no el proxy; el límite de fallos por IP del login depende de esto
     app.wsgi_app = ProxyFix(
         app.wsgi_app,
+        x_for=1,
         x_proto=1,
         x_host=1
     )
@@ -70,15 +74,69 @@ def create_app():
     mail.init_app(app)
     CSRFProtect(app)
 
-    limiter = Limiter(
-        app=app,
-        key_func=get_remote_address,
-        default_limits=[
-            "200 per day",
-            "50 per hour"
-        ],
-        storage_uri="memory://"
+    # Cache de contadores: se invalida sola al cambiar estos modelos
+    contadores_cache.init_app(app)
+    contadores_cache.registrar_modelos(
+        Sede,
+        Jornada,
+        Docente,
+        Estudiante,
+        Permiso
     )
+    contadores_cache.registrar_modelos(
+        EstadisticaDiaria,
+        global_tambien=True
+    )
+
+    # Índice QR por colegio: se descarta al cambiar tokens o datos del estudiante
+    indice_qr.init_app(app)
+    indice_qr.registrar_modelo(Estudiante)
+
+    # Usuario de la sesión + colegio: una consulta con join y snapshot de TTL corto
+    cache_usuarios.init_app(app)
+    cache_usuarios.registrar_modelos(Usuario, Colegio)
+
+    # Versiones del roster para los escáneres sin conexión
+    from .services.sincronizacion_service import registrar_cambios_roster
+    registrar_cambios_roster()
+
+    # Eventos de portería: cola en memoria vaciada por lotes (hilo por worker)
+    from .services import porteria_service
+    porteria_service.init_app(app)
+
+    # Rollup de estadísticas del superadmin (hilo por worker + comando CLI)
+    from .services import estadisticas_service
+    estadisticas_service.init_app(app)
+
+    # Hash de contraseñas en un pool acotado de hilos (comando benchmark-hash)
+    from .services import hash_service
+    hash_service.init_app(app)
+
+    # Fallos de login por correo e IP (ventana deslizante fuera de la base)
+    from .services.intentos_service import contador_intentos
+    contador_intentos.init_app(app)
+
+    # Estado de acceso materializado de usuarios y colegios (eventos + barrido)
+    from .services import acceso_service
+    acceso_service.init_app(app)
+
+    # Boletines: benchmark del motor vectorizado (comando CLI)
+    from .services import boletin_service
+    boletin_service.init_app(app)
+
+    # Exportación de boletines en PDF al cierre de periodo (comando CLI)
+    from .services import exportacion_boletines_service
+    exportacion_boletines_service.init_app(app)
+
+    # Exportación CSV/XLSX por streaming: benchmark (comando CLI)
+    from .services import exportacion_service
+    exportacion_service.init_app(app)
+
+    # Rate limit compartido entre workers (RATELIMIT_STORAGE_URI) + benchmark
+    limiter.init_app(app)
+
+    from .services import limites_service
+    limites_service.init_app(app)
 
     # Crear tablas
     # Las tablas se crean con migraciones:
@@ -86,17 +144,26 @@ def create_app():
 
     @login_manager.user_loader
     def load_user(user_id):
-        return db.session.get(
-            Usuario,
+        return cache_usuarios.cargar(
             int(user_id)
         )
 
+    # Contexto del usuario (colegio, rol, acceso) para las plantillas
+    from .services.contexto_service import contexto_actual
+
+    @app.context_processor
+    def inyectar_contexto():
+        return {"contexto": contexto_actual()}
+
     # Blueprints
     from .routes.auth_routes import auth_bp
     from .routes.permiso_routes import permiso_bp
     from .routes.docente_routes import docente_bp
     from .routes.admin_routes import admin_bp
     from .routes.colegio_routes import colegio_bp
+    from .routes.sincronizacion_routes import sincronizacion_bp
+    from .routes.porteria_routes import porteria_bp
+    from .routes.calificaciones_routes import calificaciones_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(permiso_bp)
@@ -104,6 +171,9 @@ def create_app():
     app.register_blueprint(admin_bp)
     app.register_blueprint(colegio_bp)
     app.register_blueprint(estudiante_bp)
+    app.register_blueprint(sincronizacion_bp)
+    app.register_blueprint(porteria_bp)
+    app.register_blueprint(calificaciones_bp)
 
     app.limiter = limiter
 
@@ -1,6 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_mail import Mail
+from flask_limiter import Limiter
+
+from app.services.cache_service import ContadorCache
+from app.services.contexto_service import CacheUsuarios
+from app.services.qr_service import IndiceQR
+from app.services.limites_service import clave_usuario, SQLiteStorage  # noqa: F401 (registra "sqlite://" en limits)
 
 db = SQLAlchemy()
 
@@ -9,4 +15,22 @@ login_manager.login_view = "auth.login"
 
 mail = Mail()  # ✅ MAIL DEFINIDO AQUÍ (CLAVE)
 
+# Contadores del dashboard por colegio (ver app/services/cache_service.py)
+contadores_cache = ContadorCache()
+
+# Resolución de tokens QR en portería (ver app/services/qr_service.py)
+indice_qr = IndiceQR()
+
+# Usuario de la sesión con su colegio (ver app/services/contexto_service.py)
+cache_usuarios = CacheUsuarios()
 
+# Rate limit por usuario de la sesión (por IP si es anónimo: el personal de
+# un colegio suele salir por la misma IP); storage según RATELIMIT_STORAGE_URI
+# (ver app/services/limites_service.py)
+limiter = Limiter(
+    key_func=clave_usuario,
+    default_limits=[
+        "200 per day",
+        "50 per hour"
+    ]
+)
@@ -3,6 +3,9 @@ from flask import flash, redirect, url_for
 from flask_login import current_user
 from datetime import datetime
 
+from app.models.estado_acceso import ESTADO_EN_PRUEBA, dias_restantes
+from app.services.contexto_service import contexto_actual
+
 
 def superuser_required(f):
     """
@@ -39,23 +42,22 @@ def acceso_permitido(f):
         # -------------------------
         # Lógica normal de acceso
         # -------------------------
-        if hasattr(current_user, 'puede_acceder'):
-            puede_acceder, razon = current_user.puede_acceder()
+        # Veredicto calculado una vez por petición (ver contexto_service)
+        contexto = contexto_actual()
+
+        if not contexto.puede_acceder:
+            flash(f'Acceso restringido: {contexto.razon}. Contacta al administrador.', 'danger')
+            return redirect(url_for('auth.estado_cuenta'))
 
-            if not puede_acceder:
-                flash(f'Acceso restringido: {razon}. Contacta al administrador.', 'danger')
-                return redirect(url_for('auth.estado_cuenta'))
+        # Advertencia de prueba (fin de la prueba ya materializado en el usuario)
+        estado, vence_en = current_user.estado_acceso_actual()
 
-        # Advertencia de prueba
-        if not getattr(current_user, 'is_approved', False):
-            fecha_registro = getattr(current_user, 'fecha_registro', datetime.utcnow())
-            dias_transcurridos = (datetime.utcnow() - fecha_registro).days
-            dias_prueba = getattr(current_user, 'dias_prueba', 15)
-            dias_restantes = dias_prueba - dias_transcurridos
+        if estado == ESTADO_EN_PRUEBA:
+            restantes = dias_restantes(vence_en, datetime.utcnow())
 
-            if 0 < dias_restantes <= 3:
+            if 0 < restantes <= 3:
                 flash(
-                    f'⚠️ Tu período de prueba termina en {dias_restantes} día(s). '
+                    f'⚠️ Tu período de prueba termina en {restantes} día(s). '
                     f'Solicita aprobación al administrador.',
                     'warning'
                 )
@@ -4,7 +4,11 @@ from datetime import datetime
 
 class Alerta(db.Model):
     __tablename__ = "alertas"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Historial reciente por estudiante (ORDER BY fecha DESC LIMIT n)
+        db.Index("ix_alertas_estudiante_fecha", "estudiante_id", "fecha"),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     tipo = db.Column(db.String(50), nullable=False)
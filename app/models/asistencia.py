@@ -4,7 +4,22 @@ from datetime import datetime
 
 class Asistencia(db.Model):
     __tablename__ = "asistencias"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Historial reciente por estudiante (ORDER BY fecha DESC LIMIT n)
+        db.Index("ix_asistencias_estudiante_fecha", "estudiante_id", "fecha"),
+        # Una asistencia por estudiante, clase y día
+        db.UniqueConstraint("estudiante_id", "clase_id", "fecha", name="unica_asistencia_por_clase"),
+        # NULL no choca en un UNIQUE: la asistencia general (sin clase) necesita su propio índice
+        db.Index(
+            "unica_asistencia_general",
+            "estudiante_id",
+            "fecha",
+            unique=True,
+            postgresql_where=db.text("clase_id IS NULL"),
+            sqlite_where=db.text("clase_id IS NULL")
+        ),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     fecha = db.Column(db.Date, nullable=False)
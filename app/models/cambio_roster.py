@@ -0,0 +1,47 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class CambioRoster(db.Model):
+    """
+    Registro de cambios de estudiantes para la sincronización de escáneres.
+
+    Cada alta, baja o cambio de un dato del roster (token QR, nombre, grado,
+    grupo, sede, jornada, activo) agrega una fila con la versión del roster
+    del colegio en que se hizo (ver VersionRoster); los dispositivos guardan
+    esa versión para pedir solo lo que cambió después.
+    No lleva clave foránea: debe sobrevivir al borrado del estudiante.
+    """
+    __tablename__ = "cambios_roster"
+    __table_args__ = (
+        db.Index("ix_cambios_roster_colegio_version", "colegio_id", "version"),
+        {'extend_existing': True}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    colegio_id = db.Column(db.Integer, nullable=False)
+    estudiante_id = db.Column(db.Integer, nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    creado_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<CambioRoster {self.id} colegio={self.colegio_id} v{self.version} estudiante={self.estudiante_id}>'
+
+
+class VersionRoster(db.Model):
+    """
+    Versión actual del roster de cada colegio.
+
+    La transacción que anota cambios sube el contador (UPSERT ... RETURNING)
+    y retiene la fila hasta su commit: las versiones se hacen visibles en
+    orden y un lector nunca ve la versión N sin los cambios de versiones
+    menores, como sí podía pasar con MAX(cambios_roster.id).
+    """
+    __tablename__ = "versiones_roster"
+    __table_args__ = {'extend_existing': True}
+
+    colegio_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<VersionRoster colegio={self.colegio_id} v{self.version}>'
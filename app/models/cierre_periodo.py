@@ -0,0 +1,71 @@
+from app.extensions import db
+from datetime import datetime
+
+from app.models.evaluacion_estudiante import NivelDesempeno
+
+
+class CierrePeriodo(db.Model):
+    """
+    Cierre de un periodo para un colegio.
+
+    Mientras exista, los boletines del periodo se leen de resultados_periodo
+    (calculados una vez al cerrar) en lugar de recalcularse desde
+    evaluaciones_estudiante. Reabrir el periodo borra el cierre y sus
+    resultados.
+    """
+    __tablename__ = "cierres_periodo"
+    __table_args__ = (
+        db.UniqueConstraint("periodo_id", "colegio_id", name="unico_cierre_por_colegio"),
+        {'extend_existing': True}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    periodo_id = db.Column(db.Integer, db.ForeignKey("periodos.id"), nullable=False)
+    colegio_id = db.Column(db.Integer, db.ForeignKey("colegios.id"), nullable=False)
+    cerrado_por = db.Column(db.Integer, db.ForeignKey("usuarios.id"), nullable=True)
+    cerrado_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    total_estudiantes = db.Column(db.Integer, default=0, nullable=False)
+
+    periodo = db.relationship("Periodo", lazy=True)
+
+    def __repr__(self):
+        return f'<CierrePeriodo periodo={self.periodo_id} colegio={self.colegio_id}>'
+
+
+class ResultadoPeriodo(db.Model):
+    """
+    Nota congelada de un estudiante al cerrar el periodo.
+
+    Una fila general por estudiante (materia_id y competencia_id nulos,
+    promedio nulo si no tuvo notas), una por materia (competencia_id nulo)
+    y una por competencia. Grado y grupo son los que tenía el estudiante al
+    cerrar, para que el boletín histórico no cambie si pasa de curso.
+    """
+    __tablename__ = "resultados_periodo"
+    __table_args__ = (
+        # Boletín histórico de un grupo: WHERE periodo_id, colegio_id, grado, grupo
+        db.Index("ix_resultados_periodo_periodo_colegio_grado", "periodo_id", "colegio_id", "grado", "grupo"),
+        # Historial académico (certificados) de un estudiante
+        db.Index("ix_resultados_periodo_estudiante_periodo", "estudiante_id", "periodo_id"),
+        db.Index("ix_resultados_periodo_cierre", "cierre_id"),
+        {'extend_existing': True}
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    cierre_id = db.Column(
+        db.Integer,
+        db.ForeignKey("cierres_periodo.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    periodo_id = db.Column(db.Integer, db.ForeignKey("periodos.id"), nullable=False)
+    colegio_id = db.Column(db.Integer, db.ForeignKey("colegios.id"), nullable=False)
+    estudiante_id = db.Column(db.Integer, db.ForeignKey("estudiantes.id"), nullable=False)
+    grado = db.Column(db.String(20), nullable=True)
+    grupo = db.Column(db.String(20), nullable=True)
+    materia_id = db.Column(db.Integer, db.ForeignKey("materias.id"), nullable=True)
+    competencia_id = db.Column(db.Integer, db.ForeignKey("competencias_materia.id"), nullable=True)
+    promedio = db.Column(db.Numeric(4, 2), nullable=True)
+    nivel = db.Column(db.Enum(NivelDesempeno), nullable=True)
+
+    def __repr__(self):
+        return f'<ResultadoPeriodo {self.estudiante_id} periodo={self.periodo_id} - {self.promedio}>'
@@ -1,9 +1,16 @@
+from datetime import datetime
+
 from app.extensions import db
+from app.models.estado_acceso import calcular_estado_colegio, estado_vigente
 
 
 class Colegio(db.Model):
     __tablename__ = "colegios"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Colegios en prueba por vencer (rango sobre acceso_vence_en)
+        db.Index("ix_colegios_estado_acceso", "estado_acceso", "acceso_vence_en"),
+        {'extend_existing': True}
+    )
 
     # ========== COLUMNAS ==========
     id = db.Column(db.Integer, primary_key=True)
@@ -13,6 +20,10 @@ class Colegio(db.Model):
     en_prueba = db.Column(db.Boolean, default=True)
     fecha_expiracion = db.Column(db.DateTime, nullable=True)
 
+    # Estado de acceso materializado (lo mantiene acceso_service)
+    estado_acceso = db.Column(db.String(20), nullable=True)
+    acceso_vence_en = db.Column(db.DateTime, nullable=True)
+
     # ========== RELACIONES ==========
 
     # Usuarios
@@ -62,5 +73,14 @@ class Colegio(db.Model):
         lazy=True
     )
 
+    def estado_acceso_actual(self, ahora=None):
+        """Estado de acceso materializado. Retorna: (estado, acceso_vence_en)"""
+        ahora = ahora or datetime.utcnow()
+
+        if self.estado_acceso is None:
+            return calcular_estado_colegio(self.activo, self.en_prueba, self.fecha_expiracion, ahora)
+
+        return estado_vigente(self.estado_acceso, self.acceso_vence_en, ahora), self.acceso_vence_en
+
     def __repr__(self):
         return f'<Colegio {self.nombre}>'
\ No newline at end of file
@@ -4,7 +4,13 @@ from datetime import datetime
 
 class Docente(db.Model):
     __tablename__ = "docentes"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Listado por colegio ordenado por nombre
+        db.Index("ix_docentes_colegio_nombre", "colegio_id", "nombre", "id"),
+        # Conteos por sede
+        db.Index("ix_docentes_sede", "sede_id"),
+        {'extend_existing': True}
+    )
 
     # ========== COLUMNAS ==========
     id = db.Column(db.Integer, primary_key=True)
@@ -77,7 +83,7 @@ class Docente(db.Model):
     # Permisos
     permisos = db.relationship(
         "Permiso",
-        backref="docente",
+        back_populates="docente",
         cascade="all, delete-orphan",
         lazy=True
     )
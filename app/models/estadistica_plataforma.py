@@ -0,0 +1,59 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class EstadisticaDiaria(db.Model):
+    """
+    Rollup diario de métricas de la plataforma (panel del superadmin).
+
+    Lo mantiene app/services/estadisticas_service.py: las columnas de eventos
+    (nuevos_*) se recalculan para los días abiertos y las de estado (totales)
+    son la foto tomada en el último refresco del día.
+    """
+    __tablename__ = "estadisticas_diarias"
+    __table_args__ = {'extend_existing': True}
+
+    # ========== CLAVE ==========
+    fecha = db.Column(db.Date, primary_key=True)
+
+    # ========== EVENTOS DEL DÍA ==========
+    nuevos_usuarios = db.Column(db.Integer, nullable=False, default=0)
+    permisos_iniciados = db.Column(db.Integer, nullable=False, default=0)
+
+    # ========== FOTO DEL ESTADO (nullable en días reconstruidos) ==========
+    total_usuarios = db.Column(db.Integer, nullable=True)
+    superadmins = db.Column(db.Integer, nullable=True)
+    usuarios_aprobados = db.Column(db.Integer, nullable=True)
+    usuarios_pendientes = db.Column(db.Integer, nullable=True)
+    usuarios_activos = db.Column(db.Integer, nullable=True)
+    usuarios_bloqueados = db.Column(db.Integer, nullable=True)
+    total_colegios = db.Column(db.Integer, nullable=True)
+    total_permisos = db.Column(db.Integer, nullable=True)
+
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<EstadisticaDiaria {self.fecha}>'
+
+
+class EstadisticaColegio(db.Model):
+    """Rollup por colegio (docentes/usuarios/estudiantes) del último refresco"""
+    __tablename__ = "estadisticas_colegio"
+    __table_args__ = (
+        db.Index("ix_estadisticas_colegio_docentes", "docentes"),
+        {'extend_existing': True}
+    )
+
+    colegio_id = db.Column(
+        db.Integer,
+        db.ForeignKey("colegios.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    nombre = db.Column(db.String(150), nullable=False)
+    docentes = db.Column(db.Integer, nullable=False, default=0)
+    usuarios = db.Column(db.Integer, nullable=False, default=0)
+    estudiantes = db.Column(db.Integer, nullable=False, default=0)
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<EstadisticaColegio {self.colegio_id}>'
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+# Estado de acceso materializado en usuarios.estado_acceso y colegios.estado_acceso
+# (lo mantiene app/services/acceso_service.py)
+ESTADO_ACTIVO = "activo"
+ESTADO_EN_PRUEBA = "en_prueba"
+ESTADO_VENCIDO = "vencido"
+ESTADO_INACTIVO = "inactivo"
+
+DIAS_PRUEBA_POR_DEFECTO = 15
+
+
+def calcular_estado_usuario(is_active, rol, is_approved, fecha_expiracion,
+                            fecha_registro, dias_prueba, ahora):
+    """
+    Estado de acceso de un usuario y fecha en que vence su prueba.
+    Retorna: (estado, acceso_vence_en)
+
+    Misma regla que tenía Usuario.puede_acceder: sin fecha_expiracion, la
+    prueba dura dias_prueba días completos contados desde el registro.
+    """
+    if not is_active:
+        return ESTADO_INACTIVO, None
+
+    if rol == "superadmin" or is_approved:
+        return ESTADO_ACTIVO, None
+
+    if fecha_expiracion:
+        vence_en = fecha_expiracion
+    elif fecha_registro:
+        dias = dias_prueba if dias_prueba else DIAS_PRUEBA_POR_DEFECTO
+        vence_en = fecha_registro + timedelta(days=dias + 1)
+    else:
+        return ESTADO_VENCIDO, None
+
+    return (ESTADO_EN_PRUEBA if ahora <= vence_en else ESTADO_VENCIDO), vence_en
+
+
+def calcular_estado_colegio(activo, en_prueba, fecha_expiracion, ahora):
+    """Estado de acceso de un colegio. Retorna: (estado, acceso_vence_en)"""
+    if not activo:
+        return ESTADO_INACTIVO, None
+
+    if en_prueba and fecha_expiracion:
+        estado = ESTADO_EN_PRUEBA if ahora <= fecha_expiracion else ESTADO_VENCIDO
+        return estado, fecha_expiracion
+
+    return ESTADO_ACTIVO, None
+
+
+def estado_vigente(estado, vence_en, ahora):
+    """
+    Estado guardado, salvo una prueba que venció después del último barrido:
+    una comparación de fechas, sin volver a calcular la prueba.
+    """
+    if estado == ESTADO_EN_PRUEBA and vence_en is not None and ahora > vence_en:
+        return ESTADO_VENCIDO
+    return estado
+
+
+def dias_restantes(vence_en, ahora):
+    return (vence_en - ahora).days if vence_en is not None else None
@@ -4,7 +4,14 @@ from datetime import datetime
 
 class Estudiante(db.Model):
     __tablename__ = "estudiantes"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Listado por colegio (activos por defecto) ordenado por nombre
+        db.Index("ix_estudiantes_colegio_activo_nombre", "colegio_id", "activo", "nombre", "id"),
+        # Conteos por sede y estudiantes tutelados de un docente
+        db.Index("ix_estudiantes_sede", "sede_id"),
+        db.Index("ix_estudiantes_docente", "docente_id"),
+        {'extend_existing': True}
+    )
 
     # ========== COLUMNAS ==========
     id = db.Column(db.Integer, primary_key=True)
@@ -118,5 +125,25 @@ class Estudiante(db.Model):
         self.qr_token = secrets.token_urlsafe(32)
         return self.qr_token
 
+    def get_acudientes(self):
+        """Acudientes del estudiante en una consulta (join por la tabla intermedia)"""
+        from app.models.acudiente import Acudiente
+        from app.models.estudiante_acudiente import EstudianteAcudiente
+
+        return Acudiente.query.join(
+            EstudianteAcudiente,
+            EstudianteAcudiente.acudiente_id == Acudiente.id
+        ).filter(
+            EstudianteAcudiente.estudiante_id == self.id
+        ).order_by(Acudiente.nombre).all()
+
+    def tiene_piar_activo(self):
+        """True si el estudiante tiene un PIAR activo (EXISTS, sin cargar filas)"""
+        from app.models.piar import PIAR
+
+        return db.session.query(
+            PIAR.query.filter_by(estudiante_id=self.id, activo=True).exists()
+        ).scalar()
+
     def __repr__(self):
         return f'<Estudiante {self.nombre} - {self.grado}{self.grupo or ""}>'
\ No newline at end of file
@@ -1,9 +1,28 @@
 from app.extensions import db
+from enum import Enum as PyEnum
+
+
+class NivelDesempeno(PyEnum):
+    """Escala nacional (calcular_nivel_desempeno en la base)"""
+    BAJO = "Bajo"
+    BASICO = "Basico"
+    ALTO = "Alto"
+    SUPERIOR = "Superior"
 
 
 class EvaluacionEstudiante(db.Model):
     __tablename__ = "evaluaciones_estudiante"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Boletín de un grupo: todas las notas del periodo de sus estudiantes
+        db.Index("ix_evaluaciones_estudiante_periodo_estudiante", "periodo_id", "estudiante_id"),
+        # Una nota por estudiante, indicador y periodo (upsert de la matriz de notas)
+        db.Index(
+            "unica_evaluacion_indicador_periodo",
+            "estudiante_id", "indicador_id", "periodo_id",
+            unique=True
+        ),
+        {"extend_existing": True}
+    )
 
     id = db.Column(
         db.Integer,
@@ -53,6 +72,14 @@ class EvaluacionEstudiante(db.Model):
         nullable=True
     )
 
+    # Concurrencia optimista: sube en cada cambio de la nota
+    version = db.Column(
+        db.Integer,
+        nullable=False,
+        default=1,
+        server_default="1"
+    )
+
     # Relaciones
     estudiante = db.relationship(
         "Estudiante",
@@ -10,7 +10,13 @@ class TipoEvento(PyEnum):
 
 class IngresoColegio(db.Model):
     __tablename__ = "ingresos_colegio"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Historial reciente por estudiante (ORDER BY fecha DESC LIMIT n)
+        db.Index("ix_ingresos_colegio_estudiante_fecha", "estudiante_id", "fecha"),
+        # Un ingreso y una salida por estudiante y día
+        db.Index("unico_evento_por_dia", "estudiante_id", "fecha", "tipo_evento", unique=True),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     fecha = db.Column(db.Date, nullable=False, default=date.today)
@@ -4,6 +4,11 @@ from sqlalchemy import Time
 
 class Jornada(db.Model):
     __tablename__ = "jornadas_colegio"
+    __table_args__ = (
+        # Selectores de jornada activos por colegio y jornadas de una sede
+        db.Index("ix_jornadas_colegio_activo_nombre", "colegio_id", "activo", "nombre"),
+        db.Index("ix_jornadas_sede", "sede_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(50), nullable=False)
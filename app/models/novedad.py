@@ -17,7 +17,11 @@ class TipoGravedad(PyEnum):
 
 class Novedad(db.Model):
     __tablename__ = "novedades"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Historial reciente por estudiante (ORDER BY fecha DESC LIMIT n)
+        db.Index("ix_novedades_estudiante_fecha", "estudiante_id", "fecha"),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     tipo_novedad = db.Column(db.Enum(TipoNovedad), nullable=False)
@@ -3,7 +3,13 @@ from app.extensions import db
 
 class Permiso(db.Model):
     __tablename__ = "permisos"
-    __table_args__ = {'extend_existing': True}  # 👈 AGREGA ESTA LÍNEA
+    __table_args__ = (
+        # Listados por colegio: WHERE colegio_id = ? ORDER BY fecha_inicio DESC, id DESC
+        db.Index("ix_permisos_colegio_fecha_inicio", "colegio_id", "fecha_inicio", "id"),
+        # Permisos de un docente (detalle, API y verificación al eliminar)
+        db.Index("ix_permisos_docente_fecha_inicio", "docente_id", "fecha_inicio"),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     docente_id = db.Column(db.Integer, db.ForeignKey("docentes.id"), nullable=False)
@@ -16,6 +22,12 @@ class Permiso(db.Model):
     tipo = db.Column(db.String(100), nullable=False)
     observacion = db.Column(db.Text)
 
-    # Relaciones (opcional, si las necesitas)
-    # docente = db.relationship("Docente", backref="permisos")
-    # colegio = db.relationship("Colegio", backref="permisos")
\ No newline at end of file
+    # Relaciones
+    # Carga perezosa por defecto; los listados piden joinedload(Permiso.docente)
+    # junto con raiseload("*") para que un acceso no previsto falle en vez de
+    # lanzar un SELECT por fila
+    docente = db.relationship(
+        "Docente",
+        back_populates="permisos",
+        lazy="select"
+    )
\ No newline at end of file
@@ -1,9 +1,28 @@
+from sqlalchemy import select, func
+from sqlalchemy.orm import column_property
+
 from app.extensions import db
+from app.models.docente import Docente
+from app.models.estudiante import Estudiante
+from app.models.jornada import Jornada
+
+
+def _contar_por_sede(modelo, sede_id):
+    """Subconsulta escalar correlacionada: filas de `modelo` en la sede"""
+    return (
+        select(func.count(modelo.id))
+        .where(modelo.sede_id == sede_id)
+        .correlate_except(modelo)
+        .scalar_subquery()
+    )
 
 
 class Sede(db.Model):
     __tablename__ = "sedes"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        db.Index("ix_sedes_colegio", "colegio_id"),
+        {'extend_existing': True}
+    )
 
     # ========== COLUMNAS ==========
     id = db.Column(db.Integer, primary_key=True)
@@ -50,5 +69,24 @@ class Sede(db.Model):
         lazy=True
     )
 
+    # ========== CONTEOS ==========
+    # Diferidos: solo se calculan si la consulta usa undefer_group("conteos"),
+    # y entonces salen en el mismo SELECT de las sedes (sin cargar las filas)
+    total_docentes = column_property(
+        _contar_por_sede(Docente, id),
+        deferred=True,
+        group="conteos"
+    )
+    total_estudiantes = column_property(
+        _contar_por_sede(Estudiante, id),
+        deferred=True,
+        group="conteos"
+    )
+    total_jornadas = column_property(
+        _contar_por_sede(Jornada, id),
+        deferred=True,
+        group="conteos"
+    )
+
     def __repr__(self):
         return f'<Sede {self.nombre}>'
\ No newline at end of file
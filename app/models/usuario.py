@@ -2,9 +2,24 @@ from app.extensions import db
 from flask_login import UserMixin
 from datetime import datetime
 
+from app.models.estado_acceso import (
+    ESTADO_ACTIVO,
+    ESTADO_EN_PRUEBA,
+    ESTADO_INACTIVO,
+    calcular_estado_usuario,
+    estado_vigente,
+    dias_restantes
+)
+
 
 class Usuario(db.Model, UserMixin):
     __tablename__ = "usuarios"
+    __table_args__ = (
+        # Usuarios de un colegio (conteos del rollup y gestión por colegio)
+        db.Index("ix_usuarios_colegio", "colegio_id"),
+        # Pruebas por vencer (rango sobre acceso_vence_en dentro de un estado)
+        db.Index("ix_usuarios_estado_acceso", "estado_acceso", "acceso_vence_en"),
+    )
 
     # --------------------
     # Datos básicos
@@ -51,6 +66,11 @@ class Usuario(db.Model, UserMixin):
     # ✅ Columna física en la BD para la fecha límite
     fecha_expiracion = db.Column(db.DateTime, nullable=True)
 
+    # ✅ Estado de acceso materializado (lo mantiene acceso_service):
+    # activo / en_prueba / vencido / inactivo y fin de la prueba
+    estado_acceso = db.Column(db.String(20), nullable=True)
+    acceso_vence_en = db.Column(db.DateTime, nullable=True)
+
     # --------------------
     # Representación
     # --------------------
@@ -60,67 +80,69 @@ class Usuario(db.Model, UserMixin):
     # --------------------
     # Lógica de acceso (FUENTE ÚNICA DE VERDAD)
     # --------------------
+    def estado_acceso_actual(self, ahora=None):
+        """
+        Estado de acceso leído de las columnas materializadas.
+        Retorna: (estado, acceso_vence_en)
+
+        Solo si la fila aún no pasó por el barrido (estado_acceso vacío)
+        se calcula aquí a partir de los datos de la prueba.
+        """
+        ahora = ahora or datetime.utcnow()
+
+        if self.estado_acceso is None:
+            return calcular_estado_usuario(
+                self.is_active, self.rol, self.is_approved, self.fecha_expiracion,
+                self.fecha_registro, self.dias_prueba, ahora
+            )
+
+        return estado_vigente(self.estado_acceso, self.acceso_vence_en, ahora), self.acceso_vence_en
+
     def puede_acceder(self):
         """
         Verifica si el usuario puede acceder al sistema
         Retorna: (bool, mensaje)
         """
+        ahora = datetime.utcnow()
+        estado, vence_en = self.estado_acceso_actual(ahora)
 
         # Bloqueo manual
-        if not self.is_active:
+        if estado == ESTADO_INACTIVO:
             return False, "Usuario desactivado por el administrador"
 
-        # Superadmin siempre accede
-        if self.is_superadmin:
-            return True, "Superadmin"
+        # Superadmin o usuario aprobado
+        if estado == ESTADO_ACTIVO:
+            return True, "Superadmin" if self.is_superadmin else "Aprobado"
 
-        # Usuario aprobado
-        if self.is_approved:
-            return True, "Aprobado"
+        if estado == ESTADO_EN_PRUEBA:
+            return True, f"Prueba ({dias_restantes(vence_en, ahora)} días restantes)"
 
-        # Control por fecha explícita de expiración
         if self.fecha_expiracion:
-            if datetime.utcnow() <= self.fecha_expiracion:
-                dias = (self.fecha_expiracion - datetime.utcnow()).days
-                return True, f"Prueba ({dias} días restantes)"
             return False, "Prueba vencida"
 
-        # Fallback por días de prueba (compatibilidad)
-        # Usamos self.dias_prueba si existe, sino 15
-        dias_prueba = self.dias_prueba if self.dias_prueba else 15
-        dias_transcurridos = (datetime.utcnow() - self.fecha_registro).days
-        dias_restantes = dias_prueba - dias_transcurridos
-
-        if dias_restantes >= 0:
-            return True, f"Prueba ({dias_restantes} días restantes)"
-
         return False, "Bloqueado - Prueba terminada sin aprobación"
 
     # --------------------
     # Estado legible para UI
     # --------------------
     def estado_detallado(self):
-        if not self.is_active:
+        ahora = datetime.utcnow()
+        estado, vence_en = self.estado_acceso_actual(ahora)
+
+        if estado == ESTADO_INACTIVO:
             return "🚫 Usuario desactivado"
 
         if self.is_superadmin:
             return "👑 Superadministrador"
 
-        if self.is_approved:
-            dias = (datetime.utcnow() - self.fecha_aprobacion).days
+        if estado == ESTADO_ACTIVO:
+            dias = (ahora - self.fecha_aprobacion).days
             return f"✅ Aprobado (hace {dias} días)"
 
+        if estado == ESTADO_EN_PRUEBA:
+            return f"⏳ En prueba ({dias_restantes(vence_en, ahora)} días restantes)"
+
         if self.fecha_expiracion:
-            dias = (self.fecha_expiracion - datetime.utcnow()).days
-            if dias >= 0:
-                return f"⏳ En prueba ({dias} días restantes)"
             return "❌ Prueba vencida"
 
-        dias_prueba = self.dias_prueba if self.dias_prueba else 15
-        dias_transcurridos = (datetime.utcnow() - self.fecha_registro).days
-        dias_restantes = dias_prueba - dias_transcurridos
-
-        if dias_restantes >= 0:
-            return f"⏳ En prueba ({dias_restantes} días restantes)"
-
-        return "❌ Bloqueado - Prueba vencida"
\ No newline at end of file
+        return "❌ Bloqueado - Prueba vencida"
@@ -1,12 +1,17 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required, current_user
-from app.extensions import db
-from app.models.usuario import Usuario
+from app.extensions import contadores_cache
 from app.models.colegio import Colegio
-from app.models.docente import Docente
-from app.models.permiso import Permiso
 from app.middleware.superuser_middleware import superuser_required
-from datetime import datetime, timedelta
+from app.services.porteria_service import buffer_porteria
+from app.services.acceso_service import obtener_proximos_a_vencer
+from app.models.estado_acceso import ESTADO_INACTIVO, ESTADO_EN_PRUEBA, ESTADO_VENCIDO, dias_restantes
+from app.services.estadisticas_service import (
+    obtener_estadisticas_plataforma,
+    obtener_serie_diaria,
+    obtener_top_colegios
+)
+from datetime import datetime
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -21,16 +26,8 @@ admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 def dashboard():
     """Panel principal de administración con estadísticas"""
 
-    # Estadísticas generales
-    total_usuarios = Usuario.query.count()
-    superadmins = Usuario.query.filter_by(rol='superadmin').count()
-    usuarios_aprobados = Usuario.query.filter_by(is_approved=True).count()
-    usuarios_pendientes = Usuario.query.filter_by(is_approved=False).filter(Usuario.rol != 'superadmin').count()
-    usuarios_activos = Usuario.query.filter_by(is_active=True).count()
-
-    # Estadísticas de colegios
-    total_colegios = Colegio.query.count()
-    total_permisos = Permiso.query.count()
+    # Estadísticas generales (rollup periódico, sin COUNT(*) en cada petición)
+    estadisticas = obtener_estadisticas_plataforma()
 
     # Lista de colegios para superadmin (Los "Usuarios" del sistema)
     if current_user.rol == 'superadmin':
@@ -47,43 +44,87 @@ def dashboard():
     else:
         lista_colegios = []
 
-    # Nuevos usuarios (últimos 7 días)
-    hace_7_dias = datetime.utcnow() - timedelta(days=7)
-    nuevos_usuarios = Usuario.query.filter(Usuario.fecha_registro >= hace_7_dias).count()
-
-    # Próximos a vencer (lógica simplificada para el dashboard)
-    proximos_vencer = []
+    # Próximos a vencer: rango sobre el estado de acceso materializado
+    proximos_vencer = obtener_proximos_a_vencer()
 
     return render_template(
         "admin/dashboard.html",
-        total_usuarios=total_usuarios,
-        superadmins=superadmins,
-        usuarios_aprobados=usuarios_aprobados,
-        usuarios_pendientes=usuarios_pendientes,
-        usuarios_activos=usuarios_activos,
-        total_colegios=total_colegios,
-        total_permisos=total_permisos,
-        nuevos_usuarios=nuevos_usuarios,
+        total_usuarios=estadisticas["total_usuarios"],
+        superadmins=estadisticas["superadmins"],
+        usuarios_aprobados=estadisticas["usuarios_aprobados"],
+        usuarios_pendientes=estadisticas["usuarios_pendientes"],
+        usuarios_activos=estadisticas["usuarios_activos"],
+        total_colegios=estadisticas["total_colegios"],
+        total_permisos=estadisticas["total_permisos"],
+        nuevos_usuarios=estadisticas["nuevos_usuarios"],
         proximos_vencer=proximos_vencer,
         lista_colegios=lista_colegios
     )
 
 
+# ════════════════════════════════════════════════════════════════
+# ESTADÍSTICAS (TENDENCIAS DIARIAS)
+# ════════════════════════════════════════════════════════════════
+
+@admin_bp.route("/estadisticas")
+@login_required
+@superuser_required
+def estadisticas():
+    """Tendencias por día leídas del rollup de estadísticas"""
+    dias = min(max(request.args.get("dias", 30, type=int), 1), 365)
+
+    estadisticas = obtener_estadisticas_plataforma()
+
+    return render_template(
+        "admin/estadisticas.html",
+        usuarios_activos=estadisticas["usuarios_activos"],
+        usuarios_bloqueados=estadisticas["usuarios_bloqueados"],
+        usuarios_aprobados=estadisticas["usuarios_aprobados"],
+        usuarios_pendientes=estadisticas["usuarios_pendientes"],
+        actualizado_en=estadisticas["actualizado_en"],
+        colegios_data=obtener_top_colegios(),
+        serie=obtener_serie_diaria(dias),
+        dias=dias
+    )
+
+
+# ════════════════════════════════════════════════════════════════
+# MÉTRICAS DE LA CACHE DE CONTADORES
+# ════════════════════════════════════════════════════════════════
+
+@admin_bp.route("/cache/metricas")
+@login_required
+@superuser_required
+def metricas_cache():
+    """Hits/misses de la cache de contadores (por worker)"""
+    return jsonify(contadores_cache.metricas())
+
+
+@admin_bp.route("/porteria/metricas")
+@login_required
+@superuser_required
+def metricas_porteria():
+    """Cola de eventos de portería de este worker (pendientes, lotes, descartes)"""
+    return jsonify(buffer_porteria.metricas())
+
+
 # ════════════════════════════════════════════════════════════════
 # HELPER INTERNO
 # ════════════════════════════════════════════════════════════════
 
 def _calcular_estado_colegio(colegio):
-    """Calcula el estado visual de un colegio"""
+    """Estado visual de un colegio a partir de su estado de acceso materializado"""
     hoy = datetime.utcnow()
+    estado, vence_en = colegio.estado_acceso_actual(hoy)
+    dias = dias_restantes(vence_en, hoy)
 
-    if not colegio.activo:
+    if estado == ESTADO_INACTIVO:
         return {'estado': 'Inactivo', 'badge_class': 'secondary', 'dias_restantes': None}
 
-    if colegio.en_prueba and colegio.fecha_expiracion:
-        dias = (colegio.fecha_expiracion - hoy).days
-        if dias >= 0:
-            return {'estado': f'En Prueba ({dias} días)', 'badge_class': 'warning', 'dias_restantes': dias}
+    if estado == ESTADO_EN_PRUEBA:
+        return {'estado': f'En Prueba ({dias} días)', 'badge_class': 'warning', 'dias_restantes': dias}
+
+    if estado == ESTADO_VENCIDO:
         return {'estado': 'Prueba Vencida', 'badge_class': 'danger', 'dias_restantes': dias}
 
-    return {'estado': 'Aprobado', 'badge_class': 'success', 'dias_restantes': None}
\ No newline at end of file
+    return {'estado': 'Aprobado', 'badge_class': 'success', 'dias_restantes': None}
@@ -9,7 +9,8 @@ from app.services.auth_service import (
 )
 from app.services.email_service import send_reset_email
 from app.models.usuario import Usuario
-from app.extensions import db
+from app.extensions import db, limiter
+from app.services.limites_service import limite_login, clave_login
 from datetime import datetime
 from app.middleware.auth_middleware import acceso_permitido
 from flask_limiter.errors import RateLimitExceeded
@@ -30,11 +31,13 @@ def index():
 
 # ⭐⭐ LOGIN ⭐⭐
 @auth_bp.route('/login', methods=['GET', 'POST'])
+@limiter.limit(limite_login, key_func=clave_login, methods=['POST'])
 def login():
     if request.method == 'POST':
         ok, resultado = login_usuario(
             request.form['email'],
-            request.form['password']
+            request.form['password'],
+            request.remote_addr
         )
 
         if ok:
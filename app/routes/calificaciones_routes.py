@@ -0,0 +1,74 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+
+from app.extensions import db
+from app.models.periodo import Periodo
+from app.services import calificaciones_service
+from app.services.boletin_service import obtener_cierre
+
+calificaciones_bp = Blueprint("calificaciones", __name__, url_prefix="/calificaciones")
+
+
+def _clase_y_periodo(clase_id, periodo_id):
+    clase = calificaciones_service.obtener_clase(clase_id, current_user.colegio_id)
+    if clase is None or db.session.get(Periodo, periodo_id) is None:
+        return None
+    return clase
+
+
+# ========== MATRIZ DE NOTAS ==========
+@calificaciones_bp.route("/clases/<int:clase_id>/periodos/<int:periodo_id>")
+@login_required
+def matriz(clase_id, periodo_id):
+    """Estudiantes x indicadores de la clase con las notas del periodo (celdas dispersas)"""
+    clase = _clase_y_periodo(clase_id, periodo_id)
+    if clase is None:
+        return jsonify({"success": False, "message": "Clase o periodo no encontrado"}), 404
+
+    return jsonify({
+        "success": True,
+        **calificaciones_service.obtener_matriz(clase, periodo_id)
+    })
+
+
+# ========== CAMBIOS EN LOTE ==========
+@calificaciones_bp.route("/clases/<int:clase_id>/periodos/<int:periodo_id>", methods=["PATCH"])
+@login_required
+def guardar_cambios(clase_id, periodo_id):
+    """
+    Guarda las celdas cambiadas de la matriz en una sola escritura.
+
+    Cuerpo JSON: {"cambios": [{"estudiante_id", "indicador_id",
+    "calificacion": 0-5 | null, "version": versión leída (0 si estaba vacía)}, ...]}
+    Las celdas cambiadas por otro usuario vuelven como "conflicto" con su
+    valor actual.
+    """
+    clase = _clase_y_periodo(clase_id, periodo_id)
+    if clase is None:
+        return jsonify({"success": False, "message": "Clase o periodo no encontrado"}), 404
+
+    if obtener_cierre(current_user.colegio_id, periodo_id) is not None:
+        return jsonify({
+            "success": False,
+            "message": "El periodo está cerrado: reábralo para modificar notas"
+        }), 409
+
+    datos = request.get_json(silent=True)
+    cambios = datos.get("cambios") if isinstance(datos, dict) else None
+
+    if not isinstance(cambios, list) or not all(isinstance(c, dict) for c in cambios):
+        return jsonify({"success": False, "message": "Se esperaba una lista de cambios"}), 400
+
+    if len(cambios) > calificaciones_service.MAX_CAMBIOS_POR_LOTE:
+        return jsonify({
+            "success": False,
+            "message": f"Máximo {calificaciones_service.MAX_CAMBIOS_POR_LOTE} celdas por lote"
+        }), 413
+
+    resultados = calificaciones_service.aplicar_cambios(clase, periodo_id, cambios)
+
+    return jsonify({
+        "success": True,
+        "resultados": resultados,
+        "resumen": calificaciones_service.resumir(resultados)
+    })
@@ -1,6 +1,8 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash
+from flask import Blueprint, render_template, redirect, url_for, request, flash, abort, Response, stream_with_context, current_app
 from flask_login import login_required, current_user
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer_group, joinedload, raiseload
 
 from app.extensions import db
 from app.models.colegio import Colegio
@@ -9,6 +11,23 @@ from app.models.permiso import Permiso
 from app.models.sede import Sede
 from app.models.estudiante import Estudiante
 from app.models.jornada import Jornada
+from app.models.periodo import Periodo
+from app.services.boletin_service import (
+    obtener_boletin_grupo,
+    obtener_cierre,
+    cerrar_periodo,
+    reabrir_periodo,
+    recalcular_periodo
+)
+from app.services.dependencias_service import obtener_dependencias
+from app.services import exportacion_service
+from app.services import importacion_service
+from app.utils.paginacion import leer_filtros, aplicar_filtros, paginar_desde_request
+from app.utils.importacion import importar_desde_formulario
+from app.services.dashboard_service import (
+    obtener_estadisticas_colegio,
+    obtener_ultimos_permisos
+)
 
 
 colegio_bp = Blueprint(
@@ -29,65 +48,23 @@ def dashboard():
     if current_user.is_superadmin:
         return redirect(url_for("admin.dashboard"))
 
-    colegio = Colegio.query.get_or_404(
+    estadisticas = obtener_estadisticas_colegio(
         current_user.colegio_id
     )
 
-    hoy = datetime.utcnow().date()
-
-    total_sedes = Sede.query.filter_by(
-        colegio_id=current_user.colegio_id,
-        activo=True
-    ).count()
-
-    total_jornadas = Jornada.query.filter_by(
-        colegio_id=current_user.colegio_id,
-        activo=True
-    ).count()
-
-    total_docentes = Docente.query.filter_by(
-        colegio_id=current_user.colegio_id,
-        activo=True
-    ).count()
-
-    total_estudiantes = Estudiante.query.filter_by(
-        colegio_id=current_user.colegio_id,
-        activo=True
-    ).count()
+    if estadisticas is None:
+        abort(404)
 
-    total_permisos = Permiso.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).count()
-
-    permisos_activos = Permiso.query.filter(
-        Permiso.colegio_id == current_user.colegio_id,
-        Permiso.fecha_inicio <= hoy,
-        Permiso.fecha_fin >= hoy
-    ).count()
-
-    permisos_pendientes = Permiso.query.filter(
-        Permiso.colegio_id == current_user.colegio_id,
-        Permiso.fecha_inicio > hoy
-    ).count()
-
-    ultimos_permisos = Permiso.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(
-        Permiso.fecha_inicio.desc()
-    ).limit(5).all()
+    ultimos_permisos = obtener_ultimos_permisos(
+        current_user.colegio_id
+    )
 
     return render_template(
         "colegio/dashboard.html",
-        colegio=colegio,
-        total_sedes=total_sedes,
-        total_jornadas=total_jornadas,
-        total_docentes=total_docentes,
-        total_estudiantes=total_estudiantes,
-        total_permisos=total_permisos,
-        permisos_activos=permisos_activos,
-        permisos_pendientes=permisos_pendientes,
+        colegio=estadisticas.colegio,
+        estadisticas=estadisticas,
         ultimos_permisos=ultimos_permisos,
-        hoy=hoy
+        hoy=estadisticas.hoy
     )
 
 
@@ -103,7 +80,14 @@ def sedes():
         current_user.colegio_id
     )
 
-    sedes = colegio.sedes
+    # Conteos de docentes/estudiantes/jornadas en el mismo SELECT
+    sedes = (
+        Sede.query
+        .options(undefer_group("conteos"), raiseload("*"))
+        .filter_by(colegio_id=colegio.id)
+        .order_by(Sede.id)
+        .all()
+    )
 
     return render_template(
         "colegio/sedes.html",
@@ -169,7 +153,9 @@ def nueva_sede():
 @login_required
 def detalle_sede(sede_id):
 
-    sede = Sede.query.filter_by(
+    sede = Sede.query.options(
+        undefer_group("conteos")
+    ).filter_by(
         id=sede_id,
         colegio_id=current_user.colegio_id
     ).first_or_404()
@@ -299,15 +285,27 @@ def nueva_jornada(sede_id):
 @login_required
 def lista_docentes():
 
-    docentes = Docente.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(
-        Docente.nombre
-    ).all()
+    filtros = leer_filtros(request.args)
+
+    query = aplicar_filtros(
+        Docente.query.filter_by(
+            colegio_id=current_user.colegio_id
+        ),
+        Docente,
+        filtros
+    )
+
+    pagina = paginar_desde_request(
+        query.options(raiseload("*")),
+        (Docente.nombre, Docente.id),
+        request.args
+    )
 
     return render_template(
         "colegio/docentes.html",
-        docentes=docentes
+        docentes=pagina.items,
+        pagina=pagina,
+        filtros=filtros
     )
 
 
@@ -373,6 +371,47 @@ def nuevo_docente():
     )
 
 
+@colegio_bp.route("/docentes/importar", methods=["GET", "POST"])
+@login_required
+def importar_docentes():
+
+    reporte = None
+
+    if request.method == "POST":
+
+        reporte, respuesta = importar_desde_formulario(
+            importacion_service.importar_docentes,
+            "colegio.importar_docentes",
+            sede_id=request.form.get("sede_id", type=int)
+        )
+
+        if respuesta:
+            return respuesta
+
+        if not reporte["simulacion"] and reporte["insertadas"]:
+            flash(
+                f"{reporte['insertadas']} docentes importados correctamente",
+                "success"
+            )
+
+    sedes = Sede.query.filter_by(
+        colegio_id=current_user.colegio_id,
+        activo=True
+    ).order_by(
+        Sede.nombre
+    ).all()
+
+    return render_template(
+        "colegio/importar.html",
+        titulo="Importar Docentes",
+        nombre_plural="docentes",
+        volver=url_for("colegio.lista_docentes"),
+        reporte=reporte,
+        sedes=sedes,
+        max_filas=importacion_service.MAX_FILAS_IMPORTACION
+    )
+
+
 @colegio_bp.route("/docentes/editar/<int:id>", methods=["GET", "POST"])
 @login_required
 def editar_docente(id):
@@ -417,16 +456,14 @@ def eliminar_docente(id):
         colegio_id=current_user.colegio_id
     ).first_or_404()
 
-    tiene_permisos = Permiso.query.filter_by(
-        docente_id=id
-    ).first()
+    dependencias = obtener_dependencias(Docente, id)
 
-    if tiene_permisos:
+    if dependencias:
         docente.activo = False
         db.session.commit()
 
         flash(
-            "Docente desactivado (tiene permisos asociados)",
+            f"Docente desactivado (tiene registros asociados: {', '.join(dependencias)})",
             "warning"
         )
     else:
@@ -451,17 +488,39 @@ def eliminar_docente(id):
 @login_required
 def lista_permisos():
 
-    permisos = Permiso.query.filter_by(
+    filtros = leer_filtros(request.args)
+
+    query = aplicar_filtros(
+        Permiso.query.filter_by(
+            colegio_id=current_user.colegio_id
+        ),
+        Permiso,
+        filtros
+    )
+
+    pagina = paginar_desde_request(
+        query.options(joinedload(Permiso.docente), raiseload("*")),
+        (Permiso.fecha_inicio, Permiso.id),
+        request.args,
+        descendente=True
+    )
+
+    docentes = Docente.query.filter_by(
         colegio_id=current_user.colegio_id
+    ).options(
+        raiseload("*")
     ).order_by(
-        Permiso.fecha_inicio.desc()
+        Docente.nombre
     ).all()
 
     hoy = datetime.utcnow().date()
 
     return render_template(
         "colegio/permisos.html",
-        permisos=permisos,
+        permisos=pagina.items,
+        pagina=pagina,
+        filtros=filtros,
+        docentes=docentes,
         hoy=hoy
     )
 
@@ -530,6 +589,39 @@ def nuevo_permiso():
     )
 
 
+@colegio_bp.route("/permisos/importar", methods=["GET", "POST"])
+@login_required
+def importar_permisos():
+
+    reporte = None
+
+    if request.method == "POST":
+
+        reporte, respuesta = importar_desde_formulario(
+            importacion_service.importar_permisos,
+            "colegio.importar_permisos"
+        )
+
+        if respuesta:
+            return respuesta
+
+        if not reporte["simulacion"] and reporte["insertadas"]:
+            flash(
+                f"{reporte['insertadas']} permisos importados correctamente",
+                "success"
+            )
+
+    return render_template(
+        "colegio/importar.html",
+        titulo="Importar Permisos",
+        nombre_plural="permisos",
+        volver=url_for("colegio.lista_permisos"),
+        reporte=reporte,
+        sedes=None,
+        max_filas=importacion_service.MAX_FILAS_IMPORTACION
+    )
+
+
 @colegio_bp.route("/permisos/eliminar/<int:id>", methods=["POST"])
 @login_required
 def eliminar_permiso(id):
@@ -549,4 +641,149 @@ def eliminar_permiso(id):
 
     return redirect(
         url_for("colegio.lista_permisos")
-    )
\ No newline at end of file
+    )
+
+
+# ==========================================================
+# BOLETINES
+# ==========================================================
+
+@colegio_bp.route("/boletines")
+@login_required
+def boletines():
+
+    periodos = Periodo.query.order_by(
+        Periodo.anio_lectivo.desc(),
+        Periodo.fecha_inicio.desc(),
+        Periodo.id.desc()
+    ).all()
+
+    grupos = db.session.query(
+        Estudiante.grado,
+        Estudiante.grupo
+    ).filter(
+        Estudiante.colegio_id == current_user.colegio_id,
+        Estudiante.activo.is_(True),
+        Estudiante.grado.isnot(None)
+    ).distinct().order_by(
+        Estudiante.grado,
+        Estudiante.grupo
+    ).all()
+
+    periodo_id = request.args.get("periodo_id", type=int)
+    grado = request.args.get("grado") or None
+    grupo = request.args.get("grupo") or None
+
+    boletin = None
+    cierre = None
+    if periodo_id:
+        if db.session.get(Periodo, periodo_id) is None:
+            abort(404)
+
+        cierre = obtener_cierre(current_user.colegio_id, periodo_id)
+
+    if periodo_id and grado:
+        boletin = obtener_boletin_grupo(
+            current_user.colegio_id,
+            periodo_id,
+            grado,
+            grupo
+        )
+
+    return render_template(
+        "colegio/boletines.html",
+        periodos=periodos,
+        grupos=grupos,
+        periodo_id=periodo_id,
+        grado=grado,
+        grupo=grupo,
+        boletin=boletin,
+        cierre=cierre
+    )
+
+
+@colegio_bp.route("/boletines/<int:periodo_id>/<accion>", methods=["POST"])
+@login_required
+def cierre_periodo(periodo_id, accion):
+
+    acciones = {
+        "cerrar": "Periodo cerrado: los boletines quedaron congelados",
+        "reabrir": "Periodo reabierto: los boletines se calculan desde las notas",
+        "recalcular": "Boletines del periodo recalculados",
+    }
+    if accion not in acciones:
+        abort(404)
+
+    try:
+        if accion == "cerrar":
+            cerrar_periodo(current_user.colegio_id, periodo_id, usuario_id=current_user.id)
+        elif accion == "reabrir":
+            reabrir_periodo(current_user.colegio_id, periodo_id)
+        else:
+            recalcular_periodo(current_user.colegio_id, periodo_id, usuario_id=current_user.id)
+    except ValueError as e:
+        db.session.rollback()
+        flash(str(e), "warning")
+    except IntegrityError:
+        # Otra petición cerró el periodo entre la verificación y el INSERT
+        db.session.rollback()
+        flash("El periodo ya está cerrado", "warning")
+    else:
+        flash(acciones[accion], "success")
+
+    return redirect(url_for(
+        "colegio.boletines",
+        periodo_id=periodo_id,
+        grado=request.form.get("grado") or None,
+        grupo=request.form.get("grupo") or None
+    ))
+
+
+
+# ==========================================================
+# EXPORTACIONES (CSV / XLSX por streaming)
+# ==========================================================
+
+@colegio_bp.route("/exportar/<tipo>.<formato>")
+@login_required
+def exportar(tipo, formato):
+
+    if tipo not in exportacion_service.EXPORTACIONES or formato not in exportacion_service.FORMATOS:
+        abort(404)
+
+    filtros = leer_filtros(request.args)
+
+    # El XLSX sale completo al final (~8 s por cada 100.000 filas): uno grande
+    # no llega antes del timeout del proxy, así que se entrega en CSV
+    if formato == "xlsx" and exportacion_service.excede_filas(
+        tipo,
+        current_user.colegio_id,
+        filtros["desde"],
+        filtros["hasta"],
+        maximo=current_app.config.get("EXPORTACION_XLSX_MAX_FILAS")
+    ):
+        flash("La exportación es demasiado grande para Excel: se descargó en CSV", "info")
+        return redirect(url_for("colegio.exportar", tipo=tipo, formato="csv", **request.args))
+
+    # El generador corre mientras se envía la respuesta: stream_with_context
+    # mantiene viva la petición (y la sesión de base de datos) hasta el final
+    cuerpo = exportacion_service.GENERADORES[formato](
+        tipo,
+        current_user.colegio_id,
+        filtros["desde"],
+        filtros["hasta"]
+    )
+
+    rango = "_".join(
+        fecha.isoformat() for fecha in (filtros["desde"], filtros["hasta"]) if fecha
+    )
+    nombre = f"{tipo}_{rango}.{formato}" if rango else f"{tipo}.{formato}"
+
+    return Response(
+        stream_with_context(cuerpo),
+        content_type=exportacion_service.FORMATOS[formato],
+        headers={
+            "Content-Disposition": f"attachment; filename={nombre}",
+            "X-Accel-Buffering": "no",
+        }
+    )
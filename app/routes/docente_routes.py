@@ -1,8 +1,11 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy.orm import raiseload
 from app.extensions import db
 from app.models.docente import Docente
 from app.models.permiso import Permiso
+from app.services.dependencias_service import obtener_dependencias
+from app.utils.paginacion import leer_filtros, aplicar_filtros, paginar_desde_request
 
 docente_bp = Blueprint("docente", __name__, url_prefix="/docentes")
 
@@ -11,11 +14,27 @@ docente_bp = Blueprint("docente", __name__, url_prefix="/docentes")
 @docente_bp.route("/")
 @login_required
 def listar():
-    docentes = Docente.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(Docente.nombre).all()
+    filtros = leer_filtros(request.args)
+
+    query = aplicar_filtros(
+        Docente.query.filter_by(colegio_id=current_user.colegio_id),
+        Docente,
+        filtros
+    )
 
-    return render_template("docentes/listado.html", docentes=docentes)
+    # Paginación por (nombre, id): nunca se carga la tabla completa
+    pagina = paginar_desde_request(
+        query.options(raiseload("*")),
+        (Docente.nombre, Docente.id),
+        request.args
+    )
+
+    return render_template(
+        "docentes/listado.html",
+        docentes=pagina.items,
+        pagina=pagina,
+        filtros=filtros
+    )
 
 
 # ========== NUEVO DOCENTE ==========
@@ -118,14 +137,17 @@ def eliminar(id):
 
     nombre = docente.nombre
 
-    # Verificar si tiene permisos asociados
-    tiene_permisos = Permiso.query.filter_by(docente_id=id).first()
+    # Registros relacionados (permisos, estudiantes tutelados, clases) con EXISTS
+    dependencias = obtener_dependencias(Docente, id)
 
-    if tiene_permisos:
+    if dependencias:
         # No eliminar, marcar como inactivo
         docente.activo = False
         db.session.commit()
-        flash(f"Docente '{nombre}' desactivado (tiene permisos asociados)", "warning")
+        flash(
+            f"Docente '{nombre}' desactivado (tiene registros asociados: {', '.join(dependencias)})",
+            "warning"
+        )
     else:
         # Eliminar permanentemente
         db.session.delete(docente)
@@ -1,11 +1,21 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
-from app.extensions import db
+from sqlalchemy.orm import joinedload, raiseload
+from app.extensions import db, indice_qr, limiter
 from app.models.estudiante import Estudiante
 from app.models.colegio import Colegio
 from app.models.docente import Docente
 from app.models.sede import Sede
 from app.models.jornada import Jornada
+from app.models.piar import PIAR
+from app.services.dependencias_service import obtener_dependencias
+from app.services import asistencia_service
+from app.services import importacion_service
+from app.services.limites_service import limite_qr, clave_usuario, respuesta_limite_json
+from app.services.historial_service import obtener_historial, serializar_historial
+from app.services.boletin_service import obtener_historial_academico
+from app.utils.paginacion import leer_filtros, aplicar_filtros, paginar_desde_request
+from app.utils.importacion import importar_desde_formulario
 import secrets
 import string
 from datetime import datetime
@@ -17,13 +27,47 @@ estudiante_bp = Blueprint("estudiante", __name__, url_prefix="/estudiantes")
 @estudiante_bp.route("/")
 @login_required
 def listar():
-    """Lista todos los estudiantes del colegio del usuario actual"""
-    estudiantes = Estudiante.query.filter_by(
-        colegio_id=current_user.colegio_id,
-        activo=True
-    ).order_by(Estudiante.nombre).all()
+    """Lista paginada de estudiantes del colegio del usuario actual (por defecto, activos)"""
+    filtros = leer_filtros(request.args, activo_por_defecto=True)
 
-    return render_template("estudiantes/listado.html", estudiantes=estudiantes)
+    query = aplicar_filtros(
+        Estudiante.query.filter_by(colegio_id=current_user.colegio_id),
+        Estudiante,
+        filtros
+    )
+
+    # Sede y tutor en el mismo SELECT; cualquier otra relación falla en vez de hacer N+1
+    pagina = paginar_desde_request(
+        query.options(
+            joinedload(Estudiante.sede),
+            joinedload(Estudiante.docente_tutor),
+            raiseload("*")
+        ),
+        (Estudiante.nombre, Estudiante.id),
+        request.args
+    )
+
+    # PIAR activos solo de los estudiantes de esta página, en una consulta
+    ids = [est.id for est in pagina.items]
+    con_piar = {
+        estudiante_id for (estudiante_id,) in db.session.query(PIAR.estudiante_id).filter(
+            PIAR.estudiante_id.in_(ids),
+            PIAR.activo.is_(True)
+        )
+    } if ids else set()
+
+    sedes = Sede.query.filter_by(colegio_id=current_user.colegio_id, activo=True).order_by(Sede.nombre).all()
+    jornadas = Jornada.query.filter_by(colegio_id=current_user.colegio_id, activo=True).order_by(Jornada.nombre).all()
+
+    return render_template(
+        "estudiantes/Listado.html",
+        estudiantes=pagina.items,
+        pagina=pagina,
+        filtros=filtros,
+        con_piar=con_piar,
+        sedes=sedes,
+        jornadas=jornadas
+    )
 
 
 # ========== NUEVO ESTUDIANTE ==========
@@ -98,6 +142,42 @@ def nuevo():
     )
 
 
+# ========== IMPORTAR ESTUDIANTES ==========
+@estudiante_bp.route("/importar", methods=["GET", "POST"])
+@login_required
+def importar():
+    """Matrícula masiva desde CSV/XLSX, con revisión previa sin guardar"""
+    reporte = None
+
+    if request.method == "POST":
+        reporte, respuesta = importar_desde_formulario(
+            importacion_service.importar_estudiantes,
+            "estudiante.importar",
+            sede_id=request.form.get("sede_id", type=int),
+            jornada_id=request.form.get("jornada_id", type=int),
+            docente_id=request.form.get("docente_id", type=int)
+        )
+
+        if respuesta:
+            return respuesta
+
+        if not reporte["simulacion"] and reporte["insertadas"]:
+            flash(f"{reporte['insertadas']} estudiantes importados correctamente", "success")
+
+    sedes = Sede.query.filter_by(colegio_id=current_user.colegio_id, activo=True).order_by(Sede.nombre).all()
+    jornadas = Jornada.query.filter_by(colegio_id=current_user.colegio_id, activo=True).order_by(Jornada.nombre).all()
+    docentes = Docente.query.filter_by(colegio_id=current_user.colegio_id, activo=True).order_by(Docente.nombre).all()
+
+    return render_template(
+        "estudiantes/importar.html",
+        reporte=reporte,
+        sedes=sedes,
+        jornadas=jornadas,
+        docentes=docentes,
+        max_filas=importacion_service.MAX_FILAS_IMPORTACION
+    )
+
+
 # ========== EDITAR ESTUDIANTE ==========
 @estudiante_bp.route("/editar/<int:id>", methods=["GET", "POST"])
 @login_required
@@ -175,16 +255,17 @@ def eliminar(id):
 
     nombre = estudiante.nombre
 
-    # Verificar si tiene registros relacionados (Asistencias, Novedades, Evaluaciones)
-    tiene_asistencias = len(estudiante.asistencias) > 0
-    tiene_novedades = len(estudiante.novedades) > 0
-    tiene_evaluaciones = len(estudiante.evaluaciones) > 0
+    # Registros relacionados (asistencias, novedades, evaluaciones, PIAR...) con EXISTS
+    dependencias = obtener_dependencias(Estudiante, id)
 
-    if tiene_asistencias or tiene_novedades or tiene_evaluaciones:
+    if dependencias:
         # No eliminar, solo desactivar para mantener integridad referencial
         estudiante.activo = False
         db.session.commit()
-        flash(f"Estudiante '{nombre}' desactivado (tiene registros asociados)", "warning")
+        flash(
+            f"Estudiante '{nombre}' desactivado (tiene registros asociados: {', '.join(dependencias)})",
+            "warning"
+        )
     else:
         # Eliminar permanentemente si no tiene historial
         db.session.delete(estudiante)
@@ -204,21 +285,49 @@ def ver(id):
         colegio_id=current_user.colegio_id
     ).first_or_404()
 
-    # Obtener datos relacionados
-    asistencias_recientes = estudiante.asistencias[-10:] if estudiante.asistencias else []
-    novedades_recientes = estudiante.novedades[-10:] if estudiante.novedades else []
+    # Últimos registros (ORDER BY fecha DESC LIMIT); el resto se pide con "ver más"
+    asistencias_recientes = obtener_historial("asistencias", estudiante.id)
+    novedades_recientes = obtener_historial("novedades", estudiante.id)
     acudientes = estudiante.get_acudientes()
     tiene_piar = estudiante.tiene_piar_activo()
+    # Periodos cerrados: una lectura del snapshot, sin recalcular notas
+    historial_academico = obtener_historial_academico(estudiante.id)
 
     return render_template(
         "estudiantes/detalle.html",
         estudiante=estudiante,
-        asistencias=asistencias_recientes,
-        novedades=novedades_recientes,
+        asistencias=asistencias_recientes.items,
+        novedades=novedades_recientes.items,
+        cursor_asistencias=asistencias_recientes.cursor_siguiente,
+        cursor_novedades=novedades_recientes.cursor_siguiente,
         acudientes=acudientes,
-        tiene_piar=tiene_piar
+        tiene_piar=tiene_piar,
+        historial_academico=historial_academico
+    )
+
+
+# ========== API: HISTORIAL (VER MÁS) ==========
+@estudiante_bp.route("/ver/<int:id>/historial/<tipo>")
+@login_required
+def historial(id, tipo):
+    """Páginas anteriores del historial (asistencias, novedades, ingresos, alertas)"""
+    estudiante = Estudiante.query.filter_by(
+        id=id,
+        colegio_id=current_user.colegio_id
+    ).first_or_404()
+
+    pagina = obtener_historial(
+        tipo,
+        estudiante.id,
+        despues=request.args.get("despues"),
+        limite=request.args.get("limite", 10, type=int)
     )
 
+    if pagina is None:
+        return jsonify({"success": False, "message": "Tipo de historial no válido"}), 404
+
+    return jsonify({"success": True, **serializar_historial(tipo, pagina)})
+
 
 # ========== API: CAMBIAR ESTADO ==========
 @estudiante_bp.route("/cambiar-estado/<int:id>", methods=["POST"])
@@ -263,19 +372,17 @@ def regenerar_qr(id):
 
 # ========== API: BUSCAR ESTUDIANTE POR QR ==========
 @estudiante_bp.route("/buscar-qr/<token>")
+@limiter.limit(limite_qr, key_func=clave_usuario, on_breach=respuesta_limite_json)
 @login_required
 def buscar_por_qr(token):
-    """Buscar estudiante por token QR"""
-    estudiante = Estudiante.query.filter_by(
-        qr_token=token,
-        colegio_id=current_user.colegio_id
-    ).first()
+    """Buscar estudiante por token QR (índice en memoria, sin consulta)"""
+    estudiante = indice_qr.resolver(token, current_user.colegio_id)
 
     if estudiante:
         return jsonify({
             "success": True,
             "estudiante": {
-                "id": estudiante.id,
+                "id": estudiante.estudiante_id,
                 "nombre": estudiante.nombre,
                 "grado": estudiante.grado,
                 "grupo": estudiante.grupo
@@ -290,6 +397,7 @@ def buscar_por_qr(token):
 
 # ========== REGISTRAR ASISTENCIA RÁPIDA ==========
 @estudiante_bp.route("/asistencia-rapida", methods=["GET", "POST"])
+@limiter.limit(limite_qr, key_func=clave_usuario, methods=["POST"])
 @login_required
 def asistencia_rapida():
     """Registro rápido de asistencia por QR"""
@@ -301,32 +409,58 @@ def asistencia_rapida():
             flash("Token QR no válido", "danger")
             return redirect(url_for("estudiante.asistencia_rapida"))
 
-        estudiante = Estudiante.query.filter_by(
-            qr_token=qr_token,
-            colegio_id=current_user.colegio_id
-        ).first()
-
-        if not estudiante:
+        # Mismo camino que el lote: un escaneo repetido el mismo día no duplica
+        resultado = asistencia_service.registrar_escaneos(
+            [{"qr_token": qr_token, "estado": estado}],
+            current_user.colegio_id,
+            registrada_por=current_user.id
+        )[0]
+
+        if resultado["resultado"] == asistencia_service.REGISTRADA:
+            flash(f"Asistencia registrada: {resultado['nombre']} - {estado}", "success")
+        elif resultado["resultado"] == asistencia_service.DUPLICADA:
+            flash(f"{resultado['nombre']} ya tenía asistencia registrada hoy", "info")
+        elif resultado["resultado"] == asistencia_service.NO_ENCONTRADO:
             flash("Estudiante no encontrado", "danger")
-            return redirect(url_for("estudiante.asistencia_rapida"))
-
-        # Registrar asistencia
-        # Nota: Asegúrate de tener el modelo Asistencia importado o creado
-        try:
-            from app.models.asistencia import Asistencia
-            asistencia = Asistencia(
-                estudiante_id=estudiante.id,
-                clase_id=None,  # Asistencia general
-                fecha=datetime.now().date(),
-                estado=estado,
-                registrada_por=current_user.id
-            )
-            db.session.add(asistencia)
-            db.session.commit()
-            flash(f"Asistencia registrada: {estudiante.nombre} - {estado}", "success")
-        except ImportError:
-            flash("Módulo de asistencias no configurado aún", "warning")
+        else:
+            flash("Estado de asistencia no válido", "danger")
 
         return redirect(url_for("estudiante.asistencia_rapida"))
 
-    return render_template("estudiantes/asistencia_rapida.html")
\ No newline at end of file
+    return render_template("estudiantes/asistencia_rapida.html")
+
+
+# ========== API: ASISTENCIA POR LOTE ==========
+@estudiante_bp.route("/asistencia-rapida/lote", methods=["POST"])
+@limiter.limit(limite_qr, key_func=clave_usuario, on_breach=respuesta_limite_json)
+@login_required
+def asistencia_lote():
+    """
+    Registra un lote de escaneos QR en una sola transacción.
+
+    Cuerpo JSON: {"escaneos": [{"qr_token": "...", "estado": "presente", "timestamp": "ISO 8601"}, ...]}
+    Respuesta: un resultado por escaneo, en el mismo orden, y el resumen.
+    """
+    datos = request.get_json(silent=True)
+    escaneos = datos.get("escaneos") if isinstance(datos, dict) else None
+
+    if not isinstance(escaneos, list) or not all(isinstance(e, dict) for e in escaneos):
+        return jsonify({"success": False, "message": "Se esperaba una lista de escaneos"}), 400
+
+    if len(escaneos) > asistencia_service.MAX_ESCANEOS_POR_LOTE:
+        return jsonify({
+            "success": False,
+            "message": f"Máximo {asistencia_service.MAX_ESCANEOS_POR_LOTE} escaneos por lote"
+        }), 413
+
+    resultados = asistencia_service.registrar_escaneos(
+        escaneos,
+        current_user.colegio_id,
+        registrada_por=current_user.id
+    )
+
+    return jsonify({
+        "success": True,
+        "resultados": resultados,
+        "resumen": asistencia_service.resumir(resultados)
+    })
@@ -6,23 +6,52 @@ from app.middleware.auth_middleware import acceso_permitido  # NUEVO IMPORT
 from app.extensions import db
 from app.models.permiso import Permiso
 from app.models.docente import Docente
-from datetime import datetime
+from app.utils.paginacion import leer_filtros, aplicar_filtros, paginar_desde_request
+from sqlalchemy import func, case
+from sqlalchemy.orm import joinedload, raiseload
 
 permiso_bp = Blueprint("permiso", __name__, url_prefix="/dashboard/permisos")
 
 @permiso_bp.route("/")
 @login_required
 def listado():
-    permisos = Permiso.query.filter_by(
-        colegio_id=current_user.colegio_id
-    ).order_by(Permiso.fecha_inicio.desc()).all()
-
     # Pasar la fecha actual para calcular permisos activos
     hoy = datetime.now().date()
 
+    filtros = leer_filtros(request.args)
+
+    query = aplicar_filtros(
+        Permiso.query.filter_by(colegio_id=current_user.colegio_id),
+        Permiso,
+        filtros
+    )
+
+    # Totales del filtro completo en un solo SELECT (no solo de la página)
+    total_permisos, permisos_activos = query.with_entities(
+        func.count(Permiso.id),
+        func.count(case((Permiso.fecha_fin >= hoy, Permiso.id)))
+    ).one()
+
+    # Docente en el mismo SELECT; cualquier otra relación falla en vez de hacer N+1
+    pagina = paginar_desde_request(
+        query.options(joinedload(Permiso.docente), raiseload("*")),
+        (Permiso.fecha_inicio, Permiso.id),
+        request.args,
+        descendente=True
+    )
+
+    docentes = Docente.query.filter_by(
+        colegio_id=current_user.colegio_id
+    ).options(raiseload("*")).order_by(Docente.nombre).all()
+
     return render_template("permisos/listado.html",
-                           permisos=permisos,
-                           hoy=hoy)  # ← Agregar hoy
+                           permisos=pagina.items,
+                           pagina=pagina,
+                           filtros=filtros,
+                           docentes=docentes,
+                           total_permisos=total_permisos,
+                           permisos_activos=permisos_activos,
+                           hoy=hoy)
 
 
 @permiso_bp.route("/nuevo", methods=["GET", "POST"])
@@ -54,7 +83,9 @@ def nuevo():
 @permiso_bp.route("/eliminar/<int:id>", methods=["POST"])
 @login_required
 def eliminar(id):
-    permiso = Permiso.query.filter_by(
+    permiso = Permiso.query.options(
+        joinedload(Permiso.docente)
+    ).filter_by(
         id=id,
         colegio_id=current_user.colegio_id
     ).first_or_404()
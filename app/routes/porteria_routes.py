@@ -0,0 +1,38 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+
+from app.extensions import limiter
+from app.services import asistencia_service
+from app.services.porteria_service import encolar_eventos
+from app.services.limites_service import limite_qr, clave_usuario, respuesta_limite_json
+
+porteria_bp = Blueprint("porteria", __name__, url_prefix="/porteria")
+
+
+# ========== INGESTA DE EVENTOS ==========
+@porteria_bp.route("/eventos", methods=["POST"])
+@limiter.limit(limite_qr, key_func=clave_usuario, on_breach=respuesta_limite_json)
+@login_required
+def eventos():
+    """
+    Ingresos/salidas escaneados en portería.
+
+    Cuerpo JSON: {"eventos": [{"qr_token", "tipo": "ingreso|salida", "timestamp"}, ...]}
+    Responde 202 en cuanto los eventos quedan en cola; se guardan por lotes
+    y las llegadas tarde se registran como novedad en la misma transacción.
+    """
+    datos = request.get_json(silent=True)
+    eventos = datos.get("eventos") if isinstance(datos, dict) else None
+
+    if not isinstance(eventos, list) or not all(isinstance(e, dict) for e in eventos):
+        return jsonify({"success": False, "message": "Se esperaba una lista de eventos"}), 400
+
+    if len(eventos) > asistencia_service.MAX_ESCANEOS_POR_LOTE:
+        return jsonify({
+            "success": False,
+            "message": f"Máximo {asistencia_service.MAX_ESCANEOS_POR_LOTE} eventos por petición"
+        }), 413
+
+    resultados = encolar_eventos(eventos, current_user.colegio_id)
+
+    return jsonify({"success": True, "resultados": resultados}), 202
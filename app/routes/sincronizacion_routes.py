@@ -0,0 +1,80 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+
+from app.extensions import limiter
+from app.services import asistencia_service, sincronizacion_service
+from app.services.limites_service import limite_qr, clave_usuario, respuesta_limite_json
+
+sincronizacion_bp = Blueprint("sincronizacion", __name__, url_prefix="/sincronizacion")
+
+
+def _filtros_roster():
+    return {
+        "sede_id": request.args.get("sede_id", type=int),
+        "jornada_id": request.args.get("jornada_id", type=int),
+    }
+
+
+# ========== ROSTER COMPLETO ==========
+@sincronizacion_bp.route("/roster")
+@limiter.limit(limite_qr, key_func=clave_usuario, on_breach=respuesta_limite_json)
+@login_required
+def roster():
+    """Estudiantes + tokens QR de una sede/jornada, con su versión"""
+    return jsonify({
+        "success": True,
+        **sincronizacion_service.obtener_roster(current_user.colegio_id, **_filtros_roster())
+    })
+
+
+# ========== CAMBIOS DESDE UNA VERSIÓN ==========
+@sincronizacion_bp.route("/roster/cambios")
+@limiter.limit(limite_qr, key_func=clave_usuario, on_breach=respuesta_limite_json)
+@login_required
+def roster_cambios():
+    """Solo lo que cambió desde ?desde=<version> (altas/cambios y bajas)"""
+    return jsonify({
+        "success": True,
+        **sincronizacion_service.obtener_cambios(
+            current_user.colegio_id,
+            request.args.get("desde", type=int),
+            **_filtros_roster()
+        )
+    })
+
+
+# ========== SUBIDA DE ESCANEOS EN COLA ==========
+@sincronizacion_bp.route("/escaneos", methods=["POST"])
+@limiter.limit(limite_qr, key_func=clave_usuario, on_breach=respuesta_limite_json)
+@login_required
+def subir_escaneos():
+    """
+    Escaneos acumulados sin conexión.
+
+    Cuerpo JSON: {"escaneos": [{"qr_token", "tipo": "asistencia|ingreso|salida",
+    "estado", "timestamp"}, ...]}
+    """
+    datos = request.get_json(silent=True)
+    escaneos = datos.get("escaneos") if isinstance(datos, dict) else None
+
+    if not isinstance(escaneos, list) or not all(isinstance(e, dict) for e in escaneos):
+        return jsonify({"success": False, "message": "Se esperaba una lista de escaneos"}), 400
+
+    if len(escaneos) > asistencia_service.MAX_ESCANEOS_POR_LOTE:
+        return jsonify({
+            "success": False,
+            "message": f"Máximo {asistencia_service.MAX_ESCANEOS_POR_LOTE} escaneos por lote"
+        }), 413
+
+    resultados = sincronizacion_service.subir_escaneos(
+        escaneos,
+        current_user.colegio_id,
+        registrada_por=current_user.id
+    )
+
+    return jsonify({
+        "success": True,
+        "resultados": resultados,
+        "resumen": asistencia_service.resumir(resultados),
+        "version": sincronizacion_service.version_actual(current_user.colegio_id)
+    })
@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, event, select, update
+
+from app.extensions import db, cache_usuarios
+from app.models.usuario import Usuario
+from app.models.colegio import Colegio
+from app.models.estado_acceso import (
+    ESTADO_EN_PRUEBA,
+    calcular_estado_usuario,
+    calcular_estado_colegio,
+    dias_restantes
+)
+
+# Ventana de "próximos a vencer" del panel de superadmin
+DIAS_AVISO_VENCIMIENTO = 3
+
+# Filas por UPDATE en el barrido
+LOTE_BARRIDO = 1000
+
+
+# ════════════════════════════════════════════════════════════════
+# ESTADO AL GUARDAR (eventos del ORM)
+# ════════════════════════════════════════════════════════════════
+
+def registrar_modelos():
+    """
+    Recalcula estado_acceso / acceso_vence_en cada vez que el ORM inserta
+    o actualiza un Usuario o Colegio (registro, aprobación, desactivación).
+    Los cambios que no pasan por el ORM los corrige el barrido.
+    """
+    for modelo, funcion in ((Usuario, _estado_usuario), (Colegio, _estado_colegio)):
+        for nombre_evento in ("before_insert", "before_update"):
+            if not event.contains(modelo, nombre_evento, funcion):
+                event.listen(modelo, nombre_evento, funcion)
+
+
+def _estado_usuario(mapper, connection, target):
+    target.estado_acceso, target.acceso_vence_en = calcular_estado_usuario(
+        target.is_active, target.rol, target.is_approved, target.fecha_expiracion,
+        target.fecha_registro or datetime.utcnow(), target.dias_prueba, datetime.utcnow()
+    )
+
+
+def _estado_colegio(mapper, connection, target):
+    target.estado_acceso, target.acceso_vence_en = calcular_estado_colegio(
+        target.activo, target.en_prueba, target.fecha_expiracion, datetime.utcnow()
+    )
+
+
+# ════════════════════════════════════════════════════════════════
+# BARRIDO PERIÓDICO
+# ════════════════════════════════════════════════════════════════
+
+def barrer_estados_acceso(ahora=None):
+    """
+    Materializa el estado de acceso de todos los usuarios y colegios.
+
+    Lee solo las columnas que lo determinan, calcula en Python (misma regla
+    que los eventos del ORM, sin aritmética de fechas propia de cada motor)
+    y actualiza únicamente las filas cuyo estado cambió: pruebas vencidas
+    desde el último barrido, filas sin estado (previas a la migración) o
+    modificadas fuera del ORM.
+
+    Retorna: {"usuarios": n, "colegios": n} filas actualizadas
+    """
+    ahora = ahora or datetime.utcnow()
+
+    filas_usuarios = db.session.execute(
+        select(
+            Usuario.id, Usuario.is_active, Usuario.rol, Usuario.is_approved,
+            Usuario.fecha_expiracion, Usuario.fecha_registro, Usuario.dias_prueba,
+            Usuario.estado_acceso, Usuario.acceso_vence_en
+        )
+    ).all()
+
+    cambios_usuarios = [
+        _cambio(fila, estado, vence_en)
+        for fila in filas_usuarios
+        for estado, vence_en in [calcular_estado_usuario(
+            fila.is_active, fila.rol, fila.is_approved, fila.fecha_expiracion,
+            fila.fecha_registro, fila.dias_prueba, ahora
+        )]
+        if (estado, vence_en) != (fila.estado_acceso, fila.acceso_vence_en)
+    ]
+
+    filas_colegios = db.session.execute(
+        select(
+            Colegio.id, Colegio.activo, Colegio.en_prueba, Colegio.fecha_expiracion,
+            Colegio.estado_acceso, Colegio.acceso_vence_en
+        )
+    ).all()
+
+    cambios_colegios = [
+        _cambio(fila, estado, vence_en)
+        for fila in filas_colegios
+        for estado, vence_en in [calcular_estado_colegio(
+            fila.activo, fila.en_prueba, fila.fecha_expiracion, ahora
+        )]
+        if (estado, vence_en) != (fila.estado_acceso, fila.acceso_vence_en)
+    ]
+
+    _actualizar_estados(Usuario, cambios_usuarios)
+    _actualizar_estados(Colegio, cambios_colegios)
+    db.session.commit()
+
+    # UPDATE sin ORM: el snapshot de usuarios de este worker no se entera solo
+    cache_usuarios.invalidar_usuarios(*(cambio["_id"] for cambio in cambios_usuarios))
+    cache_usuarios.invalidar_colegios(*(cambio["_id"] for cambio in cambios_colegios))
+
+    return {"usuarios": len(cambios_usuarios), "colegios": len(cambios_colegios)}
+
+
+def _cambio(fila, estado, vence_en):
+    # Lo leído viaja con el cambio: el UPDATE solo aplica si la fila sigue igual
+    return {
+        "_id": fila.id,
+        "_estado": estado,
+        "_vence": vence_en,
+        "_estado_leido": fila.estado_acceso,
+        "_vence_leido": fila.acceso_vence_en,
+    }
+
+
+def _actualizar_estados(modelo, cambios):
+    """
+    Escribe los estados calculados por el barrido.
+
+    Si entre la lectura y el UPDATE otra petición cambió la fila (p. ej. el
+    superadmin activó al usuario y el evento del ORM ya guardó su estado),
+    la condición sobre lo leído no coincide y el barrido no la pisa con un
+    estado calculado sobre datos viejos.
+    """
+    tabla = modelo.__table__
+    stmt = (
+        update(tabla)
+        .where(
+            tabla.c.id == bindparam("_id"),
+            tabla.c.estado_acceso.is_not_distinct_from(bindparam("_estado_leido")),
+            tabla.c.acceso_vence_en.is_not_distinct_from(bindparam("_vence_leido"))
+        )
+        .values(estado_acceso=bindparam("_estado"), acceso_vence_en=bindparam("_vence"))
+    )
+
+    for inicio in range(0, len(cambios), LOTE_BARRIDO):
+        db.session.connection().execute(stmt, cambios[inicio:inicio + LOTE_BARRIDO])
+
+
+# ════════════════════════════════════════════════════════════════
+# LECTURA (panel de superadmin)
+# ════════════════════════════════════════════════════════════════
+
+def obtener_proximos_a_vencer(dias=DIAS_AVISO_VENCIMIENTO, limite=50):
+    """
+    Usuarios en prueba que vencen dentro de `dias` días: rango sobre el
+    índice (estado_acceso, acceso_vence_en), sin recorrer todos los usuarios.
+    """
+    ahora = datetime.utcnow()
+
+    usuarios = (
+        Usuario.query
+        .filter(
+            Usuario.estado_acceso == ESTADO_EN_PRUEBA,
+            Usuario.acceso_vence_en.between(ahora, ahora + timedelta(days=dias))
+        )
+        .order_by(Usuario.acceso_vence_en)
+        .limit(limite)
+        .all()
+    )
+
+    return [
+        {"usuario": usuario, "dias": dias_restantes(usuario.acceso_vence_en, ahora)}
+        for usuario in usuarios
+    ]
+
+
+# ════════════════════════════════════════════════════════════════
+# TAREA EN SEGUNDO PLANO Y COMANDO CLI
+# ════════════════════════════════════════════════════════════════
+
+def init_app(app):
+    """
+    Registra los eventos del ORM, el comando `flask barrer-accesos` (para
+    cron) y el barrido periódico en cada worker al recibir su primera petición.
+
+    ACCESO_BARRIDO_SEGUNDOS = 0 desactiva el hilo (solo cron).
+    """
+    registrar_modelos()
+
+    intervalo = app.config.get("ACCESO_BARRIDO_SEGUNDOS", 3600)
+
+    @app.cli.command("barrer-accesos")
+    def barrer_accesos_command():
+        """Materializa el estado de acceso de usuarios y colegios"""
+        cambios = barrer_estados_acceso()
+        print(f"✅ Estados de acceso actualizados: {cambios['usuarios']} usuarios, "
+              f"{cambios['colegios']} colegios")
+
+    if not intervalo or app.testing:
+        return
+
+    estado = {"pid": None}
+    lock = threading.Lock()
+
+    @app.before_request
+    def _arrancar_barrido_periodico():
+        # gunicorn hace fork de los workers: un hilo por proceso
+        if estado["pid"] == os.getpid():
+            return
+
+        with lock:
+            if estado["pid"] == os.getpid():
+                return
+            estado["pid"] = os.getpid()
+
+            threading.Thread(
+                target=_bucle_barrido,
+                args=(app, intervalo),
+                name="barrido-accesos",
+                daemon=True
+            ).start()
+
+
+def _bucle_barrido(app, intervalo):
+    while True:
+        with app.app_context():
+            try:
+                barrer_estados_acceso()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Error barriendo estados de acceso")
+            finally:
+                db.session.remove()
+
+        time.sleep(intervalo)
@@ -0,0 +1,231 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db, indice_qr
+from app.models.asistencia import Asistencia
+from app.models.ingreso_colegio import IngresoColegio, TipoEvento
+from app.utils.fechas import ahora_local, a_hora_local
+from app.utils.sql import insert_con_conflicto
+
+ESTADOS_VALIDOS = ("presente", "tarde", "ausente")
+TIPOS_EVENTO = {"ingreso": TipoEvento.INGRESO, "salida": TipoEvento.SALIDA}
+
+# Escaneos aceptados por petición en el endpoint de lote
+MAX_ESCANEOS_POR_LOTE = 1000
+
+# Ventana aceptada para el timestamp de un escáner respecto a la hora del
+# servidor: atraso de un equipo que sincroniza tarde y adelanto de un reloj
+# corrido. Fuera de ella el escaneo es inválido (fecha de otro año, etc.)
+MAX_ATRASO_TIMESTAMP = timedelta(days=7)
+MAX_ADELANTO_TIMESTAMP = timedelta(minutes=10)
+
+# Resultado por escaneo
+REGISTRADA = "registrada"
+DUPLICADA = "duplicada"
+NO_ENCONTRADO = "no_encontrado"
+INVALIDO = "invalido"
+
+
+def _leer_timestamp(valor, ahora=None):
+    """
+    Timestamp ISO 8601 de un escáner como hora local del colegio (sin
+    tzinfo): "...Z" o "+00:00" se convierten antes de sacar fecha y hora.
+
+    Retorna None si no se puede leer o si cae fuera de la ventana
+    MAX_ATRASO_TIMESTAMP / MAX_ADELANTO_TIMESTAMP alrededor de `ahora`.
+    """
+    if not valor:
+        return None
+    try:
+        momento = a_hora_local(datetime.fromisoformat(str(valor).replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+    ahora = ahora or ahora_local()
+    if not ahora - MAX_ATRASO_TIMESTAMP <= momento <= ahora + MAX_ADELANTO_TIMESTAMP:
+        return None
+    return momento
+
+
+def _resolver(escaneos, colegio_id, ahora, es_valido):
+    """
+    Resuelve tokens y fechas de un lote y descarta repetidos dentro del lote.
+
+    Returns:
+        (resultados, candidatos): resultados en el orden de `escaneos` (los ya
+        decididos traen "resultado") y, para el resto, tuplas
+        (posicion, entrada, momento, escaneo) a insertar.
+    """
+    tokens = [str(escaneo.get("qr_token") or "").strip() for escaneo in escaneos]
+    entradas = indice_qr.resolver_varios(set(tokens), colegio_id)
+
+    resultados = []
+    candidatos = []
+    vistos = set()
+
+    for posicion, (escaneo, qr_token) in enumerate(zip(escaneos, tokens)):
+        resultado = {"qr_token": qr_token}
+        resultados.append(resultado)
+
+        momento = _leer_timestamp(escaneo.get("timestamp"), ahora) if escaneo.get("timestamp") else ahora
+
+        if not qr_token or momento is None or not es_valido(escaneo):
+            resultado["resultado"] = INVALIDO
+            continue
+
+        entrada = entradas.get(qr_token)
+        if entrada is None:
+            resultado["resultado"] = NO_ENCONTRADO
+            continue
+
+        resultado["estudiante_id"] = entrada.estudiante_id
+        resultado["nombre"] = entrada.nombre
+
+        clave = (entrada.estudiante_id, momento.date(), escaneo.get("tipo"))
+        if clave in vistos:
+            resultado["resultado"] = DUPLICADA
+            continue
+
+        vistos.add(clave)
+        candidatos.append((posicion, entrada, momento, escaneo))
+
+    return resultados, candidatos
+
+
+def _insertar_sin_duplicados(tabla, filas, columnas_clave):
+    """
+    Un único INSERT de varias filas con ON CONFLICT DO NOTHING.
+
+    Returns: set con la clave (columnas_clave) de las filas insertadas.
+    """
+    if not filas:
+        return set()
+
+    stmt = (
+        insert_con_conflicto(tabla)
+        .values(filas)
+        .on_conflict_do_nothing()
+        .returning(*[tabla.c[columna] for columna in columnas_clave])
+    )
+    return {tuple(fila) for fila in db.session.execute(stmt)}
+
+
+def registrar_escaneos(escaneos, colegio_id, registrada_por=None, ahora=None, commit=True):
+    """
+    Registra un lote de escaneos QR de asistencia general (sin clase).
+
+    - Los tokens se resuelven con el índice QR (una consulta IN como mucho
+      para los que no estén indexados).
+    - Un mismo estudiante escaneado varias veces el mismo día cuenta una vez:
+      se deduplica dentro del lote y contra la base con un único
+      INSERT ... ON CONFLICT DO NOTHING de varias filas.
+
+    Args:
+        escaneos: lista de dicts {"qr_token", "estado", "timestamp"}
+            (estado por defecto "presente"; timestamp ISO 8601, por defecto
+            ahora; con zona se convierte a la hora local del colegio; fuera
+            de la ventana MAX_ATRASO/MAX_ADELANTO_TIMESTAMP es inválido)
+        colegio_id: colegio del usuario que registra
+        registrada_por: id del usuario
+        ahora: datetime de referencia (pruebas)
+        commit: False si el llamador confirma la transacción
+
+    Returns:
+        Lista de resultados en el mismo orden que `escaneos`, cada uno con
+        "qr_token", "resultado" (registrada/duplicada/no_encontrado/invalido)
+        y, si se resolvió, "estudiante_id" y "nombre".
+    """
+    ahora = ahora or ahora_local()
+
+    resultados, candidatos = _resolver(
+        escaneos,
+        colegio_id,
+        ahora,
+        lambda escaneo: (escaneo.get("estado") or "presente") in ESTADOS_VALIDOS
+    )
+
+    filas = [
+        {
+            "estudiante_id": entrada.estudiante_id,
+            "clase_id": None,
+            "fecha": momento.date(),
+            "estado": escaneo.get("estado") or "presente",
+            "registrada_por": registrada_por,
+            "created_at": datetime.utcnow(),
+        }
+        for _, entrada, momento, escaneo in candidatos
+    ]
+
+    insertadas = _insertar_sin_duplicados(
+        Asistencia.__table__,
+        filas,
+        ("estudiante_id", "fecha")
+    )
+    if filas and commit:
+        db.session.commit()
+
+    for posicion, entrada, momento, _ in candidatos:
+        clave = (entrada.estudiante_id, momento.date())
+        resultados[posicion]["resultado"] = REGISTRADA if clave in insertadas else DUPLICADA
+
+    return resultados
+
+
+def registrar_eventos_porteria(escaneos, colegio_id, ahora=None, commit=True):
+    """
+    Registra ingresos/salidas (IngresoColegio) de un lote de escaneos.
+
+    Igual que registrar_escaneos, pero cada escaneo trae "tipo" ("ingreso" o
+    "salida") y el límite es un evento de cada tipo por estudiante y día
+    (índice único unico_evento_por_dia).
+
+    Returns: resultados en el orden de `escaneos`; los resueltos incluyen
+    además "tipo", "fecha" y "hora" del evento.
+    """
+    ahora = ahora or ahora_local()
+
+    resultados, candidatos = _resolver(
+        escaneos,
+        colegio_id,
+        ahora,
+        lambda escaneo: escaneo.get("tipo") in TIPOS_EVENTO
+    )
+
+    filas = [
+        {
+            "estudiante_id": entrada.estudiante_id,
+            "colegio_id": colegio_id,
+            "fecha": momento.date(),
+            "hora": momento.time(),
+            "metodo": escaneo.get("metodo") or "QR",
+            "tipo_evento": TIPOS_EVENTO[escaneo["tipo"]],
+            "creado_en": ahora,
+        }
+        for _, entrada, momento, escaneo in candidatos
+    ]
+
+    insertadas = _insertar_sin_duplicados(
+        IngresoColegio.__table__,
+        filas,
+        ("estudiante_id", "fecha", "tipo_evento")
+    )
+    if filas and commit:
+        db.session.commit()
+
+    for posicion, entrada, momento, escaneo in candidatos:
+        clave = (entrada.estudiante_id, momento.date(), TIPOS_EVENTO[escaneo["tipo"]])
+        resultados[posicion].update(
+            resultado=REGISTRADA if clave in insertadas else DUPLICADA,
+            tipo=escaneo["tipo"],
+            fecha=momento.date().isoformat(),
+            hora=momento.time().isoformat(timespec="seconds")
+        )
+
+    return resultados
+
+
+def resumir(resultados):
+    """Cuántos escaneos hubo de cada resultado"""
+    resumen = {REGISTRADA: 0, DUPLICADA: 0, NO_ENCONTRADO: 0, INVALIDO: 0}
+    for resultado in resultados:
+        resumen[resultado["resultado"]] += 1
+    return resumen
@@ -1,13 +1,17 @@
-from werkzeug.security import check_password_hash, generate_password_hash
 from datetime import datetime, timedelta
 import secrets  # ← ESTE IMPORT ES EL QUE FALTABA
 from app.models.usuario import Usuario
 from app.models.colegio import Colegio
 from app.extensions import db
+from app.services.hash_service import generar_hash, verificar_contrasena, HashOcupado
+from app.services.intentos_service import contador_intentos
 
 MAX_INTENTOS = 5
 TIEMPO_BLOQUEO_MIN = 2
 
+MENSAJE_IP_BLOQUEADA = "Demasiados intentos fallidos desde esta red. Intenta más tarde."
+MENSAJE_OCUPADO = "El servidor está atendiendo muchos ingresos. Intenta de nuevo en unos segundos."
+
 
 def registrar_usuario(email, password, nombre_colegio, codigo_acceso=None):
     """
@@ -38,7 +42,10 @@ def registrar_usuario(email, password, nombre_colegio, codigo_acceso=None):
 
             codigo_generado = False
 
-        # 3. Calcular fecha de expiración (15 días desde hoy)
+        # 3. Hash de la contraseña antes de abrir la transacción de escritura
+        password_hash = generar_hash(password)
+
+        # Calcular fecha de expiración (15 días desde hoy)
         fecha_expiracion = datetime.utcnow() + timedelta(days=15)
 
         # 4. Crear el Colegio
@@ -55,7 +62,7 @@ def registrar_usuario(email, password, nombre_colegio, codigo_acceso=None):
         # 5. Crear el Usuario Administrador
         nuevo_usuario = Usuario(
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=password_hash,
             rol='admin_colegio',
             colegio_id=nuevo_colegio.id,
             is_active=True,
@@ -75,33 +82,54 @@ def registrar_usuario(email, password, nombre_colegio, codigo_acceso=None):
         else:
             return True, f"✅ Registro exitoso con código personalizado: {codigo_acceso}"
 
+    except HashOcupado:
+        db.session.rollback()
+        return False, MENSAJE_OCUPADO
+
     except Exception as e:
         db.session.rollback()
         print(f"❌ Error en registrar_usuario: {e}")
         return False, f"Error al registrar: {str(e)}"
 
 
-def login_usuario(email, password):
-    """Verifica las credenciales y realiza el login"""
+def login_usuario(email, password, ip=None):
+    """
+    Verifica las credenciales y realiza el login.
+
+    Los fallos se cuentan en contador_intentos (por correo y por IP); la
+    fila del usuario solo se escribe al bloquearlo y al desbloquearlo.
+    """
     ahora = datetime.now()
+
+    if contador_intentos.ip_bloqueada(ip):
+        return False, MENSAJE_IP_BLOQUEADA
+
     usuario = Usuario.query.filter_by(email=email).first()
 
     if not usuario:
+        contador_intentos.registrar_fallo(email, ip, MAX_INTENTOS)
         return False, "Credenciales inválidas"
 
     if usuario.locked_until and usuario.locked_until > ahora:
         segundos = int((usuario.locked_until - ahora).total_seconds())
         return False, f"Usuario bloqueado. Intenta en {segundos} segundos"
 
-    if not check_password_hash(usuario.password_hash, password):
-        usuario.failed_attempts = (usuario.failed_attempts or 0) + 1
+    try:
+        valida, nuevo_hash = verificar_contrasena(usuario.password_hash, password)
+    except HashOcupado:
+        return False, MENSAJE_OCUPADO
+
+    if not valida:
+        fallos = contador_intentos.registrar_fallo(email, ip, MAX_INTENTOS)
 
-        if usuario.failed_attempts >= MAX_INTENTOS:
+        if fallos >= MAX_INTENTOS:
+            # Transición a bloqueado: el bloqueo vive en la fila desde ahora
+            usuario.failed_attempts = fallos
             usuario.locked_until = ahora + timedelta(minutes=TIEMPO_BLOQUEO_MIN)
             db.session.commit()
+            contador_intentos.reiniciar(email)
             return False, f"Usuario bloqueado por {MAX_INTENTOS} intentos fallidos."
 
-        db.session.commit()
         return False, "Credenciales inválidas"
 
     if not usuario.is_active:
@@ -110,9 +138,17 @@ def login_usuario(email, password):
     if usuario.fecha_expiracion and usuario.fecha_expiracion < ahora:
         return False, "Cuenta expirada. Contacte al administrador."
 
-    usuario.failed_attempts = 0
-    usuario.locked_until = None
-    db.session.commit()
+    contador_intentos.reiniciar(email)
+
+    # Hash con otro método o costo que PASSWORD_HASH_METODO: se reemplaza
+    if nuevo_hash:
+        usuario.password_hash = nuevo_hash
+
+    # Transición a desbloqueado (sin escritura si no hubo bloqueo ni rehash)
+    if usuario.failed_attempts or usuario.locked_until or nuevo_hash:
+        usuario.failed_attempts = 0
+        usuario.locked_until = None
+        db.session.commit()
 
     return True, usuario
 
@@ -142,7 +178,7 @@ def resetear_contrasena_por_email(email, nueva_contrasena):
         if not usuario:
             return False, "Usuario no encontrado"
 
-        usuario.password_hash = generate_password_hash(nueva_contrasena)
+        usuario.password_hash = generar_hash(nueva_contrasena)
         db.session.commit()
         return True, "Contraseña actualizada exitosamente"
     except Exception as e:
@@ -0,0 +1,785 @@
+import random
+import secrets
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, time as hora_del_dia
+
+import click
+import numpy as np
+from sqlalchemy import select, func, delete, or_, event, insert
+
+from app.extensions import db
+from app.models.colegio import Colegio
+from app.models.docente import Docente
+from app.models.estudiante import Estudiante
+from app.models.jornada import Jornada
+from app.models.evaluacion_estudiante import EvaluacionEstudiante, NivelDesempeno
+from app.models.indicador_logro import IndicadorLogro
+from app.models.competencia_materia import CompetenciaMateria
+from app.models.materia import Materia
+from app.models.periodo import Periodo
+from app.models.cierre_periodo import CierrePeriodo, ResultadoPeriodo
+
+# Cortes de calcular_nivel_desempeno: Bajo < 3.0 <= Básico < 3.9 <= Alto < 4.6 <= Superior
+CORTES_DESEMPENO = np.array([3.0, 3.9, 4.6])
+NIVELES = (
+    NivelDesempeno.BAJO,
+    NivelDesempeno.BASICO,
+    NivelDesempeno.ALTO,
+    NivelDesempeno.SUPERIOR,
+)
+
+# Decimales con que se publican las notas (el nivel se calcula sobre la nota publicada)
+DECIMALES = 2
+
+
+@dataclass(frozen=True)
+class Nota:
+    promedio: float
+    nivel: NivelDesempeno
+
+
+@dataclass(frozen=True)
+class NotaMateria(Nota):
+    # {competencia_id: Nota}
+    competencias: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class BoletinEstudiante:
+    estudiante_id: int
+    nombre: str
+    # Promedio simple de las materias; None si no tiene notas en el periodo
+    promedio: float = None
+    nivel: NivelDesempeno = None
+    # {materia_id: NotaMateria}
+    materias: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class BoletinGrupo:
+    periodo_id: int
+    grado: str
+    grupo: str
+    # [(materia_id, nombre)] y {competencia_id: (materia_id, nombre)}, ordenados para el reporte
+    materias: list
+    competencias: dict
+    estudiantes: list
+    # Fecha de cierre si las notas salen del snapshot del periodo cerrado
+    cerrado_en: datetime = None
+
+
+# ════════════════════════════════════════════════════════════════
+# NIVEL DE DESEMPEÑO
+# ════════════════════════════════════════════════════════════════
+
+def nivel_desempeno(nota):
+    """NivelDesempeno de una nota (misma escala que calcular_nivel_desempeno)"""
+    if nota is None:
+        return None
+    return NIVELES[int(np.searchsorted(CORTES_DESEMPENO, float(nota), side="right"))]
+
+
+def _indices_nivel(notas):
+    """Posición en NIVELES de cada nota del arreglo"""
+    return np.searchsorted(CORTES_DESEMPENO, notas, side="right")
+
+
+# ════════════════════════════════════════════════════════════════
+# MOTOR VECTORIZADO
+# ════════════════════════════════════════════════════════════════
+
+def _agrupar(*columnas):
+    """(claves únicas, índice de grupo de cada fila) para varias columnas enteras"""
+    claves, grupo = np.unique(np.stack(columnas, axis=1), axis=0, return_inverse=True)
+    return claves, grupo.reshape(-1)
+
+
+def _promedio_ponderado(grupo, notas, pesos, total_grupos):
+    """
+    Promedio de `notas` por grupo ponderado con `pesos`.
+
+    Un grupo en el que falta algún peso (NaN) o cuyos pesos suman 0 se
+    promedia de forma simple, como hace fn_boletin_estudiante_pro. Los pesos
+    se renormalizan sobre lo que tiene nota: una competencia sin evaluar no
+    baja el promedio de la materia.
+    """
+    sin_peso = np.isnan(pesos)
+    pesos = np.where(sin_peso, 0.0, pesos)
+
+    suma_pesos = np.bincount(grupo, weights=pesos, minlength=total_grupos)
+    simple = (np.bincount(grupo, weights=sin_peso, minlength=total_grupos) > 0) | (suma_pesos <= 0)
+
+    pesos = np.where(simple[grupo], 1.0, pesos)
+    suma_pesos = np.bincount(grupo, weights=pesos, minlength=total_grupos)
+
+    return np.bincount(grupo, weights=pesos * notas, minlength=total_grupos) / suma_pesos
+
+
+def calcular_promedios(estudiantes, competencias, materias, notas, pesos_indicador, pesos_competencia):
+    """
+    Promedios de competencia, materia y generales de todos los estudiantes a la vez.
+
+    Cada posición de los arreglos es una evaluación (estudiante, competencia,
+    materia de la competencia, nota, peso del indicador, peso de la
+    competencia). Los pesos nulos vienen como NaN.
+
+    Returns:
+        dict con arreglos alineados:
+        - "competencias": (claves [estudiante, competencia, materia], promedios)
+        - "materias": (claves [estudiante, materia], promedios)
+        - "generales": (estudiantes, promedios)
+    """
+    # 1. Competencia: indicadores ponderados por su peso
+    claves_c, grupo_c = _agrupar(estudiantes, competencias)
+    promedio_c = _promedio_ponderado(grupo_c, notas, pesos_indicador, len(claves_c))
+
+    # Materia y peso de cada (estudiante, competencia): constantes dentro del grupo
+    fila = np.empty(len(claves_c), dtype=np.intp)
+    fila[grupo_c] = np.arange(len(grupo_c))
+    materia_c = materias[fila]
+    peso_c = pesos_competencia[fila]
+
+    # 2. Materia: competencias ponderadas por peso_porcentual
+    claves_m, grupo_m = _agrupar(claves_c[:, 0], materia_c)
+    promedio_m = _promedio_ponderado(grupo_m, promedio_c, peso_c, len(claves_m))
+
+    # 3. General: promedio simple de las materias
+    claves_g, grupo_g = np.unique(claves_m[:, 0], return_inverse=True)
+    promedio_g = (
+        np.bincount(grupo_g, weights=promedio_m, minlength=len(claves_g))
+        / np.bincount(grupo_g, minlength=len(claves_g))
+    )
+
+    return {
+        "competencias": (np.column_stack([claves_c, materia_c]), promedio_c),
+        "materias": (claves_m, promedio_m),
+        "generales": (claves_g, promedio_g),
+    }
+
+
+# ════════════════════════════════════════════════════════════════
+# CARGA Y ARMADO DEL BOLETÍN
+# ════════════════════════════════════════════════════════════════
+
+def _cargar_evaluaciones(periodo_id, estudiante_ids):
+    """
+    Todas las notas del periodo de los estudiantes en UNA consulta.
+
+    La competencia sale del indicador evaluado o, si la nota se puso
+    directamente a la competencia, de la evaluación.
+    """
+    competencia_id = func.coalesce(
+        IndicadorLogro.competencia_id,
+        EvaluacionEstudiante.competencia_id
+    )
+
+    filas = db.session.execute(
+        select(
+            EvaluacionEstudiante.estudiante_id,
+            CompetenciaMateria.id,
+            CompetenciaMateria.materia_id,
+            EvaluacionEstudiante.calificacion,
+            IndicadorLogro.peso_porcentual,
+            CompetenciaMateria.peso_porcentual
+        )
+        .select_from(EvaluacionEstudiante)
+        .outerjoin(IndicadorLogro, EvaluacionEstudiante.indicador_id == IndicadorLogro.id)
+        .join(CompetenciaMateria, CompetenciaMateria.id == competencia_id)
+        .where(
+            EvaluacionEstudiante.periodo_id == periodo_id,
+            EvaluacionEstudiante.estudiante_id.in_(estudiante_ids),
+            EvaluacionEstudiante.calificacion.isnot(None)
+        )
+    ).all()
+
+    if not filas:
+        return None
+
+    estudiantes, competencias, materias, notas, pesos_i, pesos_c = zip(*filas)
+    # Numeric llega como Decimal; None -> NaN
+    return (
+        np.array(estudiantes, dtype=np.int64),
+        np.array(competencias, dtype=np.int64),
+        np.array(materias, dtype=np.int64),
+        np.array(notas, dtype=float),
+        np.array(pesos_i, dtype=float),
+        np.array(pesos_c, dtype=float),
+    )
+
+
+def _nombres_catalogo(materia_ids, competencia_ids):
+    materias = db.session.execute(
+        select(Materia.id, Materia.nombre)
+        .where(Materia.id.in_(materia_ids))
+        .order_by(Materia.nombre, Materia.id)
+    ).all()
+
+    competencias = db.session.execute(
+        select(CompetenciaMateria.id, CompetenciaMateria.materia_id, CompetenciaMateria.nombre)
+        .where(CompetenciaMateria.id.in_(competencia_ids))
+        .order_by(CompetenciaMateria.orden, CompetenciaMateria.id)
+    ).all()
+
+    return (
+        [tuple(fila) for fila in materias],
+        {fila.id: (fila.materia_id, fila.nombre) for fila in competencias},
+    )
+
+
+def _notas(claves, promedios):
+    """{clave: Nota} redondeando y calculando todos los niveles en bloque"""
+    promedios = np.round(promedios, DECIMALES)
+    niveles = _indices_nivel(promedios)
+    return {
+        clave: (float(promedio), NIVELES[nivel])
+        for clave, promedio, nivel in zip(map(tuple, claves.tolist()), promedios, niveles)
+    }
+
+
+def armar_boletines(periodo_id, estudiantes):
+    """
+    Boletines de una lista de estudiantes [(id, nombre)] para un periodo.
+
+    Returns: (materias, competencias, [BoletinEstudiante]) en el orden de `estudiantes`.
+    """
+    datos = _cargar_evaluaciones(periodo_id, [estudiante_id for estudiante_id, _ in estudiantes])
+
+    if datos is None:
+        return [], {}, [BoletinEstudiante(estudiante_id, nombre) for estudiante_id, nombre in estudiantes]
+
+    resultado = calcular_promedios(*datos)
+
+    notas_c = _notas(*resultado["competencias"])
+    notas_m = _notas(*resultado["materias"])
+    notas_g = _notas(resultado["generales"][0][:, None], resultado["generales"][1])
+
+    # Agrupar competencias dentro de su materia
+    por_materia = {}
+    for (estudiante_id, competencia_id, materia_id), (promedio, nivel) in notas_c.items():
+        por_materia.setdefault((estudiante_id, materia_id), {})[competencia_id] = Nota(promedio, nivel)
+
+    materias_estudiante = {}
+    for (estudiante_id, materia_id), (promedio, nivel) in notas_m.items():
+        materias_estudiante.setdefault(estudiante_id, {})[materia_id] = NotaMateria(
+            promedio,
+            nivel,
+            competencias=por_materia.get((estudiante_id, materia_id), {})
+        )
+
+    materias, competencias = _nombres_catalogo(
+        np.unique(datos[2]).tolist(),
+        np.unique(datos[1]).tolist()
+    )
+
+    boletines = []
+    for estudiante_id, nombre in estudiantes:
+        general = notas_g.get((estudiante_id,))
+        boletines.append(BoletinEstudiante(
+            estudiante_id,
+            nombre,
+            promedio=general[0] if general else None,
+            nivel=general[1] if general else None,
+            materias=materias_estudiante.get(estudiante_id, {})
+        ))
+
+    return materias, competencias, boletines
+
+
+def _filtro_grupo(columna, grupo):
+    """Grupo exacto; None o "" son los estudiantes del grado sin grupo"""
+    if grupo:
+        return columna == grupo
+    return or_(columna.is_(None), columna == "")
+
+
+def calcular_boletin_grupo(colegio_id, periodo_id, grado, grupo=None):
+    """
+    Boletines de todos los estudiantes activos de un grado/grupo del colegio.
+
+    Sustituye llamar fn_boletin_estudiante_pro estudiante por estudiante:
+    las notas del grupo se leen en una sola consulta y los promedios
+    ponderados (indicador -> competencia -> materia) y niveles de todos los
+    estudiantes se calculan a la vez con NumPy. Son cuatro consultas sin
+    importar el tamaño del grupo.
+
+    Returns: BoletinGrupo
+    """
+    filtros = [
+        Estudiante.colegio_id == colegio_id,
+        Estudiante.activo.is_(True),
+        Estudiante.grado == grado,
+        _filtro_grupo(Estudiante.grupo, grupo),
+    ]
+
+    estudiantes = db.session.execute(
+        select(Estudiante.id, Estudiante.nombre)
+        .where(*filtros)
+        .order_by(Estudiante.nombre, Estudiante.id)
+    ).all()
+
+    materias, competencias, boletines = armar_boletines(
+        periodo_id,
+        [tuple(fila) for fila in estudiantes]
+    )
+
+    return BoletinGrupo(
+        periodo_id=periodo_id,
+        grado=grado,
+        grupo=grupo,
+        materias=materias,
+        competencias=competencias,
+        estudiantes=boletines
+    )
+
+
+def calcular_boletin_estudiante(estudiante, periodo_id):
+    """Boletín de un solo estudiante con el mismo motor: (materias, competencias, BoletinEstudiante)"""
+    materias, competencias, boletines = armar_boletines(
+        periodo_id,
+        [(estudiante.id, estudiante.nombre)]
+    )
+    return materias, competencias, boletines[0]
+
+
+# ════════════════════════════════════════════════════════════════
+# CIERRE DE PERIODO (snapshot en resultados_periodo)
+# ════════════════════════════════════════════════════════════════
+
+def obtener_cierre(colegio_id, periodo_id):
+    return CierrePeriodo.query.filter_by(
+        colegio_id=colegio_id,
+        periodo_id=periodo_id
+    ).first()
+
+
+def obtener_boletin_grupo(colegio_id, periodo_id, grado, grupo=None):
+    """
+    Boletín de un grado/grupo: del snapshot si el periodo está cerrado para
+    el colegio, calculado desde las evaluaciones si sigue abierto.
+
+    Returns: BoletinGrupo (cerrado_en indica de dónde salió)
+    """
+    cierre = obtener_cierre(colegio_id, periodo_id)
+    if cierre is None:
+        return calcular_boletin_grupo(colegio_id, periodo_id, grado, grupo)
+    return _boletin_desde_cierre(cierre, grado, grupo)
+
+
+def _boletin_desde_cierre(cierre, grado, grupo=None):
+    """Reconstruye el BoletinGrupo con una lectura indexada de resultados_periodo"""
+    filtros = [
+        ResultadoPeriodo.periodo_id == cierre.periodo_id,
+        ResultadoPeriodo.colegio_id == cierre.colegio_id,
+        ResultadoPeriodo.grado == grado,
+        _filtro_grupo(ResultadoPeriodo.grupo, grupo),
+    ]
+
+    filas = db.session.execute(
+        select(
+            ResultadoPeriodo.estudiante_id,
+            Estudiante.nombre,
+            ResultadoPeriodo.materia_id,
+            ResultadoPeriodo.competencia_id,
+            ResultadoPeriodo.promedio,
+            ResultadoPeriodo.nivel
+        )
+        .join(Estudiante, Estudiante.id == ResultadoPeriodo.estudiante_id)
+        .where(*filtros)
+        .order_by(Estudiante.nombre, Estudiante.id)
+    ).all()
+
+    generales = {}
+    materias = {}
+    competencias = {}
+    for estudiante_id, nombre, materia_id, competencia_id, promedio, nivel in filas:
+        promedio = float(promedio) if promedio is not None else None
+        if materia_id is None:
+            generales[estudiante_id] = (nombre, promedio, nivel)
+        elif competencia_id is None:
+            materias[(estudiante_id, materia_id)] = (promedio, nivel)
+        else:
+            competencias.setdefault((estudiante_id, materia_id), {})[competencia_id] = Nota(promedio, nivel)
+
+    materias_estudiante = {}
+    for (estudiante_id, materia_id), (promedio, nivel) in materias.items():
+        materias_estudiante.setdefault(estudiante_id, {})[materia_id] = NotaMateria(
+            promedio,
+            nivel,
+            competencias=competencias.get((estudiante_id, materia_id), {})
+        )
+
+    catalogo_materias, catalogo_competencias = _nombres_catalogo(
+        {materia_id for _, materia_id in materias},
+        {competencia_id for notas in competencias.values() for competencia_id in notas}
+    )
+
+    return BoletinGrupo(
+        periodo_id=cierre.periodo_id,
+        grado=grado,
+        grupo=grupo,
+        materias=catalogo_materias,
+        competencias=catalogo_competencias,
+        estudiantes=[
+            BoletinEstudiante(
+                estudiante_id,
+                nombre,
+                promedio=promedio,
+                nivel=nivel,
+                materias=materias_estudiante.get(estudiante_id, {})
+            )
+            for estudiante_id, (nombre, promedio, nivel) in generales.items()
+        ],
+        cerrado_en=cierre.cerrado_en
+    )
+
+
+def cerrar_periodo(colegio_id, periodo_id, usuario_id=None, commit=True):
+    """
+    Calcula una sola vez los boletines del periodo para todo el colegio y
+    los guarda en resultados_periodo.
+
+    Desde ese momento boletines, exportaciones e historial académico leen
+    el snapshot. Para corregir notas hay que reabrir o recalcular.
+
+    Raises: ValueError si el periodo no existe o ya está cerrado.
+    Returns: CierrePeriodo
+    """
+    if db.session.get(Periodo, periodo_id) is None:
+        raise ValueError("Periodo no encontrado")
+    if obtener_cierre(colegio_id, periodo_id) is not None:
+        raise ValueError("El periodo ya está cerrado")
+
+    estudiantes = db.session.execute(
+        select(Estudiante.id, Estudiante.nombre, Estudiante.grado, Estudiante.grupo)
+        .where(
+            Estudiante.colegio_id == colegio_id,
+            Estudiante.activo.is_(True),
+            Estudiante.grado.isnot(None)
+        )
+        .order_by(Estudiante.id)
+    ).all()
+
+    _, _, boletines = armar_boletines(
+        periodo_id,
+        [(fila.id, fila.nombre) for fila in estudiantes]
+    )
+
+    cierre = CierrePeriodo(
+        periodo_id=periodo_id,
+        colegio_id=colegio_id,
+        cerrado_por=usuario_id,
+        total_estudiantes=len(estudiantes)
+    )
+    db.session.add(cierre)
+    db.session.flush()
+
+    filas = []
+    for estudiante, boletin in zip(estudiantes, boletines):
+        base = {
+            "cierre_id": cierre.id,
+            "periodo_id": periodo_id,
+            "colegio_id": colegio_id,
+            "estudiante_id": estudiante.id,
+            "grado": estudiante.grado,
+            "grupo": estudiante.grupo,
+        }
+        filas.append(dict(base, materia_id=None, competencia_id=None, promedio=boletin.promedio, nivel=boletin.nivel))
+
+        for materia_id, nota in boletin.materias.items():
+            filas.append(dict(base, materia_id=materia_id, competencia_id=None, promedio=nota.promedio, nivel=nota.nivel))
+            for competencia_id, nota_competencia in nota.competencias.items():
+                filas.append(dict(
+                    base,
+                    materia_id=materia_id,
+                    competencia_id=competencia_id,
+                    promedio=nota_competencia.promedio,
+                    nivel=nota_competencia.nivel
+                ))
+
+    # INSERT de Core: un solo executemany (el bulk del ORM parte el lote cada
+    # vez que cambian las columnas nulas entre filas generales/materia/competencia)
+    if filas:
+        db.session.execute(ResultadoPeriodo.__table__.insert(), filas)
+
+    if commit:
+        db.session.commit()
+
+    return cierre
+
+
+def reabrir_periodo(colegio_id, periodo_id, commit=True):
+    """
+    Borra el cierre y su snapshot: el periodo vuelve a calcularse desde las
+    evaluaciones. Returns: True si estaba cerrado.
+    """
+    cierre = obtener_cierre(colegio_id, periodo_id)
+    if cierre is None:
+        return False
+
+    # Explícito: SQLite no aplica el ON DELETE CASCADE sin PRAGMA foreign_keys
+    db.session.execute(
+        delete(ResultadoPeriodo).where(ResultadoPeriodo.cierre_id == cierre.id)
+    )
+    db.session.delete(cierre)
+
+    if commit:
+        db.session.commit()
+
+    return True
+
+
+def recalcular_periodo(colegio_id, periodo_id, usuario_id=None):
+    """Reabre y vuelve a cerrar en una transacción (tras corregir notas)"""
+    reabrir_periodo(colegio_id, periodo_id, commit=False)
+    db.session.flush()
+    cierre = cerrar_periodo(colegio_id, periodo_id, usuario_id=usuario_id, commit=False)
+    db.session.commit()
+    return cierre
+
+
+def obtener_historial_academico(estudiante_id):
+    """
+    Notas por materia de todos los periodos cerrados de un estudiante
+    (certificados y comparaciones), en una consulta sobre el snapshot.
+
+    Returns: [{"periodo", "anio_lectivo", "promedio", "nivel", "materias": [(nombre, promedio, nivel)]}]
+    del periodo más reciente al más antiguo.
+    """
+    filas = db.session.execute(
+        select(
+            ResultadoPeriodo.periodo_id,
+            Periodo.nombre,
+            Periodo.anio_lectivo,
+            Materia.nombre,
+            ResultadoPeriodo.promedio,
+            ResultadoPeriodo.nivel
+        )
+        .join(Periodo, Periodo.id == ResultadoPeriodo.periodo_id)
+        .outerjoin(Materia, Materia.id == ResultadoPeriodo.materia_id)
+        .where(
+            ResultadoPeriodo.estudiante_id == estudiante_id,
+            ResultadoPeriodo.competencia_id.is_(None)
+        )
+        .order_by(
+            Periodo.anio_lectivo.desc(),
+            Periodo.fecha_inicio.desc(),
+            ResultadoPeriodo.periodo_id.desc(),
+            Materia.nombre
+        )
+    ).all()
+
+    periodos = {}
+    for periodo_id, periodo, anio, materia, promedio, nivel in filas:
+        registro = periodos.setdefault(periodo_id, {
+            "periodo": periodo,
+            "anio_lectivo": anio,
+            "promedio": None,
+            "nivel": None,
+            "materias": [],
+        })
+        promedio = float(promedio) if promedio is not None else None
+        if materia is None:
+            registro.update(promedio=promedio, nivel=nivel)
+        else:
+            registro["materias"].append((materia, promedio, nivel))
+
+    return list(periodos.values())
+
+
+# ════════════════════════════════════════════════════════════════
+# BENCHMARK (motor vectorizado vs. cálculo por estudiante)
+# ════════════════════════════════════════════════════════════════
+
+def _promedio_por_peso(pares):
+    """Promedio de [(nota, peso)]; simple si falta algún peso o suman 0"""
+    pesos = [peso for _, peso in pares]
+    if any(peso is None for peso in pesos) or sum(float(peso) for peso in pesos) <= 0:
+        return sum(nota for nota, _ in pares) / len(pares)
+    return sum(nota * float(peso) for nota, peso in pares) / sum(float(peso) for peso in pesos)
+
+
+def boletin_por_estudiante(estudiante_id, periodo_id):
+    """
+    Promedios por materia de UN estudiante recorriendo el ORM, como
+    fn_boletin_estudiante_pro: la referencia del benchmark (y de la
+    exactitud del motor). Hace consultas por evaluación.
+
+    Returns: {materia_id: promedio}
+    """
+    evaluaciones = EvaluacionEstudiante.query.filter_by(
+        estudiante_id=estudiante_id,
+        periodo_id=periodo_id
+    ).all()
+
+    por_competencia = {}
+    for evaluacion in evaluaciones:
+        if evaluacion.calificacion is None:
+            continue
+        indicador = evaluacion.indicador
+        competencia = indicador.competencia if indicador else evaluacion.competencia
+        peso = indicador.peso_porcentual if indicador else None
+        por_competencia.setdefault(competencia, []).append((float(evaluacion.calificacion), peso))
+
+    por_materia = {}
+    for competencia, pares in por_competencia.items():
+        por_materia.setdefault(competencia.materia_id, []).append(
+            (_promedio_por_peso(pares), competencia.peso_porcentual)
+        )
+
+    return {materia_id: _promedio_por_peso(pares) for materia_id, pares in por_materia.items()}
+
+
+def _poblar_benchmark(estudiantes, materias, competencias, indicadores):
+    """
+    Colegio sintético con un grado de `estudiantes` y todas sus notas del
+    periodo (sin commit: quien llama hace rollback).
+
+    Returns: (colegio_id, periodo_id, grado, [estudiante_id])
+    """
+    generador = random.Random(1)
+    colegio = Colegio(nombre="Benchmark boletines", codigo_acceso=f"BENCH-{secrets.token_hex(4)}")
+    periodo = Periodo(nombre="Benchmark", anio_lectivo=datetime.utcnow().year)
+    db.session.add_all([colegio, periodo])
+    db.session.flush()
+
+    docente = Docente(nombre="Docente benchmark", colegio_id=colegio.id)
+    jornada = Jornada(nombre="Benchmark", hora_inicio=hora_del_dia(6, 30), hora_fin=hora_del_dia(12), colegio_id=colegio.id)
+    db.session.add_all([docente, jornada])
+    db.session.flush()
+
+    db.session.execute(insert(Estudiante), [
+        {
+            "nombre": f"Estudiante {indice:05d}",
+            "grado": "BENCH",
+            "grupo": "A",
+            "colegio_id": colegio.id,
+            "docente_id": docente.id,
+            "jornada_id": jornada.id,
+            "activo": True,
+        }
+        for indice in range(estudiantes)
+    ])
+    estudiante_ids = db.session.execute(
+        select(Estudiante.id).where(Estudiante.colegio_id == colegio.id)
+    ).scalars().all()
+
+    indicador_ids = []
+    for indice_materia in range(materias):
+        materia = Materia(nombre=f"Materia benchmark {indice_materia}")
+        db.session.add(materia)
+        db.session.flush()
+
+        for indice_competencia in range(competencias):
+            # La última materia sin pesos: ejercita el promedio simple
+            competencia = CompetenciaMateria(
+                materia_id=materia.id,
+                nombre=f"Competencia {indice_materia}.{indice_competencia}",
+                peso_porcentual=None if indice_materia == materias - 1 else 100 / competencias,
+                orden=indice_competencia
+            )
+            db.session.add(competencia)
+            db.session.flush()
+
+            nuevos = [
+                IndicadorLogro(competencia_id=competencia.id, descripcion="Indicador benchmark", peso_porcentual=100 / indicadores)
+                for _ in range(indicadores)
+            ]
+            db.session.add_all(nuevos)
+            db.session.flush()
+            indicador_ids.extend(indicador.id for indicador in nuevos)
+
+    db.session.execute(insert(EvaluacionEstudiante), [
+        {
+            "estudiante_id": estudiante_id,
+            "indicador_id": indicador_id,
+            "periodo_id": periodo.id,
+            "calificacion": round(generador.uniform(1, 5), 1),
+        }
+        for estudiante_id in estudiante_ids
+        for indicador_id in indicador_ids
+    ])
+
+    return colegio.id, periodo.id, "BENCH", estudiante_ids
+
+
+def _medir(funcion):
+    """(resultado, segundos, consultas) de `funcion()` con la sesión vacía"""
+    consultas = [0]
+
+    def _contar(*args):
+        consultas[0] += 1
+
+    db.session.expire_all()
+    event.listen(db.engine, "before_cursor_execute", _contar)
+    try:
+        inicio = time.perf_counter()
+        resultado = funcion()
+        segundos = time.perf_counter() - inicio
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _contar)
+
+    return resultado, segundos, consultas[0]
+
+
+def medir_boletines(estudiantes, materias=8, competencias=3, indicadores=4):
+    """
+    Compara calcular_boletin_grupo con boletin_por_estudiante sobre un
+    grado sintético. Los datos se crean en la transacción de db.session y
+    se descartan con rollback al terminar.
+
+    Returns: {"notas", "motor": (s, consultas), "por_estudiante": (s, consultas), "diferencia"}
+    """
+    try:
+        colegio_id, periodo_id, grado, estudiante_ids = _poblar_benchmark(
+            estudiantes, materias, competencias, indicadores
+        )
+
+        boletin, segundos_motor, consultas_motor = _medir(
+            lambda: calcular_boletin_grupo(colegio_id, periodo_id, grado, "A")
+        )
+        referencia, segundos_ref, consultas_ref = _medir(
+            lambda: {estudiante_id: boletin_por_estudiante(estudiante_id, periodo_id) for estudiante_id in estudiante_ids}
+        )
+
+        # Mayor diferencia entre ambos cálculos: a lo sumo medio centésimo,
+        # porque el motor publica las notas con DECIMALES
+        diferencia = max(
+            (
+                abs(nota.promedio - referencia[estudiante.estudiante_id][materia_id])
+                for estudiante in boletin.estudiantes
+                for materia_id, nota in estudiante.materias.items()
+            ),
+            default=0.0
+        )
+    finally:
+        db.session.rollback()
+
+    return {
+        "notas": estudiantes * materias * competencias * indicadores,
+        "motor": (segundos_motor, consultas_motor),
+        "por_estudiante": (segundos_ref, consultas_ref),
+        "diferencia": diferencia,
+    }
+
+
+def init_app(app):
+    """Registra `flask benchmark-boletines`"""
+
+    @app.cli.command("benchmark-boletines")
+    @click.option("--estudiantes", default="40,1000",
+                  help="Tamaños de grupo separados por coma")
+    @click.option("--materias", type=int, default=8)
+    @click.option("--competencias", type=int, default=3, help="Competencias por materia")
+    @click.option("--indicadores", type=int, default=4, help="Indicadores por competencia")
+    def benchmark_boletines_command(estudiantes, materias, competencias, indicadores):
+        """Motor vectorizado vs. un cálculo por estudiante (datos sintéticos, con rollback)"""
+        print(f"{materias} materias x {competencias} competencias x {indicadores} indicadores por estudiante")
+        print(f"{'estudiantes':>12}{'notas':>10}{'motor s':>10}{'consultas':>11}"
+              f"{'por est. s':>12}{'consultas':>11}{'dif. máx':>10}")
+
+        for tamano in (int(t) for t in estudiantes.split(",") if t.strip()):
+            resultado = medir_boletines(tamano, materias, competencias, indicadores)
+            (s_motor, c_motor), (s_ref, c_ref) = resultado["motor"], resultado["por_estudiante"]
+            print(f"{tamano:>12}{resultado['notas']:>10}{s_motor:>10.3f}{c_motor:>11}"
+                  f"{s_ref:>12.3f}{c_ref:>11}{resultado['diferencia']:>10.3f}")
@@ -0,0 +1,316 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.utils.poda import PodaPeriodica
+
+
+# ════════════════════════════════════════════════════════════════
+# BACKENDS
+# ════════════════════════════════════════════════════════════════
+
+class MemoriaBackend:
+    """
+    Cache LRU en memoria del proceso con expiración por TTL.
+
+    Cada worker de gunicorn tiene su propia copia: es el backend más rápido,
+    pero una invalidación solo afecta al worker que la ejecuta.
+    """
+
+    nombre = "memoria"
+
+    def __init__(self, max_entradas=1024):
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+
+            valor, expira = entrada
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return None
+
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor, ttl):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + ttl)
+            self._datos.move_to_end(clave)
+
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def delete(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class SQLiteBackend:
+    """
+    Cache compartida entre procesos de la misma máquina sobre un archivo SQLite.
+
+    Todos los workers de gunicorn leen y escriben el mismo archivo, así que una
+    invalidación hecha por un worker es visible de inmediato para los demás.
+    Los valores se guardan como JSON.
+    """
+
+    nombre = "sqlite"
+
+    def __init__(self, ruta=None, max_entradas=10000):
+        self.ruta = ruta or os.path.join(
+            tempfile.gettempdir(),
+            "sistprof_cache.sqlite3"
+        )
+        self.max_entradas = max_entradas
+        self._poda = PodaPeriodica()
+        self._local = threading.local()
+
+    def _conexion(self):
+        # Una conexión por hilo y por proceso (gunicorn hace fork de los workers)
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is not None and self._local.pid == os.getpid():
+            return conexion
+
+        conexion = sqlite3.connect(
+            self.ruta,
+            timeout=5,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        conexion.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " clave TEXT PRIMARY KEY,"
+            " valor TEXT NOT NULL,"
+            " expira REAL NOT NULL)"
+        )
+
+        self._local.conexion = conexion
+        self._local.pid = os.getpid()
+        return conexion
+
+    def get(self, clave):
+        fila = self._conexion().execute(
+            "SELECT valor, expira FROM cache WHERE clave = ?",
+            (clave,)
+        ).fetchone()
+
+        if fila is None:
+            return None
+
+        valor, expira = fila
+        if expira < time.time():
+            self.delete(clave)
+            return None
+
+        return json.loads(valor)
+
+    def set(self, clave, valor, ttl):
+        conexion = self._conexion()
+        conexion.execute(
+            "INSERT OR REPLACE INTO cache (clave, valor, expira) VALUES (?, ?, ?)",
+            (clave, json.dumps(valor), time.time() + ttl)
+        )
+
+        # Poda ocasional para que el archivo no crezca sin límite
+        if self.max_entradas and self._poda.toca():
+            self._podar(conexion)
+
+    def _podar(self, conexion):
+        """Borra las entradas vencidas y, sobre `max_entradas`, las que vencen antes"""
+        conexion.execute(
+            "DELETE FROM cache WHERE expira < ?",
+            (time.time(),)
+        )
+        conexion.execute(
+            "DELETE FROM cache WHERE clave IN ("
+            " SELECT clave FROM cache ORDER BY expira DESC LIMIT -1 OFFSET ?)",
+            (self.max_entradas,)
+        )
+
+    def delete(self, clave):
+        self._conexion().execute(
+            "DELETE FROM cache WHERE clave = ?",
+            (clave,)
+        )
+
+    def clear(self):
+        self._conexion().execute("DELETE FROM cache")
+
+    def __len__(self):
+        return self._conexion().execute(
+            "SELECT COUNT(*) FROM cache"
+        ).fetchone()[0]
+
+
+BACKENDS = {
+    MemoriaBackend.nombre: MemoriaBackend,
+    SQLiteBackend.nombre: SQLiteBackend,
+}
+
+
+# ════════════════════════════════════════════════════════════════
+# CACHE DE CONTADORES POR COLEGIO
+# ════════════════════════════════════════════════════════════════
+
+CLAVE_GLOBAL = "global"
+
+
+class ContadorCache:
+    """
+    Cache de contadores por colegio (tenant) con invalidación automática.
+
+    Los eventos after_insert/after_update/after_delete de los modelos
+    registrados marcan el colegio afectado; la entrada se borra cuando la
+    sesión hace commit, para no dejar que otra petición vuelva a cachear
+    datos que aún no son visibles.
+
+    Configuración (config.Config):
+        CONTADORES_CACHE_BACKEND: "memoria" (defecto) o "sqlite"
+        CONTADORES_CACHE_TTL: segundos de vida de cada entrada
+        CONTADORES_CACHE_RUTA: archivo del backend sqlite
+    """
+
+    def __init__(self, app=None):
+        self.backend = MemoriaBackend()
+        self.ttl = 300
+        self._lock = threading.Lock()
+        self._metricas = {"hits": 0, "misses": 0, "invalidaciones": 0}
+        self._modelos_globales = set()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        nombre = app.config.get("CONTADORES_CACHE_BACKEND", "memoria")
+
+        if nombre not in BACKENDS:
+            raise ValueError(f"Backend de cache desconocido: {nombre}")
+
+        if nombre == SQLiteBackend.nombre:
+            self.backend = SQLiteBackend(app.config.get("CONTADORES_CACHE_RUTA"))
+        else:
+            self.backend = MemoriaBackend()
+
+        self.ttl = app.config.get("CONTADORES_CACHE_TTL", 300)
+        app.extensions["contadores_cache"] = self
+
+    # --------------------
+    # Lectura / escritura
+    # --------------------
+
+    @staticmethod
+    def _clave(colegio_id):
+        return f"contadores:{colegio_id}"
+
+    def obtener(self, colegio_id):
+        valor = self.backend.get(self._clave(colegio_id))
+        self._contar("hits" if valor is not None else "misses")
+        return valor
+
+    def guardar(self, colegio_id, valor):
+        self.backend.set(self._clave(colegio_id), valor, self.ttl)
+
+    def obtener_o_calcular(self, colegio_id, calcular):
+        """Devuelve el valor cacheado o lo calcula con `calcular()` y lo guarda"""
+        valor = self.obtener(colegio_id)
+        if valor is None:
+            valor = calcular()
+            if valor is not None:
+                self.guardar(colegio_id, valor)
+        return valor
+
+    def invalidar(self, *colegio_ids):
+        for colegio_id in colegio_ids:
+            self.backend.delete(self._clave(colegio_id))
+            self._contar("invalidaciones")
+
+    # --------------------
+    # Métricas
+    # --------------------
+
+    def _contar(self, metrica):
+        with self._lock:
+            self._metricas[metrica] += 1
+
+    def metricas(self):
+        """Hits/misses de este worker y tamaño actual del backend"""
+        with self._lock:
+            datos = dict(self._metricas)
+
+        consultas = datos["hits"] + datos["misses"]
+        datos["hit_ratio"] = round(datos["hits"] / consultas, 4) if consultas else 0.0
+        datos["backend"] = self.backend.nombre
+        datos["entradas"] = len(self.backend)
+        datos["ttl"] = self.ttl
+        datos["pid"] = os.getpid()
+        return datos
+
+    # --------------------
+    # Invalidación por eventos SQLAlchemy
+    # --------------------
+
+    def registrar_modelos(self, *modelos, global_tambien=False):
+        """
+        Escucha los cambios de `modelos` e invalida el colegio afectado.
+
+        Con global_tambien=True también se invalida la entrada global
+        (estadísticas de la plataforma para el superadmin).
+        """
+        for modelo in modelos:
+            for nombre_evento in ("after_insert", "after_update", "after_delete"):
+                if not event.contains(modelo, nombre_evento, self._marcar_cambio):
+                    event.listen(modelo, nombre_evento, self._marcar_cambio)
+
+            if global_tambien:
+                self._modelos_globales.add(modelo)
+
+        if not event.contains(Session, "after_commit", self._aplicar_invalidaciones):
+            event.listen(Session, "after_commit", self._aplicar_invalidaciones)
+            event.listen(Session, "after_soft_rollback", self._descartar_invalidaciones)
+
+    def _marcar_cambio(self, mapper, connection, target):
+        sesion = inspect(target).session
+        if sesion is None:
+            return
+
+        pendientes = sesion.info.setdefault("contadores_invalidar", set())
+
+        if hasattr(target, "colegio_id"):
+            historial = inspect(target).attrs.colegio_id.history
+            for colegio_id in (*historial.added, *historial.unchanged, *historial.deleted):
+                if colegio_id is not None:
+                    pendientes.add(colegio_id)
+
+        if type(target) in self._modelos_globales:
+            pendientes.add(CLAVE_GLOBAL)
+
+    def _aplicar_invalidaciones(self, sesion):
+        pendientes = sesion.info.pop("contadores_invalidar", None)
+        if pendientes:
+            self.invalidar(*pendientes)
+
+    def _descartar_invalidaciones(self, sesion, transaccion_previa):
+        if transaccion_previa.parent is None:
+            sesion.info.pop("contadores_invalidar", None)
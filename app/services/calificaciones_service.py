@@ -0,0 +1,299 @@
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import select, tuple_
+
+from app.extensions import db
+from app.models.clase import Clase
+from app.models.clase_estudiante import ClaseEstudiante
+from app.models.estudiante import Estudiante
+from app.models.evaluacion_estudiante import EvaluacionEstudiante
+from app.models.indicador_logro import IndicadorLogro
+from app.models.competencia_materia import CompetenciaMateria
+from app.services.boletin_service import obtener_cierre
+from app.utils.sql import insert_con_conflicto
+
+# Escala de calificaciones (evaluaciones_estudiante.calificacion)
+NOTA_MINIMA = Decimal("0")
+NOTA_MAXIMA = Decimal("5")
+
+# Celdas aceptadas por petición (40 estudiantes x 50 indicadores)
+MAX_CAMBIOS_POR_LOTE = 2000
+
+# Resultado por celda
+GUARDADA = "guardada"
+CONFLICTO = "conflicto"
+INVALIDA = "invalida"
+
+
+# ════════════════════════════════════════════════════════════════
+# MATRIZ (lectura)
+# ════════════════════════════════════════════════════════════════
+
+def obtener_clase(clase_id, colegio_id):
+    return Clase.query.filter_by(
+        id=clase_id,
+        colegio_id=colegio_id
+    ).first()
+
+
+def _estudiantes(clase):
+    """
+    Filas de la matriz: los matriculados en la clase o, si la clase no
+    tiene matrícula, los estudiantes activos de su grado/grupo.
+    """
+    columnas = (Estudiante.id, Estudiante.nombre)
+    orden = (Estudiante.nombre, Estudiante.id)
+
+    filas = db.session.execute(
+        select(*columnas)
+        .join(ClaseEstudiante, ClaseEstudiante.estudiante_id == Estudiante.id)
+        .where(ClaseEstudiante.clase_id == clase.id)
+        .order_by(*orden)
+    ).all()
+
+    if not filas:
+        filas = db.session.execute(
+            select(*columnas)
+            .where(
+                Estudiante.colegio_id == clase.colegio_id,
+                Estudiante.activo.is_(True),
+                Estudiante.grado == clase.grado,
+                Estudiante.grupo == clase.grupo
+            )
+            .order_by(*orden)
+        ).all()
+
+    return [tuple(fila) for fila in filas]
+
+
+def _indicadores(clase):
+    """Columnas de la matriz: indicadores de la materia, en el orden del plan"""
+    if clase.materia_id is None:
+        return []
+
+    return db.session.execute(
+        select(
+            IndicadorLogro.id,
+            IndicadorLogro.descripcion,
+            CompetenciaMateria.id,
+            CompetenciaMateria.nombre
+        )
+        .join(CompetenciaMateria, CompetenciaMateria.id == IndicadorLogro.competencia_id)
+        .where(CompetenciaMateria.materia_id == clase.materia_id)
+        .order_by(
+            CompetenciaMateria.orden,
+            CompetenciaMateria.id,
+            IndicadorLogro.orden,
+            IndicadorLogro.id
+        )
+    ).all()
+
+
+def obtener_matriz(clase, periodo_id):
+    """
+    Matriz estudiantes x indicadores de una clase y periodo en un solo payload.
+
+    Las celdas van en formato disperso (solo las que tienen evaluación),
+    cada una con su versión para la concurrencia optimista. Son tres
+    consultas (cuatro si la clase no tiene matrícula) sin importar el
+    tamaño de la matriz.
+
+    Returns:
+        {"clase", "periodo_id", "cerrado", "estudiantes": [[id, nombre]],
+         "indicadores": [[id, competencia_id, descripcion]],
+         "competencias": [[id, nombre]],
+         "celdas": [[estudiante_id, indicador_id, calificacion, version]]}
+    """
+    estudiantes = _estudiantes(clase)
+    indicadores = _indicadores(clase)
+
+    celdas = []
+    if estudiantes and indicadores:
+        celdas = db.session.execute(
+            select(
+                EvaluacionEstudiante.estudiante_id,
+                EvaluacionEstudiante.indicador_id,
+                EvaluacionEstudiante.calificacion,
+                EvaluacionEstudiante.version
+            )
+            .where(
+                EvaluacionEstudiante.periodo_id == periodo_id,
+                EvaluacionEstudiante.estudiante_id.in_([estudiante_id for estudiante_id, _ in estudiantes]),
+                EvaluacionEstudiante.indicador_id.in_([fila[0] for fila in indicadores])
+            )
+        ).all()
+
+    competencias = {}
+    for _, _, competencia_id, nombre in indicadores:
+        competencias.setdefault(competencia_id, nombre)
+
+    return {
+        "clase": {
+            "id": clase.id,
+            "materia": clase.materia,
+            "grado": clase.grado,
+            "grupo": clase.grupo,
+        },
+        "periodo_id": periodo_id,
+        "cerrado": obtener_cierre(clase.colegio_id, periodo_id) is not None,
+        "estudiantes": [list(fila) for fila in estudiantes],
+        "indicadores": [
+            [indicador_id, competencia_id, descripcion]
+            for indicador_id, descripcion, competencia_id, _ in indicadores
+        ],
+        "competencias": [[competencia_id, nombre] for competencia_id, nombre in competencias.items()],
+        "celdas": [
+            [estudiante_id, indicador_id, _numero(calificacion), version]
+            for estudiante_id, indicador_id, calificacion, version in celdas
+        ],
+    }
+
+
+def _numero(calificacion):
+    return float(calificacion) if calificacion is not None else None
+
+
+# ════════════════════════════════════════════════════════════════
+# CAMBIOS (escritura en lote)
+# ════════════════════════════════════════════════════════════════
+
+def _leer_calificacion(valor):
+    """Decimal redondeado a 2 decimales dentro de la escala; None borra la nota"""
+    if valor is None or valor == "":
+        return None, True
+    try:
+        nota = Decimal(str(valor)).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return None, False
+    # "NaN" pasa el quantize y no se puede comparar con la escala
+    if not nota.is_finite():
+        return None, False
+    return nota, NOTA_MINIMA <= nota <= NOTA_MAXIMA
+
+
+def _entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def aplicar_cambios(clase, periodo_id, cambios):
+    """
+    Aplica un diff disperso de celdas de la matriz en UN upsert.
+
+    Cada cambio es {"estudiante_id", "indicador_id", "calificacion",
+    "version"}, donde version es la que el cliente leyó (0 para una celda
+    vacía). La celda solo se escribe si nadie la cambió desde entonces:
+    INSERT ... ON CONFLICT DO UPDATE ... WHERE version = la leída. Las que
+    no cumplen vuelven como "conflicto" con su valor y versión actuales
+    para que el cliente las muestre sin recargar la matriz.
+
+    Returns: resultados en el orden de `cambios`, cada uno con
+    "estudiante_id", "indicador_id", "resultado" y, si no es inválido,
+    "calificacion" y "version" vigentes.
+    """
+    estudiantes = {estudiante_id for estudiante_id, _ in _estudiantes(clase)}
+    indicadores = {fila[0] for fila in _indicadores(clase)}
+
+    resultados = []
+    filas = {}
+    for cambio in cambios:
+        estudiante_id = _entero(cambio.get("estudiante_id"))
+        indicador_id = _entero(cambio.get("indicador_id"))
+        version = _entero(cambio.get("version") or 0)
+        calificacion, valida = _leer_calificacion(cambio.get("calificacion"))
+
+        resultado = {"estudiante_id": estudiante_id, "indicador_id": indicador_id}
+        resultados.append(resultado)
+
+        clave = (estudiante_id, indicador_id)
+        if (
+            not valida
+            or version is None or version < 0
+            or estudiante_id not in estudiantes
+            or indicador_id not in indicadores
+            or clave in filas
+        ):
+            resultado["resultado"] = INVALIDA
+            continue
+
+        filas[clave] = {
+            "estudiante_id": estudiante_id,
+            "indicador_id": indicador_id,
+            "periodo_id": periodo_id,
+            "clase_id": clase.id,
+            "calificacion": calificacion,
+            # La versión que quedará si el cambio se aplica
+            "version": version + 1,
+        }
+
+    aplicadas = {}
+    if filas:
+        tabla = EvaluacionEstudiante.__table__
+        stmt = insert_con_conflicto(tabla).values(list(filas.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["estudiante_id", "indicador_id", "periodo_id"],
+            set_={
+                "calificacion": stmt.excluded.calificacion,
+                "clase_id": stmt.excluded.clase_id,
+                "version": tabla.c.version + 1,
+            },
+            where=tabla.c.version == stmt.excluded.version - 1
+        ).returning(
+            tabla.c.estudiante_id,
+            tabla.c.indicador_id,
+            tabla.c.calificacion,
+            tabla.c.version
+        )
+
+        aplicadas = {
+            (estudiante_id, indicador_id): (calificacion, version)
+            for estudiante_id, indicador_id, calificacion, version in db.session.execute(stmt)
+        }
+
+    # Celdas que otro usuario cambió primero: una consulta para sus valores actuales
+    conflictos = [clave for clave in filas if clave not in aplicadas]
+    actuales = {}
+    if conflictos:
+        actuales = {
+            (estudiante_id, indicador_id): (calificacion, version)
+            for estudiante_id, indicador_id, calificacion, version in db.session.execute(
+                select(
+                    EvaluacionEstudiante.estudiante_id,
+                    EvaluacionEstudiante.indicador_id,
+                    EvaluacionEstudiante.calificacion,
+                    EvaluacionEstudiante.version
+                )
+                .where(
+                    EvaluacionEstudiante.periodo_id == periodo_id,
+                    tuple_(EvaluacionEstudiante.estudiante_id, EvaluacionEstudiante.indicador_id).in_(conflictos)
+                )
+            )
+        }
+
+    db.session.commit()
+
+    for resultado in resultados:
+        if "resultado" in resultado:
+            continue
+
+        clave = (resultado["estudiante_id"], resultado["indicador_id"])
+        if clave in aplicadas:
+            calificacion, version = aplicadas[clave]
+            resultado["resultado"] = GUARDADA
+        else:
+            calificacion, version = actuales.get(clave, (None, 0))
+            resultado["resultado"] = CONFLICTO
+
+        resultado.update(calificacion=_numero(calificacion), version=version)
+
+    return resultados
+
+
+def resumir(resultados):
+    """Cuántas celdas hubo de cada resultado"""
+    resumen = {GUARDADA: 0, CONFLICTO: 0, INVALIDA: 0}
+    for resultado in resultados:
+        resumen[resultado["resultado"]] += 1
+    return resumen
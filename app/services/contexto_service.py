@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import namedtuple
+
+from flask import g
+from flask_login import current_user
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+# Lo que las vistas y decoradores necesitan saber del usuario en cada petición
+ContextoTenant = namedtuple(
+    "ContextoTenant",
+    ["usuario_id", "colegio_id", "colegio_nombre", "rol", "puede_acceder", "razon"]
+)
+
+CONTEXTO_ANONIMO = ContextoTenant(None, None, None, None, False, "Sin sesión")
+
+# Columnas que no se copian al snapshot (no hacen falta fuera del login)
+COLUMNAS_EXCLUIDAS = ("password_hash",)
+
+# Snapshot de un usuario: columnas del usuario y de su colegio (o None)
+EntradaUsuario = namedtuple("EntradaUsuario", ["usuario", "colegio", "vence"])
+
+
+class CacheUsuarios:
+    """
+    Carga del usuario de la sesión (user_loader) con su colegio, uno por worker.
+
+    - Sin cache, el usuario y su colegio salen de UNA consulta con join
+      (antes: get del usuario y otra consulta al tocar current_user.colegio).
+    - Con CONTEXTO_USUARIO_TTL > 0 se guarda un snapshot de ambas filas
+      por id de usuario y, mientras no venza, cada petición reconstruye
+      objetos desasociados de la sesión sin ir a la base. Solo sirven para
+      leer (id, rol, colegio_id, colegio.nombre...), que es lo que hacen
+      las vistas con current_user.
+    - Un cambio a un Usuario o Colegio descarta sus entradas al hacer
+      commit. Otros workers no ven esa invalidación: por eso el TTL debe
+      ser corto (una desactivación tarda a lo sumo eso en aplicarse allí).
+
+    Configuración (config.Config):
+        CONTEXTO_USUARIO_TTL: segundos de vida del snapshot (0 = sin cache)
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 30
+        self._entradas = {}
+        self._lock = threading.Lock()
+        self._usuario = None
+        self._colegio = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("CONTEXTO_USUARIO_TTL", 30)
+        app.extensions["cache_usuarios"] = self
+
+    # --------------------
+    # Carga
+    # --------------------
+
+    def cargar(self, usuario_id):
+        """Usuario con su colegio ya cargado, o None si no existe"""
+        if self.ttl > 0:
+            with self._lock:
+                entrada = self._entradas.get(usuario_id)
+            if entrada is not None and entrada.vence > time.monotonic():
+                return self._reconstruir(entrada)
+
+        from app.extensions import db
+
+        usuario = db.session.execute(
+            select(self._usuario)
+            .options(joinedload(self._usuario.colegio))
+            .where(self._usuario.id == usuario_id)
+        ).scalar_one_or_none()
+
+        if usuario is not None and self.ttl > 0:
+            entrada = EntradaUsuario(
+                self._columnas(usuario),
+                self._columnas(usuario.colegio) if usuario.colegio is not None else None,
+                time.monotonic() + self.ttl
+            )
+            with self._lock:
+                self._entradas[usuario_id] = entrada
+
+        return usuario
+
+    @staticmethod
+    def _columnas(objeto):
+        return {
+            atributo.key: getattr(objeto, atributo.key)
+            for atributo in inspect(objeto).mapper.column_attrs
+            if atributo.key not in COLUMNAS_EXCLUIDAS
+        }
+
+    def _reconstruir(self, entrada):
+        # Objetos nuevos en cada petición: ningún estado compartido entre hilos
+        usuario = self._usuario(**entrada.usuario)
+        make_transient_to_detached(usuario)
+
+        colegio = None
+        if entrada.colegio is not None:
+            colegio = self._colegio(**entrada.colegio)
+            make_transient_to_detached(colegio)
+
+        # Sin backref: colegio.usuarios no debe quedar como [usuario]
+        set_committed_value(usuario, "colegio", colegio)
+        return usuario
+
+    # --------------------
+    # Invalidación
+    # --------------------
+
+    def invalidar_usuarios(self, *usuario_ids):
+        with self._lock:
+            for usuario_id in usuario_ids:
+                self._entradas.pop(usuario_id, None)
+
+    def invalidar_colegios(self, *colegio_ids):
+        colegio_ids = set(colegio_ids)
+        with self._lock:
+            for usuario_id, entrada in list(self._entradas.items()):
+                if entrada.usuario.get("colegio_id") in colegio_ids:
+                    del self._entradas[usuario_id]
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def registrar_modelos(self, usuario, colegio):
+        """Carga `usuario` (Usuario) con `colegio` (Colegio) y escucha sus cambios"""
+        self._usuario = usuario
+        self._colegio = colegio
+
+        for modelo in (usuario, colegio):
+            for nombre_evento in ("after_update", "after_delete"):
+                if not event.contains(modelo, nombre_evento, self._marcar_cambio):
+                    event.listen(modelo, nombre_evento, self._marcar_cambio)
+
+        if not event.contains(Session, "after_commit", self._aplicar_invalidaciones):
+            event.listen(Session, "after_commit", self._aplicar_invalidaciones)
+            event.listen(Session, "after_soft_rollback", self._descartar_invalidaciones)
+
+    def _marcar_cambio(self, mapper, connection, target):
+        sesion = inspect(target).session
+        if sesion is None:
+            return
+
+        tipo = "usuario" if isinstance(target, self._usuario) else "colegio"
+        sesion.info.setdefault("usuarios_invalidar", set()).add((tipo, target.id))
+
+    def _aplicar_invalidaciones(self, sesion):
+        pendientes = sesion.info.pop("usuarios_invalidar", None)
+        if pendientes:
+            self.invalidar_usuarios(*(id_ for tipo, id_ in pendientes if tipo == "usuario"))
+            self.invalidar_colegios(*(id_ for tipo, id_ in pendientes if tipo == "colegio"))
+
+    def _descartar_invalidaciones(self, sesion, transaccion_previa):
+        if transaccion_previa.parent is None:
+            sesion.info.pop("usuarios_invalidar", None)
+
+
+# ════════════════════════════════════════════════════════════════
+# CONTEXTO DE LA PETICIÓN
+# ════════════════════════════════════════════════════════════════
+
+def contexto_actual():
+    """
+    Usuario, colegio, rol y veredicto de acceso de la petición en curso.
+
+    Se arma una sola vez por petición (queda en g) a partir de
+    current_user, que ya trae el colegio: ni el decorador de acceso ni
+    las plantillas vuelven a consultar.
+    """
+    if "contexto_tenant" not in g:
+        g.contexto_tenant = _armar_contexto(current_user)
+    return g.contexto_tenant
+
+
+def _armar_contexto(usuario):
+    if not usuario or not usuario.is_authenticated:
+        return CONTEXTO_ANONIMO
+
+    puede_acceder, razon = usuario.puede_acceder()
+    colegio = usuario.colegio
+
+    return ContextoTenant(
+        usuario.id,
+        usuario.colegio_id,
+        colegio.nombre if colegio is not None else None,
+        usuario.rol,
+        puede_acceder,
+        razon
+    )
@@ -0,0 +1,153 @@
+from dataclasses import dataclass, asdict
+from datetime import datetime, date
+
+from sqlalchemy import select, func, case, and_, true
+from sqlalchemy.orm import joinedload, raiseload
+
+from app.extensions import db, contadores_cache
+from app.models.colegio import Colegio
+from app.models.sede import Sede
+from app.models.jornada import Jornada
+from app.models.docente import Docente
+from app.models.estudiante import Estudiante
+from app.models.permiso import Permiso
+
+
+@dataclass(frozen=True)
+class EstadisticasColegio:
+    """Contadores del dashboard de un colegio (resultado de una sola consulta)"""
+    colegio: Colegio
+    hoy: date
+    total_sedes: int = 0
+    total_jornadas: int = 0
+    total_docentes: int = 0
+    total_estudiantes: int = 0
+    total_permisos: int = 0
+    permisos_activos: int = 0
+    permisos_pendientes: int = 0
+
+    def contadores(self):
+        """Solo los contadores (serializable para la cache)"""
+        datos = asdict(self)
+        datos.pop("colegio")
+        datos["hoy"] = self.hoy.isoformat()
+        return datos
+
+
+def _contar_activos(modelo, colegio_id):
+    """Subconsulta escalar: registros activos de un modelo para el colegio"""
+    return (
+        select(func.count(modelo.id))
+        .where(
+            modelo.colegio_id == colegio_id,
+            modelo.activo.is_(True)
+        )
+        .scalar_subquery()
+    )
+
+
+def obtener_estadisticas_colegio(colegio_id, hoy=None):
+    """
+    Contadores del dashboard de un colegio, servidos desde la cache por tenant.
+
+    En un hit solo se carga el colegio por clave primaria; en un miss se
+    ejecuta el SELECT agregado y el resultado queda cacheado hasta que un
+    cambio en sedes/jornadas/docentes/estudiantes/permisos lo invalide.
+
+    Retorna: EstadisticasColegio o None si el colegio no existe.
+    """
+    hoy = hoy or datetime.utcnow().date()
+
+    contadores = contadores_cache.obtener(colegio_id)
+
+    # Los permisos activos/pendientes dependen del día: una entrada de ayer no sirve
+    if contadores is not None and contadores.get("hoy") == hoy.isoformat():
+        colegio = db.session.get(Colegio, colegio_id)
+        if colegio is None:
+            return None
+
+        contadores = dict(contadores, hoy=hoy)
+        return EstadisticasColegio(colegio=colegio, **contadores)
+
+    estadisticas = calcular_estadisticas_colegio(colegio_id, hoy)
+
+    if estadisticas is not None:
+        contadores_cache.guardar(colegio_id, estadisticas.contadores())
+
+    return estadisticas
+
+
+def calcular_estadisticas_colegio(colegio_id, hoy=None):
+    """
+    Calcula todos los contadores del dashboard en UN solo SELECT.
+
+    Sedes, jornadas, docentes y estudiantes activos se resuelven como
+    subconsultas escalares; los permisos (total/activos/pendientes) como
+    agregados condicionales sobre una única pasada de la tabla.
+
+    Retorna: EstadisticasColegio o None si el colegio no existe.
+    """
+    hoy = hoy or datetime.utcnow().date()
+
+    permisos = (
+        select(
+            func.count(Permiso.id).label("total"),
+            func.count(
+                case(
+                    (and_(Permiso.fecha_inicio <= hoy, Permiso.fecha_fin >= hoy), Permiso.id)
+                )
+            ).label("activos"),
+            func.count(
+                case(
+                    (Permiso.fecha_inicio > hoy, Permiso.id)
+                )
+            ).label("pendientes")
+        )
+        .where(Permiso.colegio_id == colegio_id)
+        .subquery()
+    )
+
+    stmt = (
+        select(
+            Colegio,
+            _contar_activos(Sede, colegio_id).label("total_sedes"),
+            _contar_activos(Jornada, colegio_id).label("total_jornadas"),
+            _contar_activos(Docente, colegio_id).label("total_docentes"),
+            _contar_activos(Estudiante, colegio_id).label("total_estudiantes"),
+            permisos.c.total,
+            permisos.c.activos,
+            permisos.c.pendientes
+        )
+        .join(permisos, true())
+        .where(Colegio.id == colegio_id)
+    )
+
+    fila = db.session.execute(stmt).first()
+
+    if fila is None:
+        return None
+
+    return EstadisticasColegio(
+        colegio=fila.Colegio,
+        hoy=hoy,
+        total_sedes=fila.total_sedes or 0,
+        total_jornadas=fila.total_jornadas or 0,
+        total_docentes=fila.total_docentes or 0,
+        total_estudiantes=fila.total_estudiantes or 0,
+        total_permisos=fila.total or 0,
+        permisos_activos=fila.activos or 0,
+        permisos_pendientes=fila.pendientes or 0
+    )
+
+
+def obtener_ultimos_permisos(colegio_id, limite=5):
+    """Últimos permisos del colegio con su docente cargado en el mismo SELECT"""
+    return (
+        Permiso.query
+        .options(joinedload(Permiso.docente), raiseload("*"))
+        .filter_by(colegio_id=colegio_id)
+        .order_by(Permiso.fecha_inicio.desc())
+        .limit(limite)
+        .all()
+    )
+
@@ -0,0 +1,62 @@
+from sqlalchemy import select, exists
+
+from app.extensions import db
+
+# modelo -> [(tabla, columna)] que apuntan a su clave primaria
+_REFERENCIAS = {}
+
+
+def _referencias(modelo):
+    """
+    Columnas de otras tablas con clave foránea hacia `modelo`.
+
+    Se descubren desde los metadatos de SQLAlchemy, así que una tabla nueva
+    que referencie estudiantes o docentes queda cubierta sin tocar este módulo.
+    """
+    if modelo not in _REFERENCIAS:
+        tabla_modelo = modelo.__table__
+        referencias = []
+
+        for tabla in db.metadata.sorted_tables:
+            if tabla is tabla_modelo:
+                continue
+            for fk in tabla.foreign_keys:
+                if fk.references(tabla_modelo):
+                    referencias.append((tabla, fk.parent))
+
+        _REFERENCIAS[modelo] = referencias
+
+    return _REFERENCIAS[modelo]
+
+
+def obtener_dependencias(modelo, registro_id):
+    """
+    Tablas que tienen filas apuntando al registro, en UNA sola consulta.
+
+    Cada tabla se resuelve con un EXISTS (se detiene en la primera fila
+    encontrada), así que el coste no depende del tamaño del historial.
+
+    Retorna: lista con los nombres de las tablas dependientes (vacía si no hay).
+    """
+    referencias = _referencias(modelo)
+    if not referencias:
+        return []
+
+    stmt = select(*[
+        exists().where(columna == registro_id).label(f"{tabla.name}__{columna.name}")
+        for tabla, columna in referencias
+    ])
+
+    fila = db.session.execute(stmt).one()
+
+    dependencias = []
+    for (tabla, _), existe in zip(referencias, fila):
+        if existe and tabla.name not in dependencias:
+            dependencias.append(tabla.name)
+
+    return dependencias
+
+
+def tiene_dependientes(modelo, registro_id):
+    """True si alguna tabla referencia al registro"""
+    return bool(obtener_dependencias(modelo, registro_id))
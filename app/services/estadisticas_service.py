@@ -0,0 +1,333 @@
+import os
+import threading
+import time
+from datetime import datetime, date, timedelta
+
+from sqlalchemy import select, func, case, and_
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db, contadores_cache
+from app.services.cache_service import CLAVE_GLOBAL
+from app.models.usuario import Usuario
+from app.models.colegio import Colegio
+from app.models.docente import Docente
+from app.models.estudiante import Estudiante
+from app.models.permiso import Permiso
+from app.models.estadistica_plataforma import EstadisticaDiaria, EstadisticaColegio
+
+# Días que se reconstruyen la primera vez que corre el refresco
+DIAS_RECONSTRUCCION = 30
+
+CAMPOS_FOTO = (
+    "total_usuarios",
+    "superadmins",
+    "usuarios_aprobados",
+    "usuarios_pendientes",
+    "usuarios_activos",
+    "usuarios_bloqueados",
+    "total_colegios",
+    "total_permisos",
+)
+
+
+# ════════════════════════════════════════════════════════════════
+# LECTURA (lo que usan las vistas del superadmin)
+# ════════════════════════════════════════════════════════════════
+
+def obtener_estadisticas_plataforma():
+    """
+    Estadísticas globales del panel de superadmin.
+
+    Se leen de la fila más reciente del rollup (una lectura por clave) y se
+    guardan en la cache de contadores; si el rollup está vacío se refresca
+    en línea una única vez. Si aun así no hay foto (otro worker la está
+    creando) se devuelven ceros, sin guardarlos en la cache.
+    """
+    datos = contadores_cache.obtener_o_calcular(
+        CLAVE_GLOBAL,
+        _leer_ultima_foto
+    )
+    if datos is None:
+        datos = dict.fromkeys(CAMPOS_FOTO, 0)
+        datos.update(nuevos_usuarios=0, actualizado_en=None)
+    return datos
+
+
+def _ultima_foto():
+    return (
+        EstadisticaDiaria.query
+        .filter(EstadisticaDiaria.total_usuarios.isnot(None))
+        .order_by(EstadisticaDiaria.fecha.desc())
+        .first()
+    )
+
+
+def _leer_ultima_foto():
+    fila = _ultima_foto()
+
+    if fila is None:
+        try:
+            refrescar_estadisticas(forzar=True)
+        except IntegrityError:
+            # Otro worker creó la fila de hoy a la vez: vale la suya
+            db.session.rollback()
+        fila = _ultima_foto()
+
+    if fila is None:
+        return None
+
+    hoy = datetime.utcnow().date()
+    datos = {campo: getattr(fila, campo) or 0 for campo in CAMPOS_FOTO}
+
+    # Usuarios registrados en los últimos 7 días, sumando el rollup
+    datos["nuevos_usuarios"] = db.session.execute(
+        select(func.coalesce(func.sum(EstadisticaDiaria.nuevos_usuarios), 0))
+        .where(EstadisticaDiaria.fecha > hoy - timedelta(days=7))
+    ).scalar()
+
+    datos["actualizado_en"] = fila.actualizado_en.isoformat()
+    return datos
+
+
+def obtener_serie_diaria(dias=30):
+    """Filas del rollup de los últimos `dias` días, de la más antigua a la más reciente"""
+    desde = datetime.utcnow().date() - timedelta(days=dias - 1)
+
+    return (
+        EstadisticaDiaria.query
+        .filter(EstadisticaDiaria.fecha >= desde)
+        .order_by(EstadisticaDiaria.fecha)
+        .all()
+    )
+
+
+def obtener_top_colegios(limite=10):
+    """Colegios con más docentes según el último refresco"""
+    return (
+        EstadisticaColegio.query
+        .order_by(
+            EstadisticaColegio.docentes.desc(),
+            EstadisticaColegio.colegio_id
+        )
+        .limit(limite)
+        .all()
+    )
+
+
+# ════════════════════════════════════════════════════════════════
+# REFRESCO INCREMENTAL
+# ════════════════════════════════════════════════════════════════
+
+def refrescar_estadisticas(intervalo=0, forzar=False, ahora=None):
+    """
+    Actualiza el rollup de forma incremental.
+
+    - Los días ya cerrados no se vuelven a tocar: solo se recalculan desde
+      el último día registrado hasta hoy (o los últimos DIAS_RECONSTRUCCION
+      días si la tabla está vacía).
+    - La foto de estado (totales) se toma una vez por refresco y se guarda
+      en la fila de hoy.
+    - Si la fila de hoy se actualizó hace menos de `intervalo` segundos no
+      se hace nada (varios workers pueden intentar refrescar a la vez).
+
+    Retorna: True si se refrescó, False si se omitió.
+    """
+    ahora = ahora or datetime.utcnow()
+    hoy = ahora.date()
+
+    fila_hoy = db.session.get(EstadisticaDiaria, hoy)
+    if (
+        not forzar
+        and fila_hoy is not None
+        and fila_hoy.actualizado_en
+        and (ahora - fila_hoy.actualizado_en).total_seconds() < intervalo
+    ):
+        return False
+
+    ultimo = db.session.execute(
+        select(func.max(EstadisticaDiaria.fecha))
+    ).scalar()
+
+    desde = ultimo or hoy - timedelta(days=DIAS_RECONSTRUCCION - 1)
+
+    nuevos_usuarios = _contar_por_dia(
+        func.date(Usuario.fecha_registro, type_=db.Date),
+        Usuario.fecha_registro >= datetime.combine(desde, datetime.min.time())
+    )
+    permisos_iniciados = _contar_por_dia(
+        Permiso.fecha_inicio,
+        Permiso.fecha_inicio.between(desde, hoy)
+    )
+
+    existentes = {
+        fila.fecha: fila
+        for fila in EstadisticaDiaria.query.filter(EstadisticaDiaria.fecha >= desde)
+    }
+
+    # Sin autoflush: los INSERT de días nuevos salen juntos en el commit
+    with db.session.no_autoflush:
+        dia = desde
+        while dia <= hoy:
+            fila = existentes.get(dia)
+            if fila is None:
+                fila = existentes[dia] = EstadisticaDiaria(fecha=dia)
+                db.session.add(fila)
+
+            fila.nuevos_usuarios = nuevos_usuarios.get(dia, 0)
+            fila.permisos_iniciados = permisos_iniciados.get(dia, 0)
+            fila.actualizado_en = ahora
+            dia += timedelta(days=1)
+
+        fila_hoy = existentes[hoy]
+        for campo, valor in calcular_foto_plataforma().items():
+            setattr(fila_hoy, campo, valor)
+
+        _refrescar_colegios(ahora)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Otro worker insertó los mismos días primero: su refresco es igual de válido
+        db.session.rollback()
+        return False
+
+    return True
+
+
+def _contar_por_dia(columna_dia, condicion):
+    filas = db.session.execute(
+        select(columna_dia, func.count())
+        .where(condicion)
+        .group_by(columna_dia)
+    ).all()
+
+    return {_como_fecha(dia): total for dia, total in filas if dia is not None}
+
+
+def _como_fecha(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor))
+
+
+def calcular_foto_plataforma():
+    """Cuenta usuarios, colegios y permisos de toda la plataforma en un SELECT"""
+
+    def _contar_usuarios(*condiciones):
+        return func.count(case((and_(*condiciones), Usuario.id)))
+
+    stmt = select(
+        func.count(Usuario.id).label("total_usuarios"),
+        _contar_usuarios(Usuario.rol == "superadmin").label("superadmins"),
+        _contar_usuarios(Usuario.is_approved.is_(True)).label("usuarios_aprobados"),
+        _contar_usuarios(
+            Usuario.is_approved.is_(False),
+            Usuario.rol != "superadmin"
+        ).label("usuarios_pendientes"),
+        _contar_usuarios(Usuario.is_active.is_(True)).label("usuarios_activos"),
+        _contar_usuarios(Usuario.is_active.is_(False)).label("usuarios_bloqueados"),
+        select(func.count(Colegio.id)).scalar_subquery().label("total_colegios"),
+        select(func.count(Permiso.id)).scalar_subquery().label("total_permisos")
+    )
+
+    return dict(db.session.execute(stmt).mappings().one())
+
+
+def _refrescar_colegios(ahora):
+    """Recalcula docentes/usuarios/estudiantes por colegio en un SELECT"""
+
+    def _contar(modelo):
+        return (
+            select(func.count(modelo.id))
+            .where(modelo.colegio_id == Colegio.id)
+            .correlate(Colegio)
+            .scalar_subquery()
+        )
+
+    filas = db.session.execute(
+        select(
+            Colegio.id,
+            Colegio.nombre,
+            _contar(Docente).label("docentes"),
+            _contar(Usuario).label("usuarios"),
+            _contar(Estudiante).label("estudiantes")
+        )
+    ).all()
+
+    existentes = {fila.colegio_id: fila for fila in EstadisticaColegio.query}
+
+    for colegio_id, nombre, docentes, usuarios, estudiantes in filas:
+        fila = existentes.pop(colegio_id, None)
+        if fila is None:
+            fila = EstadisticaColegio(colegio_id=colegio_id)
+            db.session.add(fila)
+
+        fila.nombre = nombre
+        fila.docentes = docentes
+        fila.usuarios = usuarios
+        fila.estudiantes = estudiantes
+        fila.actualizado_en = ahora
+
+    # Colegios eliminados desde el último refresco
+    for fila in existentes.values():
+        db.session.delete(fila)
+
+
+# ════════════════════════════════════════════════════════════════
+# TAREA EN SEGUNDO PLANO Y COMANDO CLI
+# ════════════════════════════════════════════════════════════════
+
+def init_app(app):
+    """
+    Registra el comando `flask refrescar-estadisticas` (para cron) y arranca
+    el refresco periódico en cada worker al recibir su primera petición.
+
+    ESTADISTICAS_REFRESCO_SEGUNDOS = 0 desactiva el hilo (solo cron).
+    """
+    intervalo = app.config.get("ESTADISTICAS_REFRESCO_SEGUNDOS", 900)
+
+    @app.cli.command("refrescar-estadisticas")
+    def refrescar_estadisticas_command():
+        """Refresca el rollup de estadísticas de la plataforma"""
+        refrescar_estadisticas(forzar=True)
+        print("✅ Estadísticas actualizadas")
+
+    if not intervalo or app.testing:
+        return
+
+    estado = {"pid": None}
+    lock = threading.Lock()
+
+    @app.before_request
+    def _arrancar_refresco_periodico():
+        # gunicorn hace fork de los workers: un hilo por proceso
+        if estado["pid"] == os.getpid():
+            return
+
+        with lock:
+            if estado["pid"] == os.getpid():
+                return
+            estado["pid"] = os.getpid()
+
+            threading.Thread(
+                target=_bucle_refresco,
+                args=(app, intervalo),
+                name="refresco-estadisticas",
+                daemon=True
+            ).start()
+
+
+def _bucle_refresco(app, intervalo):
+    while True:
+        with app.app_context():
+            try:
+                refrescar_estadisticas(intervalo=intervalo)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Error refrescando estadísticas")
+            finally:
+                db.session.remove()
+
+        time.sleep(intervalo)
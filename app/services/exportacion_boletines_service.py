@@ -0,0 +1,373 @@
+import json
+import os
+import shutil
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+import click
+from sqlalchemy import select, func
+from werkzeug.utils import secure_filename
+
+from app.extensions import db
+from app.models.colegio import Colegio
+from app.models.estudiante import Estudiante
+from app.models.periodo import Periodo
+from app.models.cierre_periodo import ResultadoPeriodo
+from app.services.boletin_service import obtener_boletin_grupo, obtener_cierre
+
+# Boletines enviados al pool por worker antes de esperar a que terminen
+# (acota la memoria sin dejar workers ociosos mientras se carga el grupo siguiente)
+EN_VUELO_POR_WORKER = 8
+
+# Cada cuántos PDFs terminados se reescribe el archivo de estado
+GUARDAR_ESTADO_CADA = 50
+
+
+# ════════════════════════════════════════════════════════════════
+# RENDER (corre en los procesos del pool: sin base de datos ni app)
+# ════════════════════════════════════════════════════════════════
+
+def renderizar_pdf(datos, ruta):
+    """
+    Escribe el PDF de un boletín en `ruta` y devuelve los segundos que tardó.
+
+    `datos` es un dict plano (ver _datos_render). El archivo se escribe con
+    otro nombre y se renombra al final: si el proceso muere a mitad, no
+    queda un PDF truncado que la reanudación tome por terminado.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from xml.sax.saxutils import escape
+
+    inicio = time.perf_counter()
+    estilos = getSampleStyleSheet()
+
+    contenido = [
+        Paragraph(escape(datos["colegio"]), estilos["Title"]),
+        Paragraph(f"Boletín de calificaciones - {escape(datos['periodo'])}", estilos["Heading2"]),
+        Paragraph(
+            f"<b>Estudiante:</b> {escape(datos['nombre'])} &nbsp;&nbsp; "
+            f"<b>Grado:</b> {escape(datos['grado'] + (datos['grupo'] or ''))}",
+            estilos["Normal"]
+        ),
+        Spacer(1, 12),
+    ]
+
+    filas = [["Materia / Competencia", "Nota", "Desempeño"]]
+    estilo_tabla = [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0d6efd")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+    ]
+
+    for materia in datos["materias"]:
+        estilo_tabla.append(("BACKGROUND", (0, len(filas)), (-1, len(filas)), colors.HexColor("#e9ecef")))
+        filas.append([materia["nombre"], f"{materia['promedio']:.2f}", materia["nivel"]])
+        for competencia in materia["competencias"]:
+            filas.append([f"    {competencia['nombre']}", f"{competencia['promedio']:.2f}", competencia["nivel"]])
+
+    if datos["promedio"] is not None:
+        estilo_tabla.append(("FONTNAME", (0, len(filas)), (-1, len(filas)), "Helvetica-Bold"))
+        filas.append(["Promedio general", f"{datos['promedio']:.2f}", datos["nivel"]])
+    else:
+        filas.append(["Sin calificaciones en el periodo", "-", "-"])
+
+    tabla = Table(filas, colWidths=[300, 70, 90], repeatRows=1)
+    tabla.setStyle(TableStyle(estilo_tabla))
+    contenido.append(tabla)
+
+    temporal = f"{ruta}.tmp"
+    SimpleDocTemplate(temporal, pagesize=letter, title=f"Boletín {datos['nombre']}").build(contenido)
+    os.replace(temporal, ruta)
+
+    return time.perf_counter() - inicio
+
+
+# ════════════════════════════════════════════════════════════════
+# ESTADO (progreso, tiempos y reanudación)
+# ════════════════════════════════════════════════════════════════
+
+def ruta_estado(destino):
+    return f"{destino}.estado.json"
+
+
+def leer_estado(destino):
+    """Estado de una exportación (None si nunca se inició)"""
+    try:
+        with open(ruta_estado(destino), encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        return None
+
+
+def _guardar_estado(destino, estado):
+    estado["actualizado"] = datetime.utcnow().isoformat()
+    temporal = f"{ruta_estado(destino)}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(estado, archivo, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta_estado(destino))
+
+
+def _nuevo_estado(colegio_id, periodo_id, total):
+    return {
+        "colegio_id": colegio_id,
+        "periodo_id": periodo_id,
+        "etapa": "renderizando",
+        "total": total,
+        "hechos": 0,
+        "reanudados": 0,
+        "iniciado": datetime.utcnow().isoformat(),
+        # Segundos por etapa; "render" suma lo que tardó cada PDF en su
+        # worker, "render_espera" es lo que el proceso principal esperó al pool
+        "tiempos": {"carga": 0.0, "render": 0.0, "render_espera": 0.0, "zip": 0.0},
+    }
+
+
+# ════════════════════════════════════════════════════════════════
+# EXPORTACIÓN
+# ════════════════════════════════════════════════════════════════
+
+def _grupos(colegio_id, cierre=None):
+    """
+    [(grado, grupo)] a exportar y cuántos estudiantes suman.
+
+    Con el periodo cerrado salen del snapshot (grado y grupo al cerrar).
+    """
+    if cierre is not None:
+        modelo = ResultadoPeriodo
+        filtros = [
+            ResultadoPeriodo.periodo_id == cierre.periodo_id,
+            ResultadoPeriodo.colegio_id == colegio_id,
+            ResultadoPeriodo.materia_id.is_(None),
+        ]
+    else:
+        modelo = Estudiante
+        filtros = [
+            Estudiante.colegio_id == colegio_id,
+            Estudiante.activo.is_(True),
+            Estudiante.grado.isnot(None),
+        ]
+
+    filas = db.session.execute(
+        select(modelo.grado, modelo.grupo, func.count())
+        .where(*filtros)
+        .group_by(modelo.grado, modelo.grupo)
+        .order_by(modelo.grado, modelo.grupo)
+    ).all()
+
+    # NULL y "" son el mismo grupo (estudiantes del grado sin grupo)
+    grupos = {}
+    for grado, grupo, cantidad in filas:
+        grupos[(grado, grupo or None)] = grupos.get((grado, grupo or None), 0) + cantidad
+    return list(grupos), sum(grupos.values())
+
+
+def _datos_render(colegio, periodo, boletin, estudiante):
+    """Boletín de un estudiante como dict plano (se envía por pickle al worker)"""
+    materias = []
+    for materia_id, nombre in boletin.materias:
+        nota = estudiante.materias.get(materia_id)
+        if nota is None:
+            continue
+        materias.append({
+            "nombre": nombre,
+            "promedio": nota.promedio,
+            "nivel": nota.nivel.value,
+            # boletin.competencias ya viene en el orden del plan de estudios
+            "competencias": [
+                {
+                    "nombre": nombre_competencia,
+                    "promedio": nota.competencias[competencia_id].promedio,
+                    "nivel": nota.competencias[competencia_id].nivel.value,
+                }
+                for competencia_id, (_, nombre_competencia) in boletin.competencias.items()
+                if competencia_id in nota.competencias
+            ],
+        })
+
+    return {
+        "colegio": colegio.nombre,
+        "periodo": f"{periodo.nombre} {periodo.anio_lectivo or ''}".strip(),
+        "nombre": estudiante.nombre,
+        "grado": boletin.grado,
+        "grupo": boletin.grupo,
+        "promedio": estudiante.promedio,
+        "nivel": estudiante.nivel.value if estudiante.nivel else None,
+        "materias": materias,
+    }
+
+
+def _carpeta(grado, grupo):
+    return secure_filename(f"{grado}{grupo or ''}") or "sin_grado"
+
+
+def _nombre_archivo(boletin, estudiante):
+    archivo = secure_filename(f"{estudiante.nombre}_{estudiante.estudiante_id}.pdf")
+    return f"{_carpeta(boletin.grado, boletin.grupo)}/{archivo}"
+
+
+def exportar_boletines(colegio_id, periodo_id, destino, workers=None, progreso=None):
+    """
+    Genera en `destino` (.zip) los boletines en PDF de todo el colegio para un periodo.
+
+    - Carga: un grado/grupo a la vez con el motor vectorizado de
+      boletin_service (cuatro consultas por grupo), o del snapshot si el
+      periodo ya está cerrado.
+    - Render: los PDFs se generan en un pool de `workers` procesos mientras
+      el proceso principal carga el grupo siguiente. Cada PDF queda en
+      `<destino>.partes/`.
+    - ZIP: al terminar, los PDFs se copian por streaming al ZIP (sin
+      comprimir: el PDF ya lo está) y se borran las partes.
+
+    Si el proceso muere, volver a llamar con el mismo destino reanuda: los
+    PDFs ya escritos en las partes no se vuelven a generar. El progreso y
+    los tiempos por etapa quedan en `<destino>.estado.json`.
+
+    Args:
+        progreso: callable(estado) invocado tras cada grupo (CLI)
+
+    Returns: el estado final (dict)
+    """
+    colegio = db.session.get(Colegio, colegio_id)
+    periodo = db.session.get(Periodo, periodo_id)
+    if colegio is None or periodo is None:
+        raise ValueError("Colegio o periodo no encontrado")
+
+    estado = leer_estado(destino)
+    if estado is not None and (estado["colegio_id"], estado["periodo_id"]) != (colegio_id, periodo_id):
+        raise ValueError(f"{destino} pertenece a otra exportación")
+    if estado is not None and estado["etapa"] == "completado" and os.path.exists(destino):
+        return estado
+
+    partes = f"{destino}.partes"
+    os.makedirs(partes, exist_ok=True)
+
+    grupos, total = _grupos(colegio_id, obtener_cierre(colegio_id, periodo_id))
+
+    if estado is None:
+        estado = _nuevo_estado(colegio_id, periodo_id, total)
+    estado.update(etapa="renderizando", total=total, hechos=0, reanudados=0)
+
+    tiempos = estado["tiempos"]
+    workers = workers or os.cpu_count() or 1
+    en_vuelo = set()
+
+    def recoger(bloquear):
+        if not en_vuelo:
+            return
+        inicio = time.perf_counter()
+        terminados, pendientes = wait(
+            en_vuelo,
+            timeout=None if bloquear else 0,
+            return_when=FIRST_COMPLETED
+        )
+        if bloquear:
+            tiempos["render_espera"] += time.perf_counter() - inicio
+
+        en_vuelo.intersection_update(pendientes)
+        for futuro in terminados:
+            # Un PDF que falla detiene la exportación; lo hecho queda para reanudar
+            tiempos["render"] += futuro.result()
+            estado["hechos"] += 1
+            if estado["hechos"] % GUARDAR_ESTADO_CADA == 0:
+                _guardar_estado(destino, estado)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for grado, grupo in grupos:
+            inicio = time.perf_counter()
+            boletin = obtener_boletin_grupo(colegio_id, periodo_id, grado, grupo)
+            tiempos["carga"] += time.perf_counter() - inicio
+
+            os.makedirs(os.path.join(partes, _carpeta(grado, grupo)), exist_ok=True)
+
+            for estudiante in boletin.estudiantes:
+                ruta = os.path.join(partes, _nombre_archivo(boletin, estudiante))
+                if os.path.exists(ruta):
+                    estado["hechos"] += 1
+                    estado["reanudados"] += 1
+                    continue
+
+                while len(en_vuelo) >= workers * EN_VUELO_POR_WORKER:
+                    recoger(bloquear=True)
+
+                en_vuelo.add(pool.submit(
+                    renderizar_pdf,
+                    _datos_render(colegio, periodo, boletin, estudiante),
+                    ruta
+                ))
+
+            recoger(bloquear=False)
+            _guardar_estado(destino, estado)
+            if progreso:
+                progreso(estado)
+
+        while en_vuelo:
+            recoger(bloquear=True)
+
+    estado["etapa"] = "empaquetando"
+    _guardar_estado(destino, estado)
+
+    inicio = time.perf_counter()
+    temporal = f"{destino}.tmp"
+    with zipfile.ZipFile(temporal, "w", compression=zipfile.ZIP_STORED) as archivo_zip:
+        for carpeta, _, archivos in sorted(os.walk(partes)):
+            for nombre in sorted(archivos):
+                if nombre.endswith(".pdf"):
+                    ruta = os.path.join(carpeta, nombre)
+                    archivo_zip.write(ruta, os.path.relpath(ruta, partes))
+    os.replace(temporal, destino)
+    tiempos["zip"] += time.perf_counter() - inicio
+
+    shutil.rmtree(partes, ignore_errors=True)
+
+    estado["etapa"] = "completado"
+    _guardar_estado(destino, estado)
+    if progreso:
+        progreso(estado)
+
+    return estado
+
+
+# ════════════════════════════════════════════════════════════════
+# COMANDO CLI
+# ════════════════════════════════════════════════════════════════
+
+def init_app(app):
+    """Registra `flask exportar-boletines` (cierre de periodo, fuera del servidor web)"""
+
+    @app.cli.command("exportar-boletines")
+    @click.option("--colegio", "colegio_id", type=int, required=True)
+    @click.option("--periodo", "periodo_id", type=int, required=True)
+    @click.option("--destino", type=click.Path(dir_okay=False), default=None,
+                  help="ZIP de salida (por defecto en instance/boletines/)")
+    @click.option("--workers", type=int, default=None,
+                  help="Procesos de render (por defecto BOLETINES_PDF_WORKERS)")
+    def exportar_boletines_command(colegio_id, periodo_id, destino, workers):
+        """Genera los boletines en PDF de un colegio y periodo en un ZIP (reanudable)"""
+        if destino is None:
+            carpeta = os.path.join(app.instance_path, "boletines")
+            os.makedirs(carpeta, exist_ok=True)
+            destino = os.path.join(carpeta, f"colegio-{colegio_id}-periodo-{periodo_id}.zip")
+
+        def mostrar(estado):
+            print(f"  {estado['etapa']}: {estado['hechos']}/{estado['total']}")
+
+        estado = exportar_boletines(
+            colegio_id,
+            periodo_id,
+            destino,
+            workers=workers or app.config.get("BOLETINES_PDF_WORKERS") or None,
+            progreso=mostrar
+        )
+
+        tiempos = estado["tiempos"]
+        print(f"✅ {estado['hechos']} boletines en {destino} ({estado['reanudados']} reanudados)")
+        print(
+            f"   carga {tiempos['carga']:.1f}s | render {tiempos['render']:.1f}s en workers "
+            f"({tiempos['render_espera']:.1f}s de espera) | zip {tiempos['zip']:.1f}s"
+        )
@@ -0,0 +1,444 @@
+import csv
+import io
+import os
+import secrets
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import date, timedelta, time as hora_del_dia
+
+import click
+from sqlalchemy import select, insert, func
+
+from app.extensions import db
+from app.models.asistencia import Asistencia
+from app.models.clase import Clase
+from app.models.colegio import Colegio
+from app.models.docente import Docente
+from app.models.estudiante import Estudiante
+from app.models.jornada import Jornada
+from app.models.novedad import Novedad
+from app.models.permiso import Permiso
+from app.models.sede import Sede
+
+# Filas que trae cada vuelta del cursor del servidor (yield_per)
+LOTE = 2000
+
+# Límite de filas de una hoja de Excel (1.048.576); se abre otra hoja antes
+MAX_FILAS_HOJA = 1_000_000
+
+# Bytes por fragmento al enviar el XLSX
+FRAGMENTO_XLSX = 64 * 1024
+
+# Inicios de celda que Excel/LibreOffice interpretan como fórmula al abrir un CSV
+INICIOS_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+# Estudiantes del colegio sintético del benchmark (una asistencia por estudiante y día)
+ESTUDIANTES_BENCHMARK = 1000
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# titulo: nombre de hoja/archivo; encabezados: primera fila; consulta(colegio_id, desde, hasta) -> select
+Exportacion = namedtuple("Exportacion", ["titulo", "encabezados", "consulta"])
+
+
+# ════════════════════════════════════════════════════════════════
+# CONSULTAS (solo columnas: ningún objeto ORM en memoria)
+# ════════════════════════════════════════════════════════════════
+
+def _consulta_asistencias(colegio_id, desde, hasta):
+    stmt = (
+        select(
+            Asistencia.fecha,
+            Estudiante.nombre,
+            Estudiante.grado,
+            Estudiante.grupo,
+            Asistencia.estado,
+            Clase.materia,
+            Asistencia.observacion
+        )
+        .join(Estudiante, Estudiante.id == Asistencia.estudiante_id)
+        .outerjoin(Clase, Clase.id == Asistencia.clase_id)
+        .where(Estudiante.colegio_id == colegio_id)
+        .order_by(Asistencia.fecha, Asistencia.id)
+    )
+    if desde:
+        stmt = stmt.where(Asistencia.fecha >= desde)
+    if hasta:
+        stmt = stmt.where(Asistencia.fecha <= hasta)
+    return stmt
+
+
+def _consulta_novedades(colegio_id, desde, hasta):
+    stmt = (
+        select(
+            Novedad.fecha,
+            Novedad.hora,
+            Estudiante.nombre,
+            Estudiante.grado,
+            Estudiante.grupo,
+            Novedad.tipo_novedad,
+            Novedad.gravedad,
+            Novedad.categoria,
+            Novedad.informe
+        )
+        .join(Estudiante, Estudiante.id == Novedad.estudiante_id)
+        .where(Estudiante.colegio_id == colegio_id)
+        .order_by(Novedad.fecha, Novedad.id)
+    )
+    if desde:
+        stmt = stmt.where(Novedad.fecha >= desde)
+    if hasta:
+        stmt = stmt.where(Novedad.fecha <= hasta)
+    return stmt
+
+
+def _consulta_permisos(colegio_id, desde, hasta):
+    # Mismo criterio que el listado: permisos vigentes algún día del rango
+    stmt = (
+        select(
+            Docente.nombre,
+            Docente.documento,
+            Permiso.tipo,
+            Permiso.fecha_inicio,
+            Permiso.fecha_fin,
+            Permiso.observacion
+        )
+        .join(Docente, Docente.id == Permiso.docente_id)
+        .where(Permiso.colegio_id == colegio_id)
+        .order_by(Permiso.fecha_inicio, Permiso.id)
+    )
+    if desde:
+        stmt = stmt.where(Permiso.fecha_fin >= desde)
+    if hasta:
+        stmt = stmt.where(Permiso.fecha_inicio <= hasta)
+    return stmt
+
+
+def _consulta_estudiantes(colegio_id, desde, hasta):
+    # El rango, si viene, filtra por fecha de registro
+    stmt = (
+        select(
+            Estudiante.id,
+            Estudiante.nombre,
+            Estudiante.grado,
+            Estudiante.grupo,
+            Sede.nombre,
+            Jornada.nombre,
+            Estudiante.activo,
+            Estudiante.fecha_creacion
+        )
+        .outerjoin(Sede, Sede.id == Estudiante.sede_id)
+        .outerjoin(Jornada, Jornada.id == Estudiante.jornada_id)
+        .where(Estudiante.colegio_id == colegio_id)
+        .order_by(Estudiante.nombre, Estudiante.id)
+    )
+    if desde:
+        stmt = stmt.where(Estudiante.fecha_creacion >= desde)
+    if hasta:
+        stmt = stmt.where(Estudiante.fecha_creacion < hasta + timedelta(days=1))
+    return stmt
+
+
+EXPORTACIONES = {
+    "asistencias": Exportacion(
+        "Asistencias",
+        ("Fecha", "Estudiante", "Grado", "Grupo", "Estado", "Clase", "Observación"),
+        _consulta_asistencias
+    ),
+    "novedades": Exportacion(
+        "Novedades",
+        ("Fecha", "Hora", "Estudiante", "Grado", "Grupo", "Tipo", "Gravedad", "Categoría", "Informe"),
+        _consulta_novedades
+    ),
+    "permisos": Exportacion(
+        "Permisos",
+        ("Docente", "Documento", "Tipo", "Desde", "Hasta", "Observación"),
+        _consulta_permisos
+    ),
+    "estudiantes": Exportacion(
+        "Estudiantes",
+        ("ID", "Nombre", "Grado", "Grupo", "Sede", "Jornada", "Activo", "Registrado"),
+        _consulta_estudiantes
+    ),
+}
+
+
+# ════════════════════════════════════════════════════════════════
+# LECTURA POR LOTES
+# ════════════════════════════════════════════════════════════════
+
+def _valor(valor):
+    """Enums y booleanos a texto; fechas quedan como fecha (XLSX las formatea)"""
+    if isinstance(valor, bool):
+        return "Sí" if valor else "No"
+    if hasattr(valor, "value"):
+        return valor.value
+    return valor
+
+
+def leer_lotes(tipo, colegio_id, desde=None, hasta=None, lote=LOTE):
+    """
+    Filas de la exportación en lotes de `lote`.
+
+    yield_per activa el cursor del lado del servidor (psycopg2 named
+    cursor en PostgreSQL): la memoria depende del tamaño del lote, no del
+    total de filas.
+    """
+    exportacion = EXPORTACIONES[tipo]
+    resultado = db.session.execute(
+        exportacion.consulta(colegio_id, desde, hasta).execution_options(yield_per=lote)
+    )
+    try:
+        for particion in resultado.partitions():
+            yield [[_valor(valor) for valor in fila] for fila in particion]
+    finally:
+        resultado.close()
+
+
+def excede_filas(tipo, colegio_id, desde=None, hasta=None, maximo=None):
+    """
+    True si la exportación tiene más de `maximo` filas.
+
+    Cuenta con LIMIT maximo + 1: se detiene en cuanto pasa el límite, sin
+    recorrer el resto de la tabla.
+    """
+    if not maximo:
+        return False
+
+    consulta = EXPORTACIONES[tipo].consulta(colegio_id, desde, hasta)
+    total = db.session.execute(
+        select(func.count()).select_from(
+            consulta.order_by(None).limit(maximo + 1).subquery()
+        )
+    ).scalar()
+    return total > maximo
+
+
+# ════════════════════════════════════════════════════════════════
+# GENERADORES (cuerpo de la Response)
+# ════════════════════════════════════════════════════════════════
+
+def _celda_csv(valor):
+    """
+    Fechas en ISO y texto sin fórmulas: un nombre u observación que empiece
+    por =, +, - o @ se antepone con ' para que la hoja de cálculo lo
+    muestre como texto en vez de ejecutarlo (inyección CSV).
+    """
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    if isinstance(valor, str) and valor.startswith(INICIOS_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def generar_csv(tipo, colegio_id, desde=None, hasta=None):
+    """CSV por fragmentos: un fragmento por lote del cursor (con BOM para Excel)"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    buffer.write("\ufeff")
+    escritor.writerow(EXPORTACIONES[tipo].encabezados)
+
+    for filas in leer_lotes(tipo, colegio_id, desde, hasta):
+        escritor.writerows([_celda_csv(valor) for valor in fila] for fila in filas)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _celda_xlsx(hoja, texto):
+    # openpyxl guarda como fórmula todo texto que empiece por "=": se fuerza texto
+    if not texto.startswith("="):
+        return texto
+
+    from openpyxl.cell import WriteOnlyCell
+
+    celda = WriteOnlyCell(hoja, value=texto)
+    celda.data_type = "s"
+    return celda
+
+
+def generar_xlsx(tipo, colegio_id, desde=None, hasta=None):
+    """
+    XLSX con openpyxl en modo write-only.
+
+    Las filas se escriben a un archivo temporal a medida que llegan del
+    cursor (memoria constante) y el libro terminado se envía por
+    fragmentos. Un XLSX no puede enviarse antes de cerrarse: el primer
+    byte sale cuando se leyó la última fila, por eso la ruta manda a CSV
+    las exportaciones de más de EXPORTACION_XLSX_MAX_FILAS.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    exportacion = EXPORTACIONES[tipo]
+    libro = Workbook(write_only=True)
+
+    hoja = None
+    filas_hoja = MAX_FILAS_HOJA
+    numero_hoja = 0
+
+    for filas in leer_lotes(tipo, colegio_id, desde, hasta):
+        for fila in filas:
+            if filas_hoja >= MAX_FILAS_HOJA:
+                numero_hoja += 1
+                titulo = exportacion.titulo if numero_hoja == 1 else f"{exportacion.titulo} {numero_hoja}"
+                hoja = libro.create_sheet(titulo)
+                hoja.append(exportacion.encabezados)
+                filas_hoja = 0
+            # Excel rechaza caracteres de control que sí pueden venir en un informe
+            hoja.append([
+                _celda_xlsx(hoja, ILLEGAL_CHARACTERS_RE.sub("", valor)) if isinstance(valor, str) else valor
+                for valor in fila
+            ])
+            filas_hoja += 1
+
+    if hoja is None:
+        libro.create_sheet(exportacion.titulo).append(exportacion.encabezados)
+
+    descriptor, ruta = tempfile.mkstemp(suffix=".xlsx")
+    os.close(descriptor)
+    try:
+        libro.save(ruta)
+        with open(ruta, "rb") as archivo:
+            while True:
+                fragmento = archivo.read(FRAGMENTO_XLSX)
+                if not fragmento:
+                    break
+                yield fragmento
+    finally:
+        os.remove(ruta)
+
+
+GENERADORES = {
+    "csv": generar_csv,
+    "xlsx": generar_xlsx,
+}
+
+
+# ════════════════════════════════════════════════════════════════
+# BENCHMARK
+# ════════════════════════════════════════════════════════════════
+
+def _poblar_benchmark(filas):
+    """
+    Colegio sintético con `filas` asistencias (sin commit: quien llama
+    hace rollback).
+
+    Returns: colegio_id
+    """
+    colegio = Colegio(nombre="Benchmark exportación", codigo_acceso=f"BENCH-{secrets.token_hex(4)}")
+    db.session.add(colegio)
+    db.session.flush()
+
+    docente = Docente(nombre="Docente benchmark", colegio_id=colegio.id)
+    jornada = Jornada(nombre="Benchmark", hora_inicio=hora_del_dia(6, 30), hora_fin=hora_del_dia(12), colegio_id=colegio.id)
+    db.session.add_all([docente, jornada])
+    db.session.flush()
+
+    db.session.execute(insert(Estudiante), [
+        {
+            "nombre": f"Estudiante {indice:05d}",
+            "grado": "6",
+            "grupo": "A",
+            "colegio_id": colegio.id,
+            "docente_id": docente.id,
+            "jornada_id": jornada.id,
+            "activo": True,
+        }
+        for indice in range(ESTUDIANTES_BENCHMARK)
+    ])
+    estudiante_ids = db.session.execute(
+        select(Estudiante.id).where(Estudiante.colegio_id == colegio.id)
+    ).scalars().all()
+
+    inicio = date(2020, 1, 1)
+    for desde in range(0, filas, 50_000):
+        db.session.execute(Asistencia.__table__.insert(), [
+            {
+                "estudiante_id": estudiante_ids[indice % len(estudiante_ids)],
+                "fecha": inicio + timedelta(days=indice // len(estudiante_ids)),
+                "estado": "presente",
+            }
+            for indice in range(desde, min(desde + 50_000, filas))
+        ])
+
+    return colegio.id
+
+
+def _recorrer(formato, colegio_id):
+    """(segundos, segundos al primer fragmento, bytes) de enviar la exportación de asistencias"""
+    inicio = time.perf_counter()
+    primero = None
+    total = 0
+    for fragmento in GENERADORES[formato]("asistencias", colegio_id):
+        if primero is None:
+            primero = time.perf_counter() - inicio
+        total += len(fragmento)
+    return time.perf_counter() - inicio, primero, total
+
+
+def medir_exportacion(filas, formatos=("csv", "xlsx"), memoria=False):
+    """
+    Tiempo, latencia del primer fragmento y tamaño de la exportación de
+    `filas` asistencias en cada formato. Con `memoria`, una segunda pasada
+    mide el pico de memoria de Python (tracemalloc, que la hace más lenta).
+    Los datos se crean en la transacción de db.session y se descartan con
+    rollback al terminar.
+
+    Returns: {formato: {"segundos", "primer_fragmento", "bytes", "pico_mb"}}
+    """
+    resultados = {}
+    try:
+        colegio_id = _poblar_benchmark(filas)
+        db.session.flush()
+
+        for formato in formatos:
+            segundos, primero, total = _recorrer(formato, colegio_id)
+            resultados[formato] = {
+                "segundos": segundos,
+                "primer_fragmento": primero,
+                "bytes": total,
+                "pico_mb": None,
+            }
+
+            if memoria:
+                tracemalloc.start()
+                try:
+                    _recorrer(formato, colegio_id)
+                    resultados[formato]["pico_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+                finally:
+                    tracemalloc.stop()
+    finally:
+        db.session.rollback()
+
+    return resultados
+
+
+def init_app(app):
+    """Registra `flask benchmark-exportacion`"""
+
+    @app.cli.command("benchmark-exportacion")
+    @click.option("--filas", default="100000,1000000",
+                  help="Cantidades de asistencias separadas por coma")
+    @click.option("--formatos", default="csv,xlsx")
+    @click.option("--memoria", is_flag=True,
+                  help="Medir también el pico de memoria (pasada extra con tracemalloc)")
+    def benchmark_exportacion_command(filas, formatos, memoria):
+        """Exportación de asistencias por formato (datos sintéticos, con rollback)"""
+        formatos = [f.strip() for f in formatos.split(",") if f.strip() in GENERADORES]
+
+        print(f"{'filas':>10}{'formato':>9}{'s':>9}{'1er frag. s':>13}{'MB salida':>11}{'pico MB':>9}")
+        for cantidad in (int(f) for f in filas.split(",") if f.strip()):
+            for formato, datos in medir_exportacion(cantidad, formatos, memoria).items():
+                pico = f"{datos['pico_mb']:.1f}" if datos["pico_mb"] is not None else "-"
+                print(f"{cantidad:>10}{formato:>9}{datos['segundos']:>9.1f}{datos['primer_fragmento']:>13.2f}"
+                      f"{datos['bytes'] / 1e6:>11.1f}{pico:>9}")
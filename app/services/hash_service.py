@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import click
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Contraseña de prueba para el benchmark
+CONTRASENA_BENCHMARK = "contraseña-de-prueba"
+
+
+class HashOcupado(Exception):
+    """Todos los hilos de hash del worker están ocupados y la espera se agotó"""
+
+
+# ════════════════════════════════════════════════════════════════
+# POOL DE HASHING POR WORKER
+# ════════════════════════════════════════════════════════════════
+
+class HasherContrasenas:
+    """
+    Hash y verificación de contraseñas en un pool acotado de hilos.
+
+    - PBKDF2 y scrypt de hashlib (OpenSSL) sueltan el GIL mientras
+      calculan: con workers de gunicorn con --threads, un login calculando
+      su hash no frena al resto de peticiones del proceso.
+    - A lo sumo PASSWORD_HASH_HILOS hashes a la vez por worker, así una
+      ráfaga de logins no reparte la CPU entre decenas de hashes lentos.
+      Una petición espera turno hasta PASSWORD_HASH_ESPERA_SEGUNDOS y luego
+      recibe HashOcupado (mejor "intenta de nuevo" que una cola sin fin).
+    - PASSWORD_HASH_METODO fija algoritmo y costo en el formato de
+      werkzeug; los hashes con otro método se rehacen en el siguiente login
+      exitoso (ver verificar).
+    - El pool se crea por pid: gunicorn hace fork de los workers y los
+      hilos del proceso padre no pasan al hijo.
+
+    Configuración (config.Config):
+        PASSWORD_HASH_METODO, PASSWORD_HASH_HILOS, PASSWORD_HASH_ESPERA_SEGUNDOS
+    """
+
+    def __init__(self):
+        self.metodo = "pbkdf2:sha256:600000"
+        self.hilos = 2
+        self.espera = 10
+        self._metodo_normalizado = None
+        self._pool = None
+        self._pid = None
+        self._turnos = None
+        self._lock = threading.Lock()
+
+    def configurar(self, metodo, hilos, espera):
+        with self._lock:
+            self.metodo = metodo
+            self.hilos = max(hilos, 1)
+            self.espera = espera
+            self._metodo_normalizado = None
+            self._cerrar_pool()
+
+    # --------------------
+    # Operaciones
+    # --------------------
+
+    def generar(self, password):
+        """Hash de `password` con el método configurado"""
+        return self._ejecutar(generate_password_hash, password, self.metodo)
+
+    def verificar(self, password_hash, password):
+        """
+        Verifica `password` contra `password_hash`.
+        Retorna: (bool, nuevo_hash)
+
+        nuevo_hash no es None cuando la contraseña es correcta pero el hash
+        guardado usa otro método o costo: el llamador debe guardarlo. Se
+        calcula en la misma tarea del pool, sin volver a hacer fila.
+        """
+        return self._ejecutar(self._verificar, password_hash, password)
+
+    def _verificar(self, password_hash, password):
+        if not check_password_hash(password_hash, password):
+            return False, None
+
+        if self.necesita_rehash(password_hash):
+            return True, generate_password_hash(password, self.metodo)
+
+        return True, None
+
+    def necesita_rehash(self, password_hash):
+        return password_hash.split("$", 1)[0] != self.metodo_normalizado()
+
+    def metodo_normalizado(self):
+        # werkzeug guarda el método completo ("pbkdf2" -> "pbkdf2:sha256:600000")
+        if self._metodo_normalizado is None:
+            self._metodo_normalizado = generate_password_hash("", self.metodo).split("$", 1)[0]
+        return self._metodo_normalizado
+
+    # --------------------
+    # Pool
+    # --------------------
+
+    def _ejecutar(self, funcion, *args):
+        pool, turnos = self._pool_del_proceso()
+
+        # El turno cubre espera + cálculo: como mucho `hilos` hashes en vuelo
+        if not turnos.acquire(timeout=self.espera):
+            raise HashOcupado()
+
+        try:
+            return pool.submit(funcion, *args).result()
+        finally:
+            turnos.release()
+
+    def _pool_del_proceso(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.hilos,
+                        thread_name_prefix="hash-contrasenas"
+                    )
+                    self._turnos = threading.BoundedSemaphore(self.hilos)
+                    self._pid = os.getpid()
+        return self._pool, self._turnos
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrar_pool()
+
+    def _cerrar_pool(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(wait=False)
+        self._pool = None
+        self._pid = None
+
+
+hasher_contrasenas = HasherContrasenas()
+
+
+def generar_hash(password):
+    return hasher_contrasenas.generar(password)
+
+
+def verificar_contrasena(password_hash, password):
+    return hasher_contrasenas.verificar(password_hash, password)
+
+
+# ════════════════════════════════════════════════════════════════
+# BENCHMARK Y CONFIGURACIÓN
+# ════════════════════════════════════════════════════════════════
+
+def medir_logins(metodo, hilos, concurrencia, segundos):
+    """
+    Logins por segundo de UN worker con `hilos` de hash y `concurrencia`
+    peticiones simultáneas verificando contraseñas con `metodo`.
+    Retorna: {"logins": n, "por_segundo": x, "ms_por_login": y}
+    """
+    medidor = HasherContrasenas()
+    medidor.configurar(metodo, hilos, espera=segundos + 60)
+    password_hash = generate_password_hash(CONTRASENA_BENCHMARK, metodo)
+
+    fin = time.perf_counter() + segundos
+    cuentas = [0] * concurrencia
+
+    def _peticion(indice):
+        while time.perf_counter() < fin:
+            medidor.verificar(password_hash, CONTRASENA_BENCHMARK)
+            cuentas[indice] += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as peticiones:
+        wait([peticiones.submit(_peticion, indice) for indice in range(concurrencia)])
+    transcurrido = time.perf_counter() - inicio
+    medidor.cerrar()
+
+    logins = sum(cuentas)
+    return {
+        "logins": logins,
+        "por_segundo": logins / transcurrido,
+        "ms_por_login": transcurrido * 1000 * concurrencia / logins if logins else 0.0
+    }
+
+
+def init_app(app):
+    """Configura el pool de hashing y registra `flask benchmark-hash`"""
+    hasher_contrasenas.configurar(
+        app.config.get("PASSWORD_HASH_METODO", "pbkdf2:sha256:600000"),
+        app.config.get("PASSWORD_HASH_HILOS", 2),
+        app.config.get("PASSWORD_HASH_ESPERA_SEGUNDOS", 10)
+    )
+
+    @app.cli.command("benchmark-hash")
+    @click.option("--metodos", default="pbkdf2:sha256:260000,pbkdf2:sha256:600000,scrypt:32768:8:1",
+                  help="Métodos de werkzeug separados por coma")
+    @click.option("--hilos", type=int, default=None,
+                  help="Hilos de hash por worker (por defecto PASSWORD_HASH_HILOS)")
+    @click.option("--concurrencia", type=int, default=8,
+                  help="Logins simultáneos contra el worker")
+    @click.option("--segundos", type=float, default=3.0)
+    def benchmark_hash_command(metodos, hilos, concurrencia, segundos):
+        """Logins por segundo de un worker para cada método/costo de hash"""
+        hilos = hilos or hasher_contrasenas.hilos
+
+        print(f"Un worker, {hilos} hilo(s) de hash, {concurrencia} login(s) simultáneos, {segundos:g}s por método")
+        print(f"{'método':<28}{'logins/s':>10}{'ms/login':>10}")
+
+        for metodo in (m.strip() for m in metodos.split(",") if m.strip()):
+            resultado = medir_logins(metodo, hilos, concurrencia, segundos)
+            print(f"{metodo:<28}{resultado['por_segundo']:>10.1f}{resultado['ms_por_login']:>10.0f}")
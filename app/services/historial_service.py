@@ -0,0 +1,72 @@
+from app.models.asistencia import Asistencia
+from app.models.novedad import Novedad
+from app.models.ingreso_colegio import IngresoColegio
+from app.models.alerta import Alerta
+from app.utils.paginacion import paginar_keyset
+
+# Registros que se muestran en el detalle del estudiante
+HISTORIAL_RECIENTE = 10
+
+
+def _valor(valor):
+    """Enums y fechas a algo serializable en JSON"""
+    if valor is None:
+        return None
+    if hasattr(valor, "value"):
+        return valor.value
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return valor
+
+
+# tipo -> (modelo, campos que se devuelven en JSON)
+HISTORIALES = {
+    "asistencias": (Asistencia, ("id", "fecha", "estado", "observacion")),
+    "novedades": (Novedad, ("id", "fecha", "hora", "tipo_novedad", "gravedad", "informe")),
+    "ingresos": (IngresoColegio, ("id", "fecha", "hora", "tipo_evento", "metodo")),
+    "alertas": (Alerta, ("id", "fecha", "tipo", "descripcion", "atendida")),
+}
+
+
+def obtener_historial(tipo, estudiante_id, despues=None, limite=HISTORIAL_RECIENTE):
+    """
+    Historial de un estudiante, del más reciente al más antiguo.
+
+    Ordena por (fecha, id) DESC con LIMIT y pagina por keyset: cada página
+    es un recorrido corto del índice (estudiante_id, fecha), sin cargar la
+    colección completa.
+
+    Args:
+        tipo: "asistencias", "novedades", "ingresos" o "alertas"
+        estudiante_id: estudiante (ya validado contra el colegio del usuario)
+        despues: cursor de la página anterior (botón "ver más")
+        limite: registros por página
+
+    Returns:
+        PaginaKeyset, o None si el tipo no existe
+    """
+    if tipo not in HISTORIALES:
+        return None
+
+    modelo, _ = HISTORIALES[tipo]
+
+    return paginar_keyset(
+        modelo.query.filter(modelo.estudiante_id == estudiante_id),
+        (modelo.fecha, modelo.id),
+        despues=despues,
+        por_pagina=limite,
+        descendente=True
+    )
+
+
+def serializar_historial(tipo, pagina):
+    """Página de historial como dict para las respuestas JSON"""
+    _, campos = HISTORIALES[tipo]
+
+    return {
+        "items": [
+            {campo: _valor(getattr(fila, campo)) for campo in campos}
+            for fila in pagina.items
+        ],
+        "cursor_siguiente": pagina.cursor_siguiente,
+    }
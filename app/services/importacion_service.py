@@ -0,0 +1,750 @@
+import codecs
+import csv
+import io
+import itertools
+import secrets
+import unicodedata
+import zipfile
+from datetime import datetime
+
+from sqlalchemy import literal, select
+
+from app.extensions import db, contadores_cache, indice_qr
+from app.models.cambio_roster import CambioRoster
+from app.models.docente import Docente
+from app.models.estudiante import Estudiante
+from app.models.jornada import Jornada
+from app.models.permiso import Permiso
+from app.models.sede import Sede
+from app.services import sincronizacion_service
+from app.utils.sql import insertar_masivo
+
+# Filas de datos aceptadas por archivo
+MAX_FILAS_IMPORTACION = 20000
+
+# Bytes que se revisan para decidir la codificación del CSV
+MUESTRA_CODIFICACION = 64 * 1024
+
+# Errores que se listan en el reporte (el total se cuenta siempre)
+MAX_ERRORES_REPORTE = 500
+
+# Tokens por INSERT ... SELECT al anotar las altas en cambios_roster
+LOTE_TOKENS = 1000
+
+# Mismos valores que el formulario de estudiantes
+GRADOS = ("Preescolar",) + tuple(f"{numero}°" for numero in range(1, 12))
+
+# Encabezado normalizado -> campo
+COLUMNAS_ESTUDIANTES = {
+    "nombre": "nombre",
+    "nombre completo": "nombre",
+    "estudiante": "nombre",
+    "grado": "grado",
+    "grupo": "grupo",
+    "sede": "sede",
+    "jornada": "jornada",
+    "docente": "docente",
+    "tutor": "docente",
+    "docente tutor": "docente",
+    "director de grupo": "docente",
+}
+OBLIGATORIAS_ESTUDIANTES = ("nombre", "grado")
+
+COLUMNAS_DOCENTES = {
+    "nombre": "nombre",
+    "nombre completo": "nombre",
+    "docente": "nombre",
+    "documento": "documento",
+    "cedula": "documento",
+    "identificacion": "documento",
+    "telefono": "telefono",
+    "celular": "telefono",
+    "email": "email",
+    "correo": "email",
+    "correo electronico": "email",
+    "sede": "sede",
+}
+OBLIGATORIAS_DOCENTES = ("nombre",)
+
+COLUMNAS_PERMISOS = {
+    "documento": "documento",
+    "cedula": "documento",
+    "identificacion": "documento",
+    "docente": "docente",
+    "nombre": "docente",
+    "tipo": "tipo",
+    "tipo de permiso": "tipo",
+    "fecha inicio": "fecha_inicio",
+    "inicio": "fecha_inicio",
+    "desde": "fecha_inicio",
+    "fecha fin": "fecha_fin",
+    "fin": "fecha_fin",
+    "hasta": "fecha_fin",
+    "observacion": "observacion",
+    "observaciones": "observacion",
+    "motivo": "observacion",
+}
+OBLIGATORIAS_PERMISOS = (("documento", "docente"), "tipo", "fecha_inicio", "fecha_fin")
+
+# Mismos tipos que el formulario de permisos; otros textos se guardan tal cual
+TIPOS_PERMISO = ("Licencia", "Permiso", "Vacaciones", "Enfermedad", "Otro")
+
+# Fechas de las hojas de cálculo (una celda de fecha de Excel llega como ISO)
+FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y")
+
+# Nombre repetido en un catálogo: hay que desambiguar (por sede o documento)
+AMBIGUO = object()
+
+
+# ════════════════════════════════════════════════════════════════
+# LECTURA DEL ARCHIVO (CSV o XLSX, fila por fila)
+# ════════════════════════════════════════════════════════════════
+
+def _normalizar(texto):
+    """Minúsculas, sin tildes y con espacios simples: para comparar nombres"""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(caracter for caracter in texto if not unicodedata.combining(caracter))
+    return " ".join(texto.casefold().split())
+
+
+def _texto(valor):
+    """Celda como texto limpio (un 6.0 de Excel es "6")"""
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return " ".join(str(valor).split())
+
+
+def _codificacion(archivo):
+    """UTF-8 o, si la muestra no lo es, cp1252 (CSV guardado por Excel en Windows)"""
+    muestra = archivo.read(MUESTRA_CODIFICACION)
+    archivo.seek(0)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(muestra, final=False)
+    except UnicodeDecodeError:
+        return "cp1252"
+    return "utf-8-sig"
+
+
+def _filas_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding=_codificacion(archivo), newline="")
+    try:
+        primera = texto.readline()
+
+        # Excel en español guarda el CSV separado por punto y coma
+        delimitador = ";" if primera.count(";") > primera.count(",") else ","
+        yield from csv.reader(itertools.chain([primera], texto), delimiter=delimitador)
+    except UnicodeDecodeError:
+        raise ValueError("No se pudo leer el archivo: guárdelo como CSV UTF-8")
+    finally:
+        # El archivo es de la petición: no cerrarlo junto con el envoltorio
+        texto.detach()
+
+
+def _filas_xlsx(archivo):
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    # Un .xlsx renombrado o dañado no debe terminar en un 500
+    try:
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError):
+        raise ValueError("No se pudo leer el archivo Excel")
+
+    try:
+        yield from libro.worksheets[0].iter_rows(values_only=True)
+    finally:
+        libro.close()
+
+
+def leer_filas(archivo, nombre_archivo, columnas, obligatorias):
+    """
+    Recorre el archivo una sola vez: (número de fila, {campo: texto}).
+
+    La primera fila es el encabezado; las columnas se reconocen por
+    nombre (sin importar mayúsculas ni tildes) y las desconocidas se
+    ignoran. Las filas vacías se saltan.
+
+    Raises:
+        ValueError: formato no soportado, encabezado incompleto o más de
+            MAX_FILAS_IMPORTACION filas.
+    """
+    extension = nombre_archivo.rsplit(".", 1)[-1].lower() if "." in nombre_archivo else ""
+    if extension == "csv":
+        filas = _filas_csv(archivo)
+    elif extension == "xlsx":
+        filas = _filas_xlsx(archivo)
+    else:
+        raise ValueError("El archivo debe ser .csv o .xlsx")
+
+    encabezado = next(filas, None)
+    if not encabezado:
+        raise ValueError("El archivo está vacío")
+
+    posiciones = {}
+    for posicion, titulo in enumerate(encabezado):
+        campo = columnas.get(_normalizar(_texto(titulo)))
+        if campo is not None and campo not in posiciones:
+            posiciones[campo] = posicion
+
+    # Una obligatoria puede ser una tupla de alternativas (documento o nombre)
+    faltantes = [
+        " o ".join(campo) if isinstance(campo, tuple) else campo
+        for campo in obligatorias
+        if not any(alternativa in posiciones for alternativa in (campo if isinstance(campo, tuple) else (campo,)))
+    ]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el encabezado: {', '.join(faltantes)}")
+
+    leidas = 0
+    for numero, fila in enumerate(filas, start=2):
+        valores = {
+            campo: _texto(fila[posicion]) if posicion < len(fila) else ""
+            for campo, posicion in posiciones.items()
+        }
+        if not any(valores.values()):
+            continue
+
+        leidas += 1
+        if leidas > MAX_FILAS_IMPORTACION:
+            raise ValueError(f"Máximo {MAX_FILAS_IMPORTACION} filas por archivo")
+
+        yield numero, valores
+
+
+# ════════════════════════════════════════════════════════════════
+# CATÁLOGOS (nombre -> id en memoria)
+# ════════════════════════════════════════════════════════════════
+
+def _mapa(pares):
+    """{clave normalizada: id}; una clave repetida queda como AMBIGUO"""
+    mapa = {}
+    for clave, id_ in pares:
+        if not clave:
+            continue
+        clave = _normalizar(clave)
+        mapa[clave] = AMBIGUO if clave in mapa and mapa[clave] != id_ else id_
+    return mapa
+
+
+def _catalogo_docentes(colegio_id, solo_activos=True):
+    """Docentes del colegio por nombre y por documento: una consulta"""
+    consulta = select(Docente.id, Docente.nombre, Docente.documento).where(Docente.colegio_id == colegio_id)
+    if solo_activos:
+        consulta = consulta.where(Docente.activo.is_(True))
+    docentes = db.session.execute(consulta).all()
+
+    return {
+        "docentes": _mapa((nombre, docente_id) for docente_id, nombre, _ in docentes),
+        "documentos": _mapa((documento, docente_id) for docente_id, _, documento in docentes),
+        "ids": {docente_id for docente_id, _, _ in docentes},
+    }
+
+
+def _catalogos(colegio_id):
+    """Sedes, jornadas y docentes activos del colegio: tres consultas"""
+    sedes = db.session.execute(
+        select(Sede.id, Sede.nombre).where(Sede.colegio_id == colegio_id, Sede.activo.is_(True))
+    ).all()
+    jornadas = db.session.execute(
+        select(Jornada.id, Jornada.nombre, Jornada.sede_id)
+        .where(Jornada.colegio_id == colegio_id, Jornada.activo.is_(True))
+    ).all()
+    docentes = _catalogo_docentes(colegio_id)
+
+    jornadas_por_nombre = {}
+    for jornada_id, nombre, sede_id in jornadas:
+        jornadas_por_nombre.setdefault(_normalizar(nombre), []).append((jornada_id, sede_id))
+
+    return {
+        "sedes": _mapa((nombre, sede_id) for sede_id, nombre in sedes),
+        "jornadas": jornadas_por_nombre,
+        "docentes": docentes["docentes"],
+        "documentos": docentes["documentos"],
+        # Para validar los valores por defecto del formulario
+        "ids": {
+            "sede_id": {sede_id for sede_id, _ in sedes},
+            "jornada_id": {jornada_id for jornada_id, _, _ in jornadas},
+            "docente_id": docentes["ids"],
+        },
+    }
+
+
+def _resolver_jornada(jornadas, texto, sede_id):
+    # El mismo nombre ("Mañana") suele repetirse en cada sede
+    candidatas = [
+        jornada_id for jornada_id, sede_jornada in jornadas.get(_normalizar(texto), [])
+        if sede_id is None or sede_jornada in (sede_id, None)
+    ]
+    if not candidatas:
+        return None, f"Jornada '{texto}' no existe o está inactiva"
+    if len(candidatas) > 1:
+        return None, f"Jornada '{texto}' existe en varias sedes; indique la sede"
+    return candidatas[0], None
+
+
+def _resolver_docente(catalogos, texto):
+    # Primero por documento, luego por nombre
+    clave = _normalizar(texto)
+    docente_id = catalogos["documentos"].get(clave)
+    if docente_id is None:
+        docente_id = catalogos["docentes"].get(clave)
+
+    if docente_id is None:
+        return None, f"Docente '{texto}' no existe o está inactivo"
+    if docente_id is AMBIGUO:
+        return None, f"Hay varios docentes '{texto}'; use el documento"
+    return docente_id, None
+
+
+def _grado(texto):
+    """Grado canónico del formulario ("6", "6°", "6º" -> "6°") o None"""
+    clave = _normalizar(texto).replace("°", "").replace(" ", "")
+    if clave.endswith("o") and clave[:-1].isdigit():
+        clave = clave[:-1]
+    if clave in ("preescolar", "transicion", "0"):
+        return GRADOS[0]
+    if clave.isdigit() and 1 <= int(clave) <= 11:
+        return f"{int(clave)}°"
+    return None
+
+
+# ════════════════════════════════════════════════════════════════
+# REPORTE
+# ════════════════════════════════════════════════════════════════
+
+def _nuevo_reporte(simulacion):
+    return {
+        "simulacion": simulacion,
+        "leidas": 0,
+        "validas": 0,
+        "insertadas": 0,
+        "duplicadas_archivo": 0,
+        "duplicadas_existentes": 0,
+        "total_errores": 0,
+        "errores": [],
+    }
+
+
+def _anotar_error(reporte, numero, mensaje):
+    reporte["total_errores"] += 1
+    if len(reporte["errores"]) < MAX_ERRORES_REPORTE:
+        reporte["errores"].append({"fila": numero, "mensaje": mensaje})
+
+
+# ════════════════════════════════════════════════════════════════
+# ESTUDIANTES
+# ════════════════════════════════════════════════════════════════
+
+def _clave_estudiante(nombre, grado, grupo):
+    return (_normalizar(nombre), _grado(grado) or _normalizar(grado), _normalizar(grupo))
+
+
+def _validar_estudiante(valores, catalogos, defectos):
+    """(fila lista para insertar, None) o (None, mensaje de error)"""
+    nombre = valores["nombre"]
+    if not nombre:
+        return None, "El nombre es requerido"
+    if len(nombre) > 150:
+        return None, "El nombre supera 150 caracteres"
+
+    grado = _grado(valores["grado"])
+    if grado is None:
+        return None, f"Grado '{valores['grado']}' no válido"
+
+    grupo = valores.get("grupo") or None
+    if grupo and len(grupo) > 20:
+        return None, "El grupo supera 20 caracteres"
+
+    sede_id = defectos["sede_id"]
+    if valores.get("sede"):
+        sede_id = catalogos["sedes"].get(_normalizar(valores["sede"]))
+        if sede_id is None:
+            return None, f"Sede '{valores['sede']}' no existe o está inactiva"
+        if sede_id is AMBIGUO:
+            return None, f"Hay varias sedes '{valores['sede']}'"
+
+    jornada_id = defectos["jornada_id"]
+    if valores.get("jornada"):
+        jornada_id, error = _resolver_jornada(catalogos["jornadas"], valores["jornada"], sede_id)
+        if error:
+            return None, error
+    if jornada_id is None:
+        return None, "La jornada es requerida"
+
+    docente_id = defectos["docente_id"]
+    if valores.get("docente"):
+        docente_id, error = _resolver_docente(catalogos, valores["docente"])
+        if error:
+            return None, error
+    if docente_id is None:
+        return None, "El docente tutor es requerido"
+
+    return {
+        "nombre": nombre,
+        "grado": grado,
+        "grupo": grupo,
+        "sede_id": sede_id,
+        "jornada_id": jornada_id,
+        "docente_id": docente_id,
+    }, None
+
+
+def _anotar_cambios_roster(colegio_id, tokens):
+    """
+    Versión del roster para los escáneres sin conexión.
+
+    El COPY no pasa por los eventos del ORM que anotan cada alta: se
+    anotan aquí con INSERT ... SELECT por lotes de tokens.
+    """
+    ahora = datetime.utcnow()
+    version = sincronizacion_service.reservar_version(colegio_id)
+    for inicio in range(0, len(tokens), LOTE_TOKENS):
+        db.session.execute(
+            CambioRoster.__table__.insert().from_select(
+                ["colegio_id", "estudiante_id", "version", "creado_en"],
+                select(
+                    Estudiante.colegio_id,
+                    Estudiante.id,
+                    literal(version, db.Integer),
+                    literal(ahora, db.DateTime)
+                ).where(
+                    Estudiante.colegio_id == colegio_id,
+                    Estudiante.qr_token.in_(tokens[inicio:inicio + LOTE_TOKENS])
+                )
+            )
+        )
+
+
+def importar_estudiantes(archivo, nombre_archivo, colegio_id, simular=False,
+                         sede_id=None, jornada_id=None, docente_id=None):
+    """
+    Importa un listado de estudiantes (matrícula de inicio de año).
+
+    Columnas: nombre y grado (obligatorias), grupo, sede, jornada y
+    docente (nombre o documento). Sede, jornada y docente vacíos toman el
+    valor por defecto elegido en el formulario.
+
+    - Se valida en una sola pasada sobre el archivo; sedes, jornadas y
+      docentes se resuelven contra mapas en memoria (tres consultas).
+    - Duplicados: dentro del archivo, y contra el colegio con una sola
+      consulta (misma regla que el alta individual: nombre, grado y grupo).
+    - Las filas válidas se insertan juntas (COPY en PostgreSQL) con su
+      token QR ya generado; las inválidas se omiten y se reportan.
+    - Con simular=True solo se devuelve el reporte, sin escribir nada.
+
+    Returns: dict con el reporte (leidas, validas, insertadas,
+    duplicadas_archivo, duplicadas_existentes, total_errores, errores).
+
+    Raises:
+        ValueError: archivo ilegible o valor por defecto ajeno al colegio.
+    """
+    catalogos = _catalogos(colegio_id)
+    defectos = {"sede_id": sede_id, "jornada_id": jornada_id, "docente_id": docente_id}
+    for campo, id_ in defectos.items():
+        if id_ is not None and id_ not in catalogos["ids"][campo]:
+            raise ValueError("El valor por defecto no pertenece al colegio")
+
+    reporte = _nuevo_reporte(simular)
+    validas = {}
+
+    for numero, valores in leer_filas(archivo, nombre_archivo, COLUMNAS_ESTUDIANTES, OBLIGATORIAS_ESTUDIANTES):
+        reporte["leidas"] += 1
+
+        fila, error = _validar_estudiante(valores, catalogos, defectos)
+        if error:
+            _anotar_error(reporte, numero, error)
+            continue
+
+        clave = _clave_estudiante(fila["nombre"], fila["grado"], fila["grupo"])
+        if clave in validas:
+            reporte["duplicadas_archivo"] += 1
+            _anotar_error(reporte, numero, f"Repetido en el archivo (fila {validas[clave][0]})")
+            continue
+
+        validas[clave] = (numero, fila)
+
+    # Duplicados contra la base: una consulta con todo el colegio
+    if validas:
+        existentes = db.session.execute(
+            select(Estudiante.nombre, Estudiante.grado, Estudiante.grupo)
+            .where(Estudiante.colegio_id == colegio_id)
+        ).all()
+        for nombre, grado, grupo in existentes:
+            repetida = validas.pop(_clave_estudiante(nombre, grado or "", grupo or ""), None)
+            if repetida is not None:
+                reporte["duplicadas_existentes"] += 1
+                _anotar_error(reporte, repetida[0], "Ya está registrado en ese grado/grupo")
+
+    reporte["validas"] = len(validas)
+    reporte["errores"].sort(key=lambda error: error["fila"])
+
+    if simular or not validas:
+        return reporte
+
+    ahora = datetime.now()
+    tokens = set()
+    filas = []
+    for _, fila in sorted(validas.values(), key=lambda item: item[0]):
+        # Mismo formato que Estudiante.generar_qr_token
+        token = secrets.token_urlsafe(32)
+        while token in tokens:
+            token = secrets.token_urlsafe(32)
+        tokens.add(token)
+
+        filas.append({
+            **fila,
+            "colegio_id": colegio_id,
+            "institucion_id": colegio_id,
+            "qr_token": token,
+            "activo": True,
+            "fecha_creacion": ahora,
+        })
+
+    reporte["insertadas"] = insertar_masivo(Estudiante.__table__, filas)
+    _anotar_cambios_roster(colegio_id, [fila["qr_token"] for fila in filas])
+    db.session.commit()
+
+    # Tampoco pasan por los eventos que invalidan contadores e índice QR
+    contadores_cache.invalidar(colegio_id)
+    indice_qr.invalidar(colegio_id)
+
+    return reporte
+
+
+# ════════════════════════════════════════════════════════════════
+# DOCENTES
+# ════════════════════════════════════════════════════════════════
+
+def _validar_docente(valores, catalogos, sede_id):
+    """(fila lista para insertar, None) o (None, mensaje de error)"""
+    nombre = valores["nombre"]
+    if not nombre:
+        return None, "El nombre es requerido"
+
+    for campo, etiqueta, maximo in (
+        ("nombre", "El nombre", 150),
+        ("documento", "El documento", 20),
+        ("telefono", "El teléfono", 20),
+        ("email", "El email", 120),
+    ):
+        if len(valores.get(campo, "")) > maximo:
+            return None, f"{etiqueta} supera {maximo} caracteres"
+
+    email = valores.get("email") or None
+    if email and "@" not in email:
+        return None, f"Email '{email}' no válido"
+
+    if valores.get("sede"):
+        sede_id = catalogos["sedes"].get(_normalizar(valores["sede"]))
+        if sede_id is None:
+            return None, f"Sede '{valores['sede']}' no existe o está inactiva"
+        if sede_id is AMBIGUO:
+            return None, f"Hay varias sedes '{valores['sede']}'"
+
+    return {
+        "nombre": nombre,
+        "documento": valores.get("documento") or None,
+        "telefono": valores.get("telefono") or None,
+        "email": email,
+        "sede_id": sede_id,
+    }, None
+
+
+def importar_docentes(archivo, nombre_archivo, colegio_id, simular=False, sede_id=None):
+    """
+    Importa la planta docente desde CSV/XLSX.
+
+    Columnas: nombre (obligatoria), documento, teléfono, email y sede.
+    Un docente es duplicado si repite nombre (la regla del alta
+    individual) o documento, dentro del archivo o frente a cualquier
+    docente del colegio, activo o no; los del colegio se cargan en una
+    consulta. Las filas válidas se insertan juntas en una transacción.
+
+    Returns / Raises: como importar_estudiantes.
+    """
+    catalogos = _catalogos(colegio_id)
+    if sede_id is not None and sede_id not in catalogos["ids"]["sede_id"]:
+        raise ValueError("El valor por defecto no pertenece al colegio")
+
+    existentes = _catalogo_docentes(colegio_id, solo_activos=False)
+
+    reporte = _nuevo_reporte(simular)
+    filas = []
+    por_nombre = {}
+    por_documento = {}
+
+    for numero, valores in leer_filas(archivo, nombre_archivo, COLUMNAS_DOCENTES, OBLIGATORIAS_DOCENTES):
+        reporte["leidas"] += 1
+
+        fila, error = _validar_docente(valores, catalogos, sede_id)
+        if error:
+            _anotar_error(reporte, numero, error)
+            continue
+
+        nombre = _normalizar(fila["nombre"])
+        documento = _normalizar(fila["documento"])
+
+        repetida = por_nombre.get(nombre) or (por_documento.get(documento) if documento else None)
+        if repetida:
+            reporte["duplicadas_archivo"] += 1
+            _anotar_error(reporte, numero, f"Repetido en el archivo (fila {repetida})")
+            continue
+
+        if nombre in existentes["docentes"] or (documento and documento in existentes["documentos"]):
+            reporte["duplicadas_existentes"] += 1
+            _anotar_error(reporte, numero, "Ya está registrado (mismo nombre o documento)")
+            continue
+
+        por_nombre[nombre] = numero
+        if documento:
+            por_documento[documento] = numero
+        filas.append(fila)
+
+    reporte["validas"] = len(filas)
+    reporte["errores"].sort(key=lambda error: error["fila"])
+
+    if simular or not filas:
+        return reporte
+
+    ahora = datetime.now()
+    for fila in filas:
+        fila.update(colegio_id=colegio_id, activo=True, fecha_creacion=ahora)
+
+    reporte["insertadas"] = insertar_masivo(Docente.__table__, filas)
+    db.session.commit()
+
+    contadores_cache.invalidar(colegio_id)
+
+    return reporte
+
+
+# ════════════════════════════════════════════════════════════════
+# PERMISOS (históricos)
+# ════════════════════════════════════════════════════════════════
+
+def _fecha(texto):
+    # "2024-03-01 00:00:00" es una celda de fecha de Excel
+    texto = texto.split(" ")[0]
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _tipo_permiso(texto):
+    for tipo in TIPOS_PERMISO:
+        if _normalizar(tipo) == _normalizar(texto):
+            return tipo
+    return texto
+
+
+def _validar_permiso(valores, docentes):
+    """(fila lista para insertar, None) o (None, mensaje de error)"""
+    identificacion = valores.get("documento") or valores.get("docente")
+    if not identificacion:
+        return None, "Falta el documento o el nombre del docente"
+
+    docente_id, error = _resolver_docente(docentes, identificacion)
+    if error:
+        return None, error
+
+    tipo = _tipo_permiso(valores["tipo"])
+    if not tipo:
+        return None, "El tipo de permiso es requerido"
+    if len(tipo) > 100:
+        return None, "El tipo supera 100 caracteres"
+
+    fecha_inicio = _fecha(valores["fecha_inicio"])
+    fecha_fin = _fecha(valores["fecha_fin"])
+    if fecha_inicio is None:
+        return None, f"Fecha de inicio '{valores['fecha_inicio']}' no válida"
+    if fecha_fin is None:
+        return None, f"Fecha de fin '{valores['fecha_fin']}' no válida"
+
+    # Misma regla que chk_permiso_fechas en la base
+    if fecha_fin < fecha_inicio:
+        return None, "La fecha de fin es anterior a la de inicio"
+
+    return {
+        "docente_id": docente_id,
+        "tipo": tipo,
+        "fecha_inicio": fecha_inicio,
+        "fecha_fin": fecha_fin,
+        "observacion": valores.get("observacion") or None,
+    }, None
+
+
+def _clave_permiso(docente_id, fecha_inicio, fecha_fin, tipo):
+    return (docente_id, fecha_inicio, fecha_fin, _normalizar(tipo))
+
+
+def importar_permisos(archivo, nombre_archivo, colegio_id, simular=False):
+    """
+    Importa el historial de permisos de los docentes desde CSV/XLSX.
+
+    Columnas: documento o docente (nombre), tipo, fecha inicio, fecha fin
+    y observación. El docente se busca primero por documento entre todos
+    los del colegio, incluidos los inactivos (el historial puede ser de
+    docentes que ya no están). Un permiso es duplicado si repite docente,
+    fechas y tipo; los del colegio se buscan en una sola consulta acotada
+    a las fechas del archivo.
+
+    Returns / Raises: como importar_estudiantes.
+    """
+    docentes = _catalogo_docentes(colegio_id, solo_activos=False)
+
+    reporte = _nuevo_reporte(simular)
+    validas = {}
+
+    for numero, valores in leer_filas(archivo, nombre_archivo, COLUMNAS_PERMISOS, OBLIGATORIAS_PERMISOS):
+        reporte["leidas"] += 1
+
+        fila, error = _validar_permiso(valores, docentes)
+        if error:
+            _anotar_error(reporte, numero, error)
+            continue
+
+        clave = _clave_permiso(fila["docente_id"], fila["fecha_inicio"], fila["fecha_fin"], fila["tipo"])
+        if clave in validas:
+            reporte["duplicadas_archivo"] += 1
+            _anotar_error(reporte, numero, f"Repetido en el archivo (fila {validas[clave][0]})")
+            continue
+
+        validas[clave] = (numero, fila)
+
+    if validas:
+        inicios = [fila["fecha_inicio"] for _, fila in validas.values()]
+        existentes = db.session.execute(
+            select(Permiso.docente_id, Permiso.fecha_inicio, Permiso.fecha_fin, Permiso.tipo)
+            .where(
+                Permiso.colegio_id == colegio_id,
+                Permiso.fecha_inicio.between(min(inicios), max(inicios))
+            )
+        ).all()
+        for docente_id, fecha_inicio, fecha_fin, tipo in existentes:
+            repetida = validas.pop(_clave_permiso(docente_id, fecha_inicio, fecha_fin, tipo), None)
+            if repetida is not None:
+                reporte["duplicadas_existentes"] += 1
+                _anotar_error(reporte, repetida[0], "Ya está registrado")
+
+    reporte["validas"] = len(validas)
+    reporte["errores"].sort(key=lambda error: error["fila"])
+
+    if simular or not validas:
+        return reporte
+
+    filas = [
+        {**fila, "colegio_id": colegio_id}
+        for _, fila in sorted(validas.values(), key=lambda item: item[0])
+    ]
+
+    reporte["insertadas"] = insertar_masivo(Permiso.__table__, filas)
+    db.session.commit()
+
+    contadores_cache.invalidar(colegio_id)
+
+    return reporte
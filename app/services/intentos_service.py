@@ -0,0 +1,223 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+
+from app.utils.poda import PodaPeriodica
+
+
+# ════════════════════════════════════════════════════════════════
+# BACKENDS (ventana deslizante de intentos por clave)
+# ════════════════════════════════════════════════════════════════
+
+class MemoriaIntentos:
+    """
+    Intentos fallidos recientes en memoria del proceso.
+
+    Por clave se guardan a lo sumo `limite` marcas de tiempo (basta para
+    saber si se alcanzó el límite dentro de la ventana) y se conservan
+    las `max_claves` claves más recientes: un ataque con miles de correos
+    distintos no hace crecer la memoria sin tope.
+    """
+
+    nombre = "memoria"
+
+    def __init__(self, max_claves=100000):
+        self.max_claves = max_claves
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def registrar(self, clave, ventana, limite):
+        """Anota un intento y retorna cuántos hay dentro de la ventana"""
+        ahora = time.monotonic()
+        with self._lock:
+            marcas = self._datos.get(clave)
+            if marcas is None or marcas.maxlen != limite:
+                marcas = self._datos[clave] = deque(marcas or (), maxlen=limite)
+
+            marcas.append(ahora)
+            self._datos.move_to_end(clave)
+
+            while len(self._datos) > self.max_claves:
+                self._datos.popitem(last=False)
+
+            return self._vigentes(marcas, ahora - ventana)
+
+    def contar(self, clave, ventana):
+        with self._lock:
+            marcas = self._datos.get(clave)
+            if not marcas:
+                return 0
+            return self._vigentes(marcas, time.monotonic() - ventana)
+
+    @staticmethod
+    def _vigentes(marcas, desde):
+        while marcas and marcas[0] <= desde:
+            marcas.popleft()
+        return len(marcas)
+
+    def reiniciar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class SQLiteIntentos:
+    """
+    Intentos fallidos compartidos entre los workers de la misma máquina
+    (archivo SQLite): un ataque repartido entre workers suma en un solo
+    contador por correo e IP.
+    """
+
+    nombre = "sqlite"
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or os.path.join(
+            tempfile.gettempdir(),
+            "sistprof_intentos.sqlite3"
+        )
+        self._poda = PodaPeriodica()
+        self._local = threading.local()
+
+    def _conexion(self):
+        # Una conexión por hilo y por proceso (gunicorn hace fork de los workers)
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is not None and self._local.pid == os.getpid():
+            return conexion
+
+        conexion = sqlite3.connect(
+            self.ruta,
+            timeout=5,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        conexion.execute(
+            "CREATE TABLE IF NOT EXISTS intentos ("
+            " clave TEXT NOT NULL,"
+            " momento REAL NOT NULL)"
+        )
+        conexion.execute(
+            "CREATE INDEX IF NOT EXISTS ix_intentos_clave_momento"
+            " ON intentos (clave, momento)"
+        )
+
+        self._local.conexion = conexion
+        self._local.pid = os.getpid()
+        return conexion
+
+    def registrar(self, clave, ventana, limite):
+        conexion = self._conexion()
+        ahora = time.time()
+
+        conexion.execute(
+            "INSERT INTO intentos (clave, momento) VALUES (?, ?)",
+            (clave, ahora)
+        )
+
+        # Poda ocasional de intentos que ya salieron de cualquier ventana
+        if self._poda.toca():
+            conexion.execute(
+                "DELETE FROM intentos WHERE momento < ?",
+                (ahora - ventana,)
+            )
+
+        return self.contar(clave, ventana)
+
+    def contar(self, clave, ventana):
+        return self._conexion().execute(
+            "SELECT COUNT(*) FROM intentos WHERE clave = ? AND momento > ?",
+            (clave, time.time() - ventana)
+        ).fetchone()[0]
+
+    def reiniciar(self, clave):
+        self._conexion().execute(
+            "DELETE FROM intentos WHERE clave = ?",
+            (clave,)
+        )
+
+    def __len__(self):
+        return self._conexion().execute(
+            "SELECT COUNT(DISTINCT clave) FROM intentos"
+        ).fetchone()[0]
+
+
+BACKENDS = {
+    MemoriaIntentos.nombre: MemoriaIntentos,
+    SQLiteIntentos.nombre: SQLiteIntentos,
+}
+
+
+# ════════════════════════════════════════════════════════════════
+# CONTADOR DE INTENTOS DE LOGIN
+# ════════════════════════════════════════════════════════════════
+
+class ContadorIntentos:
+    """
+    Intentos fallidos de login por correo y por IP en ventanas deslizantes.
+
+    Un fallo ya no escribe en `usuarios`: solo se anota aquí. La fila se
+    toca en las transiciones: al bloquear (failed_attempts y locked_until,
+    ver auth_service.login_usuario) y al desbloquear con un login exitoso.
+    Una IP que supera su límite se rechaza antes de consultar la base.
+
+    Configuración (config.Config):
+        LOGIN_INTENTOS_BACKEND: "sqlite" (defecto, compartido) o "memoria" (por worker)
+        LOGIN_INTENTOS_RUTA: archivo del backend sqlite
+        LOGIN_INTENTOS_VENTANA_SEGUNDOS: ancho de la ventana
+        LOGIN_INTENTOS_MAX_IP: fallos por IP dentro de la ventana
+    """
+
+    def __init__(self, app=None):
+        self.backend = MemoriaIntentos()
+        self.ventana = 900
+        self.max_ip = 50
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        nombre = app.config.get("LOGIN_INTENTOS_BACKEND", "sqlite")
+
+        if nombre not in BACKENDS:
+            raise ValueError(f"Backend de intentos desconocido: {nombre}")
+
+        if nombre == SQLiteIntentos.nombre:
+            self.backend = SQLiteIntentos(app.config.get("LOGIN_INTENTOS_RUTA"))
+        else:
+            self.backend = MemoriaIntentos()
+
+        self.ventana = app.config.get("LOGIN_INTENTOS_VENTANA_SEGUNDOS", 900)
+        self.max_ip = app.config.get("LOGIN_INTENTOS_MAX_IP", 50)
+        app.extensions["contador_intentos"] = self
+
+    @staticmethod
+    def _clave_email(email):
+        return f"email:{(email or '').strip().lower()}"
+
+    @staticmethod
+    def _clave_ip(ip):
+        return f"ip:{ip}"
+
+    def ip_bloqueada(self, ip):
+        if not ip or not self.max_ip:
+            return False
+        return self.backend.contar(self._clave_ip(ip), self.ventana) >= self.max_ip
+
+    def registrar_fallo(self, email, ip, limite_email):
+        """Anota un fallo para el correo y la IP; retorna los fallos del correo en la ventana"""
+        if ip and self.max_ip:
+            self.backend.registrar(self._clave_ip(ip), self.ventana, self.max_ip)
+
+        return self.backend.registrar(self._clave_email(email), self.ventana, limite_email)
+
+    def reiniciar(self, email):
+        self.backend.reiniciar(self._clave_email(email))
+
+
+contador_intentos = ContadorIntentos()
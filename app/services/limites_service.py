@@ -0,0 +1,219 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import click
+from flask import current_app, jsonify, make_response, request
+from flask_login import current_user
+from flask_limiter.util import get_remote_address
+from limits import parse_many
+from limits.storage import Storage, storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from app.utils.poda import PodaPeriodica
+
+
+# ════════════════════════════════════════════════════════════════
+# ALMACÉN DE LÍMITES COMPARTIDO ENTRE WORKERS
+# ════════════════════════════════════════════════════════════════
+
+class SQLiteStorage(Storage):
+    """
+    Contadores de flask-limiter (ventana fija) en un archivo SQLite.
+
+    Con "memory://" cada worker de gunicorn lleva sus propios contadores
+    y con -w 4 un límite de 50/hora deja pasar hasta 200. Aquí todos los
+    workers de la máquina incrementan la misma fila: cada chequeo es un
+    único UPSERT ... RETURNING (atómico, sin lectura previa) sobre un
+    archivo en WAL, sin ir a la base de datos principal.
+
+    URI: "sqlite://" (archivo en el directorio temporal) o
+    "sqlite:////ruta/limites.sqlite3" (p. ej. en /dev/shm para no tocar disco).
+    Se registra en `limits` al importar este módulo.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri=None, wrap_exceptions=False, **options):
+        # Como en SQLAlchemy: sqlite:///relativa, sqlite:////absoluta
+        ruta = (uri or "").partition("://")[2]
+        ruta = ruta[1:] if ruta.startswith("/") else ruta
+        self.ruta = ruta or os.path.join(
+            tempfile.gettempdir(),
+            "sistprof_limites.sqlite3"
+        )
+        self._poda = PodaPeriodica(cada=256)
+        self._local = threading.local()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _conexion(self):
+        # Una conexión por hilo y por proceso (gunicorn hace fork de los workers)
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is not None and self._local.pid == os.getpid():
+            return conexion
+
+        conexion = sqlite3.connect(
+            self.ruta,
+            timeout=5,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        conexion.execute(
+            "CREATE TABLE IF NOT EXISTS limites ("
+            " clave TEXT PRIMARY KEY,"
+            " valor INTEGER NOT NULL,"
+            " expira REAL NOT NULL)"
+        )
+
+        self._local.conexion = conexion
+        self._local.pid = os.getpid()
+        return conexion
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        # elastic_expiry: firma de limits < 5 (flask-limiter no lo usa en ventana fija)
+        ahora = time.time()
+        conexion = self._conexion()
+
+        valor = conexion.execute(
+            "INSERT INTO limites (clave, valor, expira) VALUES (?, ?, ?)"
+            " ON CONFLICT (clave) DO UPDATE SET"
+            "  valor = CASE WHEN expira <= ? THEN excluded.valor ELSE valor + excluded.valor END,"
+            "  expira = CASE WHEN expira <= ? OR ? THEN excluded.expira ELSE expira END"
+            " RETURNING valor",
+            (key, amount, ahora + expiry, ahora, ahora, bool(elastic_expiry))
+        ).fetchone()[0]
+
+        # Poda ocasional de ventanas vencidas para que el archivo no crezca
+        if self._poda.toca():
+            conexion.execute("DELETE FROM limites WHERE expira <= ?", (ahora,))
+
+        return valor
+
+    def get(self, key):
+        fila = self._conexion().execute(
+            "SELECT valor FROM limites WHERE clave = ? AND expira > ?",
+            (key, time.time())
+        ).fetchone()
+        return fila[0] if fila else 0
+
+    def get_expiry(self, key):
+        fila = self._conexion().execute(
+            "SELECT expira FROM limites WHERE clave = ? AND expira > ?",
+            (key, time.time())
+        ).fetchone()
+        return fila[0] if fila else time.time()
+
+    def check(self):
+        try:
+            self._conexion().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self._conexion().execute("DELETE FROM limites").rowcount
+
+    def clear(self, key):
+        self._conexion().execute("DELETE FROM limites WHERE clave = ?", (key,))
+
+
+# ════════════════════════════════════════════════════════════════
+# LÍMITES POR RUTA
+# ════════════════════════════════════════════════════════════════
+
+def limite_login():
+    return current_app.config.get("RATELIMIT_LOGIN", "10 per minute;50 per hour")
+
+
+def limite_qr():
+    return current_app.config.get("RATELIMIT_QR", "600 per minute")
+
+
+def clave_login():
+    """
+    Clave del límite del POST de login: correo + IP del cliente. Los docentes
+    de un colegio entran a la misma hora desde la misma IP (NAT); por IP sola
+    se frenarían entre sí. El relleno de credenciales desde una IP lo corta
+    LOGIN_INTENTOS_MAX_IP (ver intentos_service).
+    """
+    email = (request.form.get("email") or "").strip().lower()
+    return f"login:{get_remote_address()}:{email}"
+
+
+def clave_usuario():
+    """
+    Clave de los límites de escaneo: el usuario de la sesión. Los equipos
+    de portería de un colegio suelen salir por la misma IP (NAT), así que
+    limitar por IP los frenaría entre sí.
+    """
+    if current_user.is_authenticated:
+        return f"usuario:{current_user.id}"
+    return get_remote_address()
+
+
+def respuesta_limite_json(limite):
+    """Respuesta 429 en JSON para los endpoints que consumen los escáneres"""
+    return make_response(jsonify({
+        "success": False,
+        "message": f"Demasiadas peticiones ({limite.limit}). Intenta de nuevo en unos segundos."
+    }), 429)
+
+
+# ════════════════════════════════════════════════════════════════
+# BENCHMARK
+# ════════════════════════════════════════════════════════════════
+
+def medir_chequeos(storage_uri, limites, peticiones):
+    """
+    Costo por petición de los límites `limites` (cadena de flask-limiter,
+    p. ej. "200 per day;50 per hour") contra `storage_uri`: un hit por
+    límite, como hace flask-limiter antes de cada vista.
+    Retorna: microsegundos por petición
+    """
+    storage = storage_from_string(storage_uri)
+    estrategia = FixedWindowRateLimiter(storage)
+    items = parse_many(limites)
+
+    claves = [f"10.0.{indice % 250}.{indice % 7}" for indice in range(peticiones)]
+
+    inicio = time.perf_counter()
+    for clave in claves:
+        for item in items:
+            estrategia.hit(item, clave, "benchmark")
+    transcurrido = time.perf_counter() - inicio
+
+    # Solo las claves del benchmark: el storage puede ser el de producción
+    for clave in set(claves):
+        for item in items:
+            estrategia.clear(item, clave, "benchmark")
+
+    return transcurrido * 1_000_000 / peticiones
+
+
+def init_app(app):
+    """Registra `flask benchmark-limites`"""
+
+    @app.cli.command("benchmark-limites")
+    @click.option("--storages", default=None,
+                  help="URIs separadas por coma (por defecto memory:// y RATELIMIT_STORAGE_URI)")
+    @click.option("--limites", default="200 per day;50 per hour",
+                  help="Límites evaluados en cada petición")
+    @click.option("--peticiones", type=int, default=20000)
+    def benchmark_limites_command(storages, limites, peticiones):
+        """Microsegundos que agrega el rate limit a cada petición, por storage"""
+        if storages is None:
+            storages = f"memory://,{app.config.get('RATELIMIT_STORAGE_URI', 'sqlite://')}"
+
+        print(f"{peticiones} peticiones, límites: {limites}")
+        print(f"{'storage':<40}{'µs/petición':>12}")
+
+        for uri in (u.strip() for u in storages.split(",") if u.strip()):
+            print(f"{uri:<40}{medir_chequeos(uri, limites, peticiones):>12.1f}")
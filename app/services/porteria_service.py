@@ -0,0 +1,512 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from datetime import datetime, date, time as hora_del_dia, timedelta
+
+from flask import current_app
+from sqlalchemy import select, insert
+
+from app.extensions import db, indice_qr
+from app.models.estudiante import Estudiante
+from app.models.jornada import Jornada
+from app.models.novedad import Novedad, TipoNovedad, TipoGravedad
+from app.services import asistencia_service
+from app.utils.fechas import ahora_local
+
+# Veces que se reintenta un evento cuyo lote falló antes de pasarlo al respaldo
+MAX_INTENTOS = 3
+
+# Cada cuántos segundos el hilo de vaciado reintenta el respaldo en disco
+SEGUNDOS_REPROCESO = 60
+
+ENCOLADO = "encolado"
+
+
+# ════════════════════════════════════════════════════════════════
+# PROCESAMIENTO DE UN LOTE (una transacción)
+# ════════════════════════════════════════════════════════════════
+
+def procesar_eventos(eventos, colegio_id, ahora=None, commit=True):
+    """
+    Guarda un lote de eventos de portería y sus llegadas tarde.
+
+    1. Inserta los ingresos/salidas con un único INSERT ... ON CONFLICT DO NOTHING.
+    2. Para los ingresos realmente insertados carga, en una consulta, la
+       jornada de cada estudiante y compara la hora local del escaneo
+       (asistencia_service ya convierte los timestamps con zona) contra
+       hora_inicio + tolerancia_minutos, que también es hora local.
+    3. Inserta las novedades LLEGADA_TARDE en un solo INSERT.
+
+    Todo va en la misma transacción: o queda el ingreso con su novedad o
+    no queda nada (un reintento no duplica, el ingreso ya existente se
+    reporta como "duplicada" y no genera otra novedad).
+
+    Args:
+        eventos: dicts {"qr_token", "tipo": "ingreso"|"salida", "timestamp", "metodo"}
+        colegio_id: colegio de los eventos
+        ahora: datetime de referencia para eventos sin timestamp
+        commit: False si el llamador confirma la transacción
+
+    Returns: resultados en el orden de `eventos`; los ingresos tarde traen
+    "tarde": True.
+    """
+    resultados = asistencia_service.registrar_eventos_porteria(
+        eventos,
+        colegio_id,
+        ahora=ahora,
+        commit=False
+    )
+
+    ingresos = [
+        resultado for resultado in resultados
+        if resultado["resultado"] == asistencia_service.REGISTRADA and resultado["tipo"] == "ingreso"
+    ]
+
+    if ingresos:
+        limites = _limites_llegada({resultado["estudiante_id"] for resultado in ingresos})
+        novedades = []
+
+        for resultado in ingresos:
+            limite = limites.get(resultado["estudiante_id"])
+            hora = hora_del_dia.fromisoformat(resultado["hora"])
+            if limite is None or hora <= limite[0]:
+                continue
+
+            resultado["tarde"] = True
+            novedades.append({
+                "estudiante_id": resultado["estudiante_id"],
+                "tipo_novedad": TipoNovedad.LLEGADA_TARDE,
+                "gravedad": TipoGravedad.TIPO_1,
+                "categoria": "porteria",
+                "fecha": date.fromisoformat(resultado["fecha"]),
+                "hora": hora,
+                "informe": (
+                    f"Llegada tarde a las {hora.strftime('%H:%M')} "
+                    f"(jornada {limite[1]} inicia a las {limite[2].strftime('%H:%M')})"
+                ),
+            })
+
+        if novedades:
+            db.session.execute(insert(Novedad), novedades)
+
+    if commit:
+        db.session.commit()
+
+    return resultados
+
+
+def _limites_llegada(estudiante_ids):
+    """
+    {estudiante_id: (hora límite, nombre jornada, hora_inicio)} en una consulta.
+
+    Estudiantes sin jornada no se evalúan.
+    """
+    filas = db.session.execute(
+        select(
+            Estudiante.id,
+            Jornada.nombre,
+            Jornada.hora_inicio,
+            Jornada.tolerancia_minutos
+        )
+        .join(Jornada, Estudiante.jornada_id == Jornada.id)
+        .where(Estudiante.id.in_(estudiante_ids))
+    ).all()
+
+    limites = {}
+    for estudiante_id, nombre, hora_inicio, tolerancia in filas:
+        inicio = datetime.combine(date.today(), hora_inicio)
+        limite = inicio + timedelta(minutes=tolerancia or 0)
+        # Una tolerancia que pase de medianoche no marca a nadie tarde ese día
+        limite = limite.time() if limite.date() == inicio.date() else hora_del_dia.max
+        limites[estudiante_id] = (limite, nombre, hora_inicio)
+    return limites
+
+
+# ════════════════════════════════════════════════════════════════
+# BUFFER EN PROCESO
+# ════════════════════════════════════════════════════════════════
+
+class BufferPorteria:
+    """
+    Cola en memoria de eventos de portería, vaciada por lotes.
+
+    El endpoint solo valida el token contra el índice QR y encola; el lote
+    se guarda cuando la cola llega a PORTERIA_LOTE_MAXIMO eventos (en la
+    misma petición que la llena) o cada PORTERIA_LOTE_SEGUNDOS (hilo por
+    worker). Los eventos encolados que no alcanzan a guardarse si el proceso
+    muere se pierden: por eso el lote es pequeño y el hilo frecuente, y al
+    apagar el worker se vacía la cola.
+
+    Un evento cuyo lote falla MAX_INTENTOS veces no se descarta: se registra
+    con logger.error y se agrega a un archivo JSON lines por worker en
+    PORTERIA_RESPALDO_DIR, que el hilo de vaciado (o `flask
+    reprocesar-porteria`) vuelve a guardar cuando la base responde.
+    """
+
+    def __init__(self):
+        self.maximo = 200
+        self.segundos = 2
+        self.respaldo = None
+        self._pendientes = []
+        self._lock = threading.Lock()
+        self._vaciando = threading.Lock()
+        self._respaldando = threading.Lock()
+        self._metricas = {
+            "encolados": 0,
+            "guardados": 0,
+            "lotes": 0,
+            "respaldados": 0,
+            "reprocesados": 0,
+            "en_cuarentena": 0,
+            "descartados": 0,
+        }
+        self._ultimo_vaciado = None
+
+    def configurar(self, maximo, segundos, respaldo=None):
+        self.maximo = maximo
+        self.segundos = segundos
+        self.respaldo = respaldo
+
+    def agregar(self, colegio_id, eventos):
+        """Encola eventos ya validados; True si la cola alcanzó el tamaño de lote"""
+        with self._lock:
+            for evento in eventos:
+                self._pendientes.append((colegio_id, evento, 0))
+            self._metricas["encolados"] += len(eventos)
+            return len(self._pendientes) >= self.maximo
+
+    def vaciar(self, ahora=None):
+        """
+        Guarda todo lo pendiente, un lote por colegio.
+
+        Un solo vaciado a la vez por worker; los eventos de un lote que falla
+        vuelven a la cola hasta MAX_INTENTOS veces (sin afectar a los lotes
+        de otros colegios) y después pasan al respaldo en disco.
+
+        Returns: número de eventos guardados.
+        """
+        with self._vaciando:
+            with self._lock:
+                pendientes, self._pendientes = self._pendientes, []
+
+            if not pendientes:
+                return 0
+
+            por_colegio = defaultdict(list)
+            for colegio_id, evento, intentos in pendientes:
+                por_colegio[colegio_id].append((evento, intentos))
+
+            guardados = 0
+            for colegio_id, lote in por_colegio.items():
+                try:
+                    procesar_eventos([evento for evento, _ in lote], colegio_id, ahora=ahora)
+                    guardados += len(lote)
+                except Exception:
+                    db.session.rollback()
+                    self._reencolar(colegio_id, lote)
+                    current_app.logger.exception(
+                        "Error guardando %s eventos de portería del colegio %s",
+                        len(lote),
+                        colegio_id
+                    )
+
+            with self._lock:
+                self._metricas["guardados"] += guardados
+                self._metricas["lotes"] += len(por_colegio)
+                self._ultimo_vaciado = datetime.utcnow()
+
+            return guardados
+
+    def _reencolar(self, colegio_id, lote):
+        reintentos = []
+        agotados = []
+        for evento, intentos in lote:
+            if intentos + 1 < MAX_INTENTOS:
+                reintentos.append((colegio_id, evento, intentos + 1))
+            else:
+                agotados.append(evento)
+
+        with self._lock:
+            self._pendientes[:0] = reintentos
+
+        if agotados:
+            self._respaldar(colegio_id, agotados)
+
+    # --------------------
+    # Respaldo en disco
+    # --------------------
+
+    def _archivo_respaldo(self):
+        # Un archivo por worker: los procesos no se pisan las líneas
+        return os.path.join(self.respaldo, f"porteria-{os.getpid()}.jsonl")
+
+    def _archivo_cuarentena(self):
+        # Fuera del patrón porteria-*.jsonl: no se vuelve a reprocesar
+        return os.path.join(self.respaldo, "cuarentena.jsonl")
+
+    def _respaldar(self, colegio_id, eventos):
+        for evento in eventos:
+            current_app.logger.error(
+                "Evento de portería sin guardar tras %s intentos (colegio %s, %s %s %s)",
+                MAX_INTENTOS,
+                colegio_id,
+                evento.get("tipo"),
+                evento.get("qr_token"),
+                evento.get("timestamp")
+            )
+
+        try:
+            if not self.respaldo:
+                raise RuntimeError("PORTERIA_RESPALDO_DIR no configurado")
+
+            os.makedirs(self.respaldo, exist_ok=True)
+            with self._respaldando, open(self._archivo_respaldo(), "a", encoding="utf-8") as archivo:
+                for evento in eventos:
+                    archivo.write(json.dumps({"colegio_id": colegio_id, "evento": evento}) + "\n")
+                archivo.flush()
+                os.fsync(archivo.fileno())
+        except Exception:
+            current_app.logger.exception(
+                "No se pudieron respaldar %s eventos de portería del colegio %s",
+                len(eventos),
+                colegio_id
+            )
+            metrica = "descartados"
+        else:
+            metrica = "respaldados"
+
+        with self._lock:
+            self._metricas[metrica] += len(eventos)
+
+    def reprocesar_respaldo(self):
+        """
+        Guarda los eventos del respaldo en disco, un lote por colegio.
+
+        Cada archivo se renombra a .procesando antes de leerlo (los workers
+        siguen escribiendo en uno nuevo) y se borra cuando todos sus lotes
+        quedan guardados; si alguno falla, el archivo conserva solo los
+        pendientes para el próximo intento. Las líneas ilegibles pasan a
+        cuarentena.jsonl sin frenar el resto. Guardar dos veces un evento no
+        duplica nada (ON CONFLICT DO NOTHING).
+
+        Returns: número de eventos guardados.
+        """
+        if not self.respaldo or not os.path.isdir(self.respaldo):
+            return 0
+
+        with self._vaciando:
+            guardados = 0
+            for ruta in sorted(glob.glob(os.path.join(self.respaldo, "porteria-*.jsonl"))):
+                procesando = ruta + ".procesando"
+                if not os.path.exists(procesando):
+                    os.replace(ruta, procesando)
+
+            for ruta in sorted(glob.glob(os.path.join(self.respaldo, "*.procesando"))):
+                guardados += self._reprocesar_archivo(ruta)
+
+        with self._lock:
+            self._metricas["reprocesados"] += guardados
+
+        return guardados
+
+    def _reprocesar_archivo(self, ruta):
+        por_colegio = defaultdict(list)
+        corruptas = []
+        with open(ruta, encoding="utf-8", errors="replace") as archivo:
+            for linea in archivo:
+                if not linea.strip():
+                    continue
+                try:
+                    registro = json.loads(linea)
+                    por_colegio[registro["colegio_id"]].append(registro["evento"])
+                except (ValueError, KeyError, TypeError):
+                    # Línea truncada (p. ej. el worker murió a mitad de escritura)
+                    corruptas.append(linea if linea.endswith("\n") else linea + "\n")
+
+        if corruptas:
+            self._poner_en_cuarentena(ruta, corruptas)
+
+        guardados = 0
+        fallidos = []
+        for colegio_id, eventos in por_colegio.items():
+            try:
+                procesar_eventos(eventos, colegio_id)
+                guardados += len(eventos)
+            except Exception:
+                db.session.rollback()
+                fallidos.extend({"colegio_id": colegio_id, "evento": evento} for evento in eventos)
+                current_app.logger.exception(
+                    "Error reprocesando %s eventos de portería del colegio %s",
+                    len(eventos),
+                    colegio_id
+                )
+
+        if fallidos:
+            temporal = ruta + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as archivo:
+                for registro in fallidos:
+                    archivo.write(json.dumps(registro) + "\n")
+            os.replace(temporal, ruta)
+        else:
+            os.remove(ruta)
+
+        return guardados
+
+    def _poner_en_cuarentena(self, ruta, lineas):
+        """Aparta las líneas ilegibles del respaldo para revisarlas a mano"""
+        current_app.logger.error(
+            "%s líneas ilegibles en %s pasan a %s",
+            len(lineas),
+            ruta,
+            self._archivo_cuarentena()
+        )
+        with open(self._archivo_cuarentena(), "a", encoding="utf-8") as archivo:
+            archivo.writelines(lineas)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+        with self._lock:
+            self._metricas["en_cuarentena"] += len(lineas)
+
+    def metricas(self):
+        with self._lock:
+            datos = dict(self._metricas)
+            datos["pendientes"] = len(self._pendientes)
+        datos["ultimo_vaciado"] = self._ultimo_vaciado.isoformat() if self._ultimo_vaciado else None
+        datos["lote_maximo"] = self.maximo
+        datos["lote_segundos"] = self.segundos
+        datos["pid"] = os.getpid()
+        return datos
+
+
+buffer_porteria = BufferPorteria()
+
+
+def encolar_eventos(eventos, colegio_id, ahora=None):
+    """
+    Valida y encola eventos de portería; vacía la cola si llegó al tamaño de lote.
+
+    La validación no toca la base (índice QR) y rechaza los timestamps que no
+    se pueden leer o caen fuera de la ventana aceptada. El timestamp se fija aquí si el dispositivo no lo envió,
+    para que la llegada tarde se calcule con la hora del escaneo y no con la
+    del guardado.
+
+    Returns: resultados por evento ("encolado", "no_encontrado", "invalido").
+    """
+    ahora = ahora or ahora_local()
+    entradas = indice_qr.resolver_varios(
+        {str(evento.get("qr_token") or "").strip() for evento in eventos},
+        colegio_id
+    )
+
+    resultados = []
+    validos = []
+    for evento in eventos:
+        qr_token = str(evento.get("qr_token") or "").strip()
+        resultado = {"qr_token": qr_token}
+        resultados.append(resultado)
+
+        # Un timestamp ilegible se rechaza aquí: al vaciar ya no hay a quién avisarle
+        timestamp = evento.get("timestamp")
+        if (
+            evento.get("tipo") not in asistencia_service.TIPOS_EVENTO
+            or (timestamp and asistencia_service._leer_timestamp(timestamp, ahora) is None)
+        ):
+            resultado["resultado"] = asistencia_service.INVALIDO
+            continue
+
+        entrada = entradas.get(qr_token)
+        if entrada is None:
+            resultado["resultado"] = asistencia_service.NO_ENCONTRADO
+            continue
+
+        resultado.update(
+            resultado=ENCOLADO,
+            estudiante_id=entrada.estudiante_id,
+            nombre=entrada.nombre
+        )
+        validos.append({
+            "qr_token": qr_token,
+            "tipo": evento["tipo"],
+            "timestamp": timestamp or ahora.isoformat(),
+            "metodo": evento.get("metodo") or "QR",
+        })
+
+    if validos and buffer_porteria.agregar(colegio_id, validos):
+        buffer_porteria.vaciar()
+
+    return resultados
+
+
+# ════════════════════════════════════════════════════════════════
+# HILO DE VACIADO
+# ════════════════════════════════════════════════════════════════
+
+def init_app(app):
+    """
+    Configura el buffer y arranca, en cada worker, el hilo que lo vacía
+    cada PORTERIA_LOTE_SEGUNDOS (en modo testing solo se vacía por tamaño
+    o llamando a buffer_porteria.vaciar()).
+    """
+    buffer_porteria.configurar(
+        app.config.get("PORTERIA_LOTE_MAXIMO", 200),
+        app.config.get("PORTERIA_LOTE_SEGUNDOS", 2),
+        app.config.get("PORTERIA_RESPALDO_DIR") or os.path.join(app.instance_path, "porteria_respaldo")
+    )
+
+    @app.cli.command("reprocesar-porteria")
+    def reprocesar_porteria_command():
+        """Guarda los eventos de portería que quedaron en el respaldo en disco"""
+        guardados = buffer_porteria.reprocesar_respaldo()
+        print(f"Eventos de portería reprocesados: {guardados}")
+
+    @atexit.register
+    def _vaciar_al_salir():
+        with app.app_context():
+            buffer_porteria.vaciar()
+
+    if app.testing or not buffer_porteria.segundos:
+        return
+
+    estado = {"pid": None}
+    lock = threading.Lock()
+
+    @app.before_request
+    def _arrancar_vaciado_periodico():
+        # gunicorn hace fork de los workers: un hilo por proceso
+        if estado["pid"] == os.getpid():
+            return
+
+        with lock:
+            if estado["pid"] == os.getpid():
+                return
+            estado["pid"] = os.getpid()
+
+            threading.Thread(
+                target=_bucle_vaciado,
+                args=(app,),
+                name="vaciado-porteria",
+                daemon=True
+            ).start()
+
+
+def _bucle_vaciado(app):
+    proximo_reproceso = time.monotonic() + SEGUNDOS_REPROCESO
+    while True:
+        time.sleep(buffer_porteria.segundos or 1)
+        with app.app_context():
+            try:
+                buffer_porteria.vaciar()
+
+                if time.monotonic() >= proximo_reproceso:
+                    proximo_reproceso = time.monotonic() + SEGUNDOS_REPROCESO
+                    buffer_porteria.reprocesar_respaldo()
+            except Exception:
+                app.logger.exception("Error en el hilo de vaciado de portería")
+            finally:
+                db.session.remove()
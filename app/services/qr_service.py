@@ -0,0 +1,238 @@
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+# Lo que necesita la portería para resolver un escaneo sin ir a la base
+EntradaQR = namedtuple(
+    "EntradaQR",
+    ["estudiante_id", "colegio_id", "nombre", "grado", "grupo", "jornada_id"]
+)
+
+# Índice de un colegio con la versión del roster de la que salió y sus plazos (monotonic)
+IndiceColegio = namedtuple("IndiceColegio", ["indice", "version", "vence", "verificar_en"])
+
+# Si cambia alguno de estos campos el índice del colegio deja de ser válido
+CAMPOS_INDICE = ("qr_token", "colegio_id", "nombre", "grado", "grupo", "jornada_id")
+
+
+class IndiceQR:
+    """
+    Índice en memoria qr_token -> EntradaQR, uno por colegio y por worker.
+
+    - Se carga con una sola consulta la primera vez que se escanea en un
+      colegio; a partir de ahí resolver un token no toca la base de datos.
+    - Los cambios a estudiantes (alta, baja, nuevo token, cambio de nombre
+      o jornada) descartan el índice del colegio al hacer commit, igual que
+      la cache de contadores.
+    - Otros workers no ven esa invalidación en memoria: cada índice guarda
+      la versión del roster del colegio (versiones_roster, que sube con
+      cualquier cambio de estudiantes en cualquier worker) y la compara a
+      lo sumo cada QR_INDICE_VERIFICACION_SEGUNDOS; si cambió, se recarga.
+      Un token revocado en otro worker deja de resolver en ese plazo.
+    - Un token desconocido se busca una vez en la base antes de darlo por
+      inválido, y cada índice caduca igual a los QR_INDICE_TTL segundos.
+
+    Configuración (config.Config):
+        QR_INDICE_TTL: segundos de vida del índice de cada colegio
+        QR_INDICE_VERIFICACION_SEGUNDOS: cada cuánto se compara la versión
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 300
+        self.verificacion = 5
+        self._indices = {}
+        self._lock = threading.Lock()
+        self._modelo = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("QR_INDICE_TTL", 300)
+        self.verificacion = app.config.get("QR_INDICE_VERIFICACION_SEGUNDOS", 5)
+        app.extensions["indice_qr"] = self
+
+    # --------------------
+    # Consulta
+    # --------------------
+
+    def resolver(self, qr_token, colegio_id):
+        """EntradaQR del token dentro del colegio, o None si no existe"""
+        if not qr_token:
+            return None
+
+        indice = self._indice(colegio_id)
+        entrada = indice.get(qr_token)
+        if entrada is not None:
+            return entrada
+
+        # Token nuevo generado en otro worker: una consulta y queda indexado
+        entrada = self._buscar_en_db(qr_token, colegio_id)
+        if entrada is not None:
+            with self._lock:
+                indice[qr_token] = entrada
+        return entrada
+
+    def resolver_varios(self, qr_tokens, colegio_id):
+        """
+        Resuelve un lote de tokens: {qr_token: EntradaQR} solo con los encontrados.
+
+        Los que no están en el índice se buscan juntos en UNA consulta IN.
+        """
+        indice = self._indice(colegio_id)
+        encontrados = {}
+        faltantes = set()
+
+        for qr_token in qr_tokens:
+            if not qr_token:
+                continue
+            entrada = indice.get(qr_token)
+            if entrada is not None:
+                encontrados[qr_token] = entrada
+            else:
+                faltantes.add(qr_token)
+
+        if faltantes:
+            from app.extensions import db
+
+            filas = db.session.execute(
+                self._consulta().where(
+                    self._modelo.qr_token.in_(faltantes),
+                    self._modelo.colegio_id == colegio_id
+                )
+            ).all()
+
+            with self._lock:
+                for fila in filas:
+                    entrada = EntradaQR(*fila[1:])
+                    indice[fila[0]] = encontrados[fila[0]] = entrada
+
+        return encontrados
+
+    def _indice(self, colegio_id):
+        ahora = time.monotonic()
+        with self._lock:
+            actual = self._indices.get(colegio_id)
+
+        if actual is not None and actual.vence > ahora:
+            if actual.verificar_en > ahora:
+                return actual.indice
+
+            # Sin cambios en el roster desde que se cargó: sigue sirviendo
+            if self._version(colegio_id) == actual.version:
+                with self._lock:
+                    self._indices[colegio_id] = actual._replace(verificar_en=ahora + self.verificacion)
+                return actual.indice
+
+        # La versión se lee ANTES que las filas: un cambio en medio recarga en la próxima verificación
+        version = self._version(colegio_id)
+        indice = self._cargar_colegio(colegio_id)
+
+        with self._lock:
+            self._indices[colegio_id] = IndiceColegio(
+                indice,
+                version,
+                ahora + self.ttl,
+                ahora + self.verificacion
+            )
+        return indice
+
+    @staticmethod
+    def _version(colegio_id):
+        from app.services.sincronizacion_service import version_actual
+        return version_actual(colegio_id)
+
+    def _consulta(self):
+        modelo = self._modelo
+        return select(
+            modelo.qr_token,
+            modelo.id,
+            modelo.colegio_id,
+            modelo.nombre,
+            modelo.grado,
+            modelo.grupo,
+            modelo.jornada_id
+        )
+
+    def _cargar_colegio(self, colegio_id):
+        from app.extensions import db
+
+        filas = db.session.execute(
+            self._consulta().where(
+                self._modelo.colegio_id == colegio_id,
+                self._modelo.qr_token.isnot(None)
+            )
+        ).all()
+
+        return {fila[0]: EntradaQR(*fila[1:]) for fila in filas}
+
+    def _buscar_en_db(self, qr_token, colegio_id):
+        from app.extensions import db
+
+        fila = db.session.execute(
+            self._consulta().where(
+                self._modelo.qr_token == qr_token,
+                self._modelo.colegio_id == colegio_id
+            )
+        ).first()
+
+        return EntradaQR(*fila[1:]) if fila is not None else None
+
+    # --------------------
+    # Invalidación
+    # --------------------
+
+    def invalidar(self, *colegio_ids):
+        with self._lock:
+            for colegio_id in colegio_ids:
+                self._indices.pop(colegio_id, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._indices.clear()
+
+    def registrar_modelo(self, modelo):
+        """Indexa `modelo` (Estudiante) y escucha sus cambios"""
+        self._modelo = modelo
+
+        oyentes = (
+            ("after_insert", self._marcar_cambio),
+            ("after_update", self._marcar_actualizacion),
+            ("after_delete", self._marcar_cambio),
+        )
+        for nombre_evento, oyente in oyentes:
+            if not event.contains(modelo, nombre_evento, oyente):
+                event.listen(modelo, nombre_evento, oyente)
+
+        if not event.contains(Session, "after_commit", self._aplicar_invalidaciones):
+            event.listen(Session, "after_commit", self._aplicar_invalidaciones)
+            event.listen(Session, "after_soft_rollback", self._descartar_invalidaciones)
+
+    def _marcar_actualizacion(self, mapper, connection, target):
+        # Un cambio de `activo` u otros campos no afecta al índice
+        estado = inspect(target)
+        if any(estado.attrs[campo].history.has_changes() for campo in CAMPOS_INDICE):
+            self._marcar_cambio(mapper, connection, target)
+
+    def _marcar_cambio(self, mapper, connection, target):
+        estado = inspect(target)
+        if estado.session is None:
+            return
+
+        pendientes = estado.session.info.setdefault("indice_qr_invalidar", set())
+        historial = estado.attrs.colegio_id.history
+        for colegio_id in (*historial.added, *historial.unchanged, *historial.deleted):
+            if colegio_id is not None:
+                pendientes.add(colegio_id)
+
+    def _aplicar_invalidaciones(self, sesion):
+        pendientes = sesion.info.pop("indice_qr_invalidar", None)
+        if pendientes:
+            self.invalidar(*pendientes)
+
+    def _descartar_invalidaciones(self, sesion, transaccion_previa):
+        if transaccion_previa.parent is None:
+            sesion.info.pop("indice_qr_invalidar", None)
@@ -0,0 +1,265 @@
+from sqlalchemy import event, inspect, select, func
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.estudiante import Estudiante
+from app.models.cambio_roster import CambioRoster, VersionRoster
+from app.services import asistencia_service, porteria_service
+from app.utils.sql import insert_con_conflicto
+
+# Columnas del roster que descargan los escáneres (en este orden)
+CAMPOS_ROSTER = ("id", "qr_token", "nombre", "grado", "grupo", "jornada_id")
+
+# Si cambia alguno de estos campos el estudiante se reenvía a los dispositivos
+CAMPOS_VIGILADOS = ("qr_token", "nombre", "grado", "grupo", "sede_id", "jornada_id", "activo", "colegio_id")
+
+TIPO_ASISTENCIA = "asistencia"
+
+# Clave en session.info de las versiones ya reservadas en la transacción
+VERSIONES_TRANSACCION = "versiones_roster"
+
+
+# ════════════════════════════════════════════════════════════════
+# REGISTRO DE CAMBIOS (eventos SQLAlchemy sobre Estudiante)
+# ════════════════════════════════════════════════════════════════
+
+def registrar_cambios_roster():
+    """Escucha altas/bajas/cambios de estudiantes y los anota en cambios_roster"""
+    oyentes = (
+        ("after_insert", _anotar_cambio),
+        ("after_update", _anotar_actualizacion),
+        ("after_delete", _anotar_cambio),
+    )
+    for nombre_evento, oyente in oyentes:
+        if not event.contains(Estudiante, nombre_evento, oyente):
+            event.listen(Estudiante, nombre_evento, oyente)
+
+    if not event.contains(Session, "after_commit", _olvidar_versiones):
+        event.listen(Session, "after_commit", _olvidar_versiones)
+        event.listen(Session, "after_soft_rollback", _olvidar_versiones)
+
+
+def _anotar_actualizacion(mapper, connection, target):
+    estado = inspect(target)
+    if any(estado.attrs[campo].history.has_changes() for campo in CAMPOS_VIGILADOS):
+        _anotar_cambio(mapper, connection, target)
+
+
+def _anotar_cambio(mapper, connection, target):
+    # Si cambió de colegio, los dispositivos de ambos colegios deben enterarse
+    historial = inspect(target).attrs.colegio_id.history
+    colegios = {c for c in (*historial.added, *historial.unchanged, *historial.deleted) if c is not None}
+
+    # Misma conexión y transacción del flush: el cambio y su anotación van juntos
+    sesion = inspect(target).session
+    for colegio_id in colegios:
+        connection.execute(
+            CambioRoster.__table__.insert().values(
+                colegio_id=colegio_id,
+                estudiante_id=target.id,
+                version=_reservar_version(sesion, connection, colegio_id)
+            )
+        )
+
+
+def reservar_version(colegio_id):
+    """
+    Versión del roster para los cambios que la transacción de db.session
+    anota en cambios_roster (p. ej. la importación masiva, que no pasa por
+    los eventos del ORM).
+    """
+    return _reservar_version(db.session, db.session.connection(), colegio_id)
+
+
+def _reservar_version(sesion, connection, colegio_id):
+    """
+    Sube en uno la versión del colegio, una vez por transacción.
+
+    El UPSERT bloquea la fila de versiones_roster hasta el commit: otra
+    transacción que cambie el roster del mismo colegio espera y obtiene
+    la versión siguiente, así que ninguna versión se confirma antes que
+    una menor. Los demás cambios de la misma transacción reusan la versión.
+    """
+    reservadas = sesion.info.setdefault(VERSIONES_TRANSACCION, {}) if sesion is not None else {}
+    if colegio_id in reservadas:
+        return reservadas[colegio_id]
+
+    tabla = VersionRoster.__table__
+    stmt = (
+        insert_con_conflicto(tabla)
+        .values(colegio_id=colegio_id, version=1)
+        .on_conflict_do_update(
+            index_elements=[tabla.c.colegio_id],
+            set_={"version": tabla.c.version + 1}
+        )
+        .returning(tabla.c.version)
+    )
+    version = connection.execute(stmt).scalar()
+    reservadas[colegio_id] = version
+    return version
+
+
+def _olvidar_versiones(sesion, *args):
+    # Tras el commit (o un rollback, también de un savepoint) la próxima
+    # anotación vuelve a subir el contador
+    sesion.info.pop(VERSIONES_TRANSACCION, None)
+
+
+# ════════════════════════════════════════════════════════════════
+# ROSTER Y DELTAS
+# ════════════════════════════════════════════════════════════════
+
+def version_actual(colegio_id):
+    """Última versión confirmada del roster del colegio, 0 si no hay cambios"""
+    return db.session.execute(
+        select(func.coalesce(func.max(VersionRoster.version), 0))
+        .where(VersionRoster.colegio_id == colegio_id)
+    ).scalar()
+
+
+def _filtro_roster(colegio_id, sede_id=None, jornada_id=None):
+    condiciones = [
+        Estudiante.colegio_id == colegio_id,
+        Estudiante.activo.is_(True),
+        Estudiante.qr_token.isnot(None),
+    ]
+    if sede_id is not None:
+        condiciones.append(Estudiante.sede_id == sede_id)
+    if jornada_id is not None:
+        condiciones.append(Estudiante.jornada_id == jornada_id)
+    return condiciones
+
+
+def _columnas_roster():
+    return [getattr(Estudiante, campo) for campo in CAMPOS_ROSTER]
+
+
+def obtener_roster(colegio_id, sede_id=None, jornada_id=None):
+    """
+    Roster completo de una sede/jornada en formato compacto.
+
+    La versión se lee ANTES que las filas: un cambio que llegue en medio
+    tendrá una versión mayor y el dispositivo lo recibirá en el próximo
+    delta (reenviar un estudiante es idempotente).
+
+    Returns:
+        {"version", "campos", "estudiantes": [[id, qr_token, ...], ...]}
+    """
+    version = version_actual(colegio_id)
+
+    filas = db.session.execute(
+        select(*_columnas_roster())
+        .where(*_filtro_roster(colegio_id, sede_id, jornada_id))
+        .order_by(Estudiante.id)
+    ).all()
+
+    return {
+        "version": version,
+        "campos": list(CAMPOS_ROSTER),
+        "estudiantes": [list(fila) for fila in filas],
+    }
+
+
+def obtener_cambios(colegio_id, desde, sede_id=None, jornada_id=None):
+    """
+    Cambios del roster posteriores a la versión `desde`.
+
+    - "estudiantes": filas (mismo formato que el roster) a insertar o
+      reemplazar en el dispositivo.
+    - "bajas": ids que ya no pertenecen a este roster (borrados,
+      desactivados, sin token o movidos de sede/jornada).
+    - "reiniciar": True si la versión del dispositivo no es válida para este
+      servidor; el dispositivo debe volver a descargar el roster completo.
+    """
+    version = version_actual(colegio_id)
+
+    if desde is None or desde < 0 or desde > version:
+        return {"version": version, "reiniciar": True}
+
+    if desde == version:
+        return {
+            "version": version,
+            "reiniciar": False,
+            "campos": list(CAMPOS_ROSTER),
+            "estudiantes": [],
+            "bajas": [],
+        }
+
+    cambiados = (
+        select(CambioRoster.estudiante_id)
+        .where(
+            CambioRoster.colegio_id == colegio_id,
+            CambioRoster.version > desde,
+            CambioRoster.version <= version
+        )
+        .distinct()
+    )
+
+    filas = db.session.execute(
+        select(*_columnas_roster())
+        .where(
+            Estudiante.id.in_(cambiados),
+            *_filtro_roster(colegio_id, sede_id, jornada_id)
+        )
+        .order_by(Estudiante.id)
+    ).all()
+
+    vigentes = {fila[0] for fila in filas}
+    bajas = [
+        estudiante_id
+        for (estudiante_id,) in db.session.execute(cambiados.order_by(CambioRoster.estudiante_id))
+        if estudiante_id not in vigentes
+    ]
+
+    return {
+        "version": version,
+        "reiniciar": False,
+        "campos": list(CAMPOS_ROSTER),
+        "estudiantes": [list(fila) for fila in filas],
+        "bajas": bajas,
+    }
+
+
+# ════════════════════════════════════════════════════════════════
+# SUBIDA DE ESCANEOS EN COLA
+# ════════════════════════════════════════════════════════════════
+
+def subir_escaneos(escaneos, colegio_id, registrada_por=None):
+    """
+    Registra los escaneos que el dispositivo acumuló sin conexión.
+
+    Cada escaneo trae "tipo": "asistencia" (por defecto), "ingreso" o
+    "salida". Todo se guarda en una transacción; reenviar la misma cola
+    es seguro porque los repetidos se reportan como "duplicada".
+
+    Returns: resultados en el mismo orden que `escaneos`.
+    """
+    asistencias = []
+    porteria = []
+    for posicion, escaneo in enumerate(escaneos):
+        if (escaneo.get("tipo") or TIPO_ASISTENCIA) == TIPO_ASISTENCIA:
+            asistencias.append((posicion, escaneo))
+        else:
+            porteria.append((posicion, escaneo))
+
+    resultados = [None] * len(escaneos)
+
+    if asistencias:
+        posiciones, lote = zip(*asistencias)
+        registrados = asistencia_service.registrar_escaneos(
+            list(lote), colegio_id, registrada_por=registrada_por, commit=False
+        )
+        for posicion, resultado in zip(posiciones, registrados):
+            resultados[posicion] = resultado
+
+    if porteria:
+        posiciones, lote = zip(*porteria)
+        # Mismo procesamiento que la cola de portería (incluye llegadas tarde)
+        registrados = porteria_service.procesar_eventos(
+            list(lote), colegio_id, commit=False
+        )
+        for posicion, resultado in zip(posiciones, registrados):
+            resultados[posicion] = resultado
+
+    db.session.commit()
+    return resultados
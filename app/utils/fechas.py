@@ -0,0 +1,35 @@
+from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from flask import current_app, has_app_context
+
+ZONA_POR_DEFECTO = "America/Bogota"
+
+
+@lru_cache(maxsize=8)
+def _zona(nombre):
+    return ZoneInfo(nombre)
+
+
+def zona_local():
+    """Zona horaria de los colegios (config ZONA_HORARIA)"""
+    nombre = ZONA_POR_DEFECTO
+    if has_app_context():
+        nombre = current_app.config.get("ZONA_HORARIA", ZONA_POR_DEFECTO)
+    return _zona(nombre)
+
+
+def ahora_local():
+    """Hora de pared del colegio, sin tzinfo (como se guardan fecha y hora)"""
+    return datetime.now(zona_local()).replace(tzinfo=None)
+
+
+def a_hora_local(momento):
+    """
+    Pasa un datetime con zona (p. ej. "...Z" de un escáner) a la hora de
+    pared del colegio, sin tzinfo. Un datetime sin zona se toma como ya local.
+    """
+    if momento.tzinfo is None:
+        return momento
+    return momento.astimezone(zona_local()).replace(tzinfo=None)
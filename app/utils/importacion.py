@@ -0,0 +1,35 @@
+from flask import request, redirect, url_for, flash
+from flask_login import current_user
+
+from app.extensions import db
+
+
+def importar_desde_formulario(importar, endpoint, **opciones):
+    """
+    Corre una importación masiva (importacion_service) con el archivo del formulario.
+
+    Lo usan las rutas de importar estudiantes, docentes y permisos.
+
+    Returns: (reporte, None), o (None, redirect) si no llegó archivo o no
+    se pudo leer.
+    """
+    archivo = request.files.get("archivo")
+
+    if not archivo or not archivo.filename:
+        flash("Seleccione un archivo CSV o Excel", "danger")
+        return None, redirect(url_for(endpoint))
+
+    try:
+        reporte = importar(
+            archivo.stream,
+            archivo.filename,
+            current_user.colegio_id,
+            simular=request.form.get("simular") == "on",
+            **opciones
+        )
+    except ValueError as e:
+        db.session.rollback()
+        flash(str(e), "danger")
+        return None, redirect(url_for(endpoint))
+
+    return reporte, None
@@ -0,0 +1,222 @@
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import tuple_
+
+POR_PAGINA_DEFECTO = 50
+POR_PAGINA_MAXIMO = 200
+
+
+class PaginaKeyset:
+    """
+    Una página de resultados paginados por keyset (seek).
+
+    Atributos:
+        items: filas de la página
+        cursor_siguiente / cursor_anterior: cursores opacos para las páginas
+            vecinas (None si no hay más en esa dirección)
+        por_pagina: tamaño de página usado
+    """
+
+    def __init__(self, items, por_pagina, cursor_siguiente=None, cursor_anterior=None):
+        self.items = items
+        self.por_pagina = por_pagina
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+
+    @property
+    def tiene_siguiente(self):
+        return self.cursor_siguiente is not None
+
+    @property
+    def tiene_anterior(self):
+        return self.cursor_anterior is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+# ════════════════════════════════════════════════════════════════
+# CURSORES
+# ════════════════════════════════════════════════════════════════
+
+def _codificar_cursor(valores):
+    datos = [
+        v.isoformat() if isinstance(v, (date, datetime)) else v
+        for v in valores
+    ]
+    crudo = json.dumps(datos, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor, columnas):
+    """Devuelve los valores del cursor con el tipo de cada columna, o None si es inválido"""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError):
+        return None
+
+    if not isinstance(datos, list) or len(datos) != len(columnas):
+        return None
+
+    valores = []
+    for valor, columna in zip(datos, columnas):
+        tipo = columna.type.python_type
+        try:
+            if valor is None:
+                valores.append(None)
+            elif tipo is datetime:
+                valores.append(datetime.fromisoformat(valor))
+            elif tipo is date:
+                valores.append(date.fromisoformat(valor))
+            else:
+                valores.append(tipo(valor))
+        except (TypeError, ValueError):
+            return None
+
+    return valores
+
+
+# ════════════════════════════════════════════════════════════════
+# PAGINACIÓN
+# ════════════════════════════════════════════════════════════════
+
+def paginar_keyset(query, columnas, despues=None, antes=None,
+                   por_pagina=POR_PAGINA_DEFECTO, descendente=False):
+    """
+    Pagina `query` por keyset sobre `columnas` (la última debe ser única, p. ej. id).
+
+    En lugar de OFFSET se filtra con una comparación de tuplas contra la
+    última fila vista, así que el coste de cada página no crece con el
+    número de página y las inserciones concurrentes no desplazan filas.
+
+    Args:
+        query: consulta ya filtrada por colegio y filtros del usuario
+        columnas: columnas del orden, p. ej. (Docente.nombre, Docente.id)
+        despues: cursor para la página siguiente
+        antes: cursor para la página anterior
+        por_pagina: tamaño de página (se limita a POR_PAGINA_MAXIMO)
+        descendente: True para ordenar de mayor a menor (p. ej. fechas)
+
+    Returns:
+        PaginaKeyset
+    """
+    por_pagina = max(1, min(por_pagina or POR_PAGINA_DEFECTO, POR_PAGINA_MAXIMO))
+    clave = tuple_(*columnas)
+
+    hacia_adelante = hacia_atras = False
+    if despues:
+        valores = _decodificar_cursor(despues, columnas)
+        if valores is not None:
+            hacia_adelante = True
+            query = query.filter(clave < tuple_(*valores) if descendente else clave > tuple_(*valores))
+    elif antes:
+        valores = _decodificar_cursor(antes, columnas)
+        if valores is not None:
+            hacia_atras = True
+            query = query.filter(clave > tuple_(*valores) if descendente else clave < tuple_(*valores))
+
+    # Hacia atrás se recorre en orden inverso y luego se da la vuelta a la página
+    invertir = descendente != hacia_atras
+    orden = [c.desc() if invertir else c.asc() for c in columnas]
+
+    filas = query.order_by(*orden).limit(por_pagina + 1).all()
+    hay_mas = len(filas) > por_pagina
+    filas = filas[:por_pagina]
+
+    if hacia_atras:
+        filas.reverse()
+
+    def _cursor(fila):
+        return _codificar_cursor([getattr(fila, c.key) for c in columnas])
+
+    cursor_siguiente = cursor_anterior = None
+    if filas:
+        if hay_mas or hacia_atras:
+            cursor_siguiente = _cursor(filas[-1])
+        if (hay_mas and hacia_atras) or hacia_adelante:
+            cursor_anterior = _cursor(filas[0])
+
+    return PaginaKeyset(filas, por_pagina, cursor_siguiente, cursor_anterior)
+
+
+# ════════════════════════════════════════════════════════════════
+# FILTROS
+# ════════════════════════════════════════════════════════════════
+
+def _entero(valor):
+    try:
+        return int(valor) if valor not in (None, "") else None
+    except ValueError:
+        return None
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def leer_filtros(args, activo_por_defecto=None):
+    """
+    Lee los filtros de listado desde request.args.
+
+    `activo` acepta "1", "0" o "todos"; si no viene se usa activo_por_defecto.
+    """
+    activo = args.get("activo")
+    if activo in (None, ""):
+        activo = activo_por_defecto
+    elif activo == "todos":
+        activo = None
+    else:
+        activo = activo == "1"
+
+    return {
+        "sede_id": _entero(args.get("sede_id")),
+        "jornada_id": _entero(args.get("jornada_id")),
+        "docente_id": _entero(args.get("docente_id")),
+        "grado": args.get("grado", "").strip() or None,
+        "grupo": args.get("grupo", "").strip() or None,
+        "activo": activo,
+        "desde": _fecha(args.get("desde")),
+        "hasta": _fecha(args.get("hasta")),
+    }
+
+
+def aplicar_filtros(query, modelo, filtros):
+    """
+    Aplica en SQL los filtros que el modelo soporte.
+
+    desde/hasta se interpretan como solapamiento con [fecha_inicio, fecha_fin]
+    (un permiso aparece si estuvo vigente algún día del rango).
+    """
+    for campo in ("sede_id", "jornada_id", "docente_id", "grado", "grupo", "activo"):
+        valor = filtros.get(campo)
+        if valor is not None and hasattr(modelo, campo):
+            query = query.filter(getattr(modelo, campo) == valor)
+
+    if filtros.get("desde") and hasattr(modelo, "fecha_fin"):
+        query = query.filter(modelo.fecha_fin >= filtros["desde"])
+
+    if filtros.get("hasta") and hasattr(modelo, "fecha_inicio"):
+        query = query.filter(modelo.fecha_inicio <= filtros["hasta"])
+
+    return query
+
+
+def paginar_desde_request(query, columnas, args, descendente=False):
+    """Atajo: toma despues/antes/por_pagina de request.args"""
+    return paginar_keyset(
+        query,
+        columnas,
+        despues=args.get("despues"),
+        antes=args.get("antes"),
+        por_pagina=_entero(args.get("por_pagina")) or POR_PAGINA_DEFECTO,
+        descendente=descendente
+    )
@@ -0,0 +1,33 @@
+import threading
+import time
+
+
+class PodaPeriodica:
+    """
+    Decide cuándo podar los archivos SQLite compartidos (cache, intentos de
+    login, rate limit): cada `cada` escrituras de este proceso o cuando pasaron
+    `segundos` desde su última poda, lo que llegue primero.
+
+    Cuenta escrituras y no depende de la clave: con pocas claves (p. ej.
+    "contadores:<id>") un sorteo por hash de la clave podía no tocar nunca.
+    """
+
+    def __init__(self, cada=64, segundos=60):
+        self.cada = cada
+        self.segundos = segundos
+        self._escrituras = 0
+        self._ultima = time.monotonic()
+        self._lock = threading.Lock()
+
+    def toca(self):
+        """Anota una escritura; True si esta debe podar"""
+        with self._lock:
+            self._escrituras += 1
+            ahora = time.monotonic()
+
+            if self._escrituras < self.cada and ahora - self._ultima < self.segundos:
+                return False
+
+            self._escrituras = 0
+            self._ultima = ahora
+            return True
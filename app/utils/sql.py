@@ -0,0 +1,64 @@
+import csv
+import io
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+
+
+def insert_con_conflicto(tabla):
+    """
+    INSERT del dialecto en uso (PostgreSQL en producción, SQLite local).
+
+    Expone on_conflict_do_nothing / on_conflict_do_update, que el insert()
+    genérico de SQLAlchemy no tiene.
+    """
+    if db.engine.dialect.name == "postgresql":
+        return postgresql.insert(tabla)
+    return sqlite.insert(tabla)
+
+
+# Marca de NULL en el CSV de COPY (una celda vacía queda como texto vacío)
+NULL_COPY = "\\N"
+
+
+def insertar_masivo(tabla, filas):
+    """
+    Inserta `filas` (dicts con las mismas claves) en la transacción de la sesión.
+
+    En PostgreSQL usa COPY ... FROM STDIN en formato CSV: una sola
+    operación, sin planificar un INSERT por fila. En otros motores (SQLite
+    local) hace un executemany del INSERT de Core. No devuelve los ids:
+    quien los necesite debe volver a leerlos por una clave natural. COPY
+    no aplica los default de Python de las columnas: las filas deben
+    traer todos los valores.
+    """
+    if not filas:
+        return 0
+
+    if db.engine.dialect.name != "postgresql":
+        db.session.execute(tabla.insert(), filas)
+        return len(filas)
+
+    columnas = list(filas[0])
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for fila in filas:
+        escritor.writerow([NULL_COPY if fila[columna] is None else fila[columna] for columna in columnas])
+    buffer.seek(0)
+
+    preparador = db.engine.dialect.identifier_preparer
+    sentencia = "COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '{}')".format(
+        preparador.format_table(tabla),
+        ", ".join(preparador.quote(columna) for columna in columnas),
+        NULL_COPY
+    )
+
+    # Cursor psycopg2 de la conexión de la sesión: misma transacción que el resto
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(sentencia, buffer)
+    finally:
+        cursor.close()
+
+    return len(filas)
@@ -88,5 +88,183 @@ class Config:
         FLASK_ENV == "production"
     )
 
+    # Cache de contadores del dashboard: "memoria" (por worker)
+    # o "sqlite" (archivo compartido entre los workers de gunicorn)
+    CONTADORES_CACHE_BACKEND = os.environ.get(
+        "CONTADORES_CACHE_BACKEND",
+        "memoria"
+    )
+
+    CONTADORES_CACHE_TTL = int(
+        os.environ.get(
+            "CONTADORES_CACHE_TTL",
+            300
+        )
+    )
+
+    CONTADORES_CACHE_RUTA = os.environ.get(
+        "CONTADORES_CACHE_RUTA"
+    )
+
+    # Vida (segundos) del índice en memoria de tokens QR por colegio
+    QR_INDICE_TTL = int(
+        os.environ.get(
+            "QR_INDICE_TTL",
+            300
+        )
+    )
+
+    # Cada cuántos segundos un worker compara la versión del roster antes de
+    # usar su índice QR: es la ventana en que un token revocado en otro
+    # worker todavía resuelve (0 = comparar en cada escaneo)
+    QR_INDICE_VERIFICACION_SEGUNDOS = float(
+        os.environ.get(
+            "QR_INDICE_VERIFICACION_SEGUNDOS",
+            5
+        )
+    )
+
+    # Snapshot en memoria del usuario de la sesión y su colegio
+    # (segundos; 0 = consultar en cada petición)
+    CONTEXTO_USUARIO_TTL = int(
+        os.environ.get(
+            "CONTEXTO_USUARIO_TTL",
+            30
+        )
+    )
+
+    # Zona horaria de los colegios: los timestamps con zona de los escáneres
+    # ("...Z") se pasan a esta hora local antes de guardar fecha y hora
+    ZONA_HORARIA = os.environ.get(
+        "ZONA_HORARIA",
+        "America/Bogota"
+    )
+
+    # Cola de eventos de portería: se guarda al llegar a este tamaño
+    # o cada PORTERIA_LOTE_SEGUNDOS (0 = solo por tamaño)
+    PORTERIA_LOTE_MAXIMO = int(
+        os.environ.get(
+            "PORTERIA_LOTE_MAXIMO",
+            200
+        )
+    )
+
+    PORTERIA_LOTE_SEGUNDOS = float(
+        os.environ.get(
+            "PORTERIA_LOTE_SEGUNDOS",
+            2
+        )
+    )
+
+    # Directorio de los eventos de portería que no se pudieron guardar
+    # tras varios intentos (por defecto instance/porteria_respaldo)
+    PORTERIA_RESPALDO_DIR = os.environ.get("PORTERIA_RESPALDO_DIR")
+
+    # Cada cuántos segundos se refresca el rollup de estadísticas
+    # (0 = solo con `flask refrescar-estadisticas` desde cron)
+    ESTADISTICAS_REFRESCO_SEGUNDOS = int(
+        os.environ.get(
+            "ESTADISTICAS_REFRESCO_SEGUNDOS",
+            900
+        )
+    )
+
+    # Cada cuántos segundos se materializa el estado de acceso (pruebas vencidas)
+    # (0 = solo con `flask barrer-accesos` desde cron)
+    ACCESO_BARRIDO_SEGUNDOS = int(
+        os.environ.get(
+            "ACCESO_BARRIDO_SEGUNDOS",
+            3600
+        )
+    )
+
+    # Algoritmo y costo de los hashes de contraseña, en formato de werkzeug
+    # ("pbkdf2:sha256:600000", "scrypt:32768:8:1"). Al cambiarlo, cada hash
+    # se rehace en el siguiente login exitoso
+    PASSWORD_HASH_METODO = os.environ.get(
+        "PASSWORD_HASH_METODO",
+        "pbkdf2:sha256:600000"
+    )
+
+    # Hashes simultáneos por worker y cuánto espera turno un login
+    # antes de responder "intenta de nuevo" (`flask benchmark-hash` para medir)
+    PASSWORD_HASH_HILOS = int(
+        os.environ.get(
+            "PASSWORD_HASH_HILOS",
+            2
+        )
+    )
+
+    PASSWORD_HASH_ESPERA_SEGUNDOS = float(
+        os.environ.get(
+            "PASSWORD_HASH_ESPERA_SEGUNDOS",
+            10
+        )
+    )
+
+    # Fallos de login: "sqlite" (archivo compartido entre los workers) o
+    # "memoria" (por worker: con -w 4 cada correo tendría 4 veces los intentos);
+    # ventana deslizante y límite de fallos por IP
+    LOGIN_INTENTOS_BACKEND = os.environ.get(
+        "LOGIN_INTENTOS_BACKEND",
+        "sqlite"
+    )
+
+    LOGIN_INTENTOS_RUTA = os.environ.get(
+        "LOGIN_INTENTOS_RUTA"
+    )
+
+    LOGIN_INTENTOS_VENTANA_SEGUNDOS = int(
+        os.environ.get(
+            "LOGIN_INTENTOS_VENTANA_SEGUNDOS",
+            900
+        )
+    )
+
+    LOGIN_INTENTOS_MAX_IP = int(
+        os.environ.get(
+            "LOGIN_INTENTOS_MAX_IP",
+            50
+        )
+    )
+
+    # Contadores del rate limit: "sqlite://" (archivo compartido por los
+    # workers de la máquina; "sqlite:////dev/shm/limites.sqlite3" lo deja en
+    # memoria) o "memory://" (por worker: con -w 4 los límites rinden 4 veces)
+    RATELIMIT_STORAGE_URI = os.environ.get(
+        "RATELIMIT_STORAGE_URI",
+        "sqlite://"
+    )
+
+    # Límites por ruta: POST de login (por correo + IP) y escaneos QR (por usuario)
+    RATELIMIT_LOGIN = os.environ.get(
+        "RATELIMIT_LOGIN",
+        "10 per minute;50 per hour"
+    )
+
+    RATELIMIT_QR = os.environ.get(
+        "RATELIMIT_QR",
+        "600 per minute"
+    )
+
+    # Filas desde las que /dashboard/exportar entrega CSV en vez de XLSX: el
+    # XLSX sale entero al final (~8 s por cada 100.000 filas con
+    # `flask benchmark-exportacion`) y uno grande no alcanza el timeout del proxy
+    EXPORTACION_XLSX_MAX_FILAS = int(
+        os.environ.get(
+            "EXPORTACION_XLSX_MAX_FILAS",
+            200000
+        )
+    )
+
+    # Procesos que renderizan PDFs en `flask exportar-boletines`
+    # (0 = uno por CPU)
+    BOLETINES_PDF_WORKERS = int(
+        os.environ.get(
+            "BOLETINES_PDF_WORKERS",
+            0
+        )
+    )
+
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "Lax"
\ No newline at end of file
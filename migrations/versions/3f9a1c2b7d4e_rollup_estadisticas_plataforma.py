@@ -0,0 +1,65 @@
+"""rollup de estadisticas de la plataforma
+
+Revision ID: 3f9a1c2b7d4e
+Revises: e0c507f76333
+Create Date: 2026-10-18 08:15:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2b7d4e'
+down_revision = 'e0c507f76333'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ✅ Tablas normales (no vista materializada) para que funcione igual en SQLite
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('estadisticas_diarias'):
+        op.create_table(
+            'estadisticas_diarias',
+            sa.Column('fecha', sa.Date(), primary_key=True),
+            sa.Column('nuevos_usuarios', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('permisos_iniciados', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('total_usuarios', sa.Integer(), nullable=True),
+            sa.Column('superadmins', sa.Integer(), nullable=True),
+            sa.Column('usuarios_aprobados', sa.Integer(), nullable=True),
+            sa.Column('usuarios_pendientes', sa.Integer(), nullable=True),
+            sa.Column('usuarios_activos', sa.Integer(), nullable=True),
+            sa.Column('usuarios_bloqueados', sa.Integer(), nullable=True),
+            sa.Column('total_colegios', sa.Integer(), nullable=True),
+            sa.Column('total_permisos', sa.Integer(), nullable=True),
+            sa.Column('actualizado_en', sa.DateTime(), nullable=False),
+        )
+
+    if not inspector.has_table('estadisticas_colegio'):
+        op.create_table(
+            'estadisticas_colegio',
+            sa.Column(
+                'colegio_id',
+                sa.Integer(),
+                sa.ForeignKey('colegios.id', ondelete='CASCADE'),
+                primary_key=True
+            ),
+            sa.Column('nombre', sa.String(150), nullable=False),
+            sa.Column('docentes', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('usuarios', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('estudiantes', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('actualizado_en', sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            'ix_estadisticas_colegio_docentes',
+            'estadisticas_colegio',
+            ['docentes']
+        )
+
+
+def downgrade():
+    # 🔙 reversión segura
+    op.drop_index('ix_estadisticas_colegio_docentes', table_name='estadisticas_colegio')
+    op.drop_table('estadisticas_colegio')
+    op.drop_table('estadisticas_diarias')
@@ -0,0 +1,46 @@
+"""indices (estudiante_id, fecha) para el historial del estudiante
+
+Revision ID: 7c2d4e9a1b05
+Revises: 3f9a1c2b7d4e
+Create Date: 2026-10-18 10:40:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7c2d4e9a1b05'
+down_revision = '3f9a1c2b7d4e'
+branch_labels = None
+depends_on = None
+
+INDICES = (
+    ('ix_asistencias_estudiante_fecha', 'asistencias'),
+    ('ix_novedades_estudiante_fecha', 'novedades'),
+    ('ix_ingresos_colegio_estudiante_fecha', 'ingresos_colegio'),
+    ('ix_alertas_estudiante_fecha', 'alertas'),
+)
+
+
+def upgrade():
+    # ✅ Historial reciente: WHERE estudiante_id = ? ORDER BY fecha DESC LIMIT n
+    inspector = sa.inspect(op.get_bind())
+
+    for nombre, tabla in INDICES:
+        if not inspector.has_table(tabla):
+            continue
+        existentes = {indice['name'] for indice in inspector.get_indexes(tabla)}
+        if nombre not in existentes:
+            op.create_index(nombre, tabla, ['estudiante_id', 'fecha'])
+
+
+def downgrade():
+    # 🔙 reversión segura
+    inspector = sa.inspect(op.get_bind())
+
+    for nombre, tabla in INDICES:
+        if not inspector.has_table(tabla):
+            continue
+        existentes = {indice['name'] for indice in inspector.get_indexes(tabla)}
+        if nombre in existentes:
+            op.drop_index(nombre, table_name=tabla)
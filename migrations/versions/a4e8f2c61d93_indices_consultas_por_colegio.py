@@ -0,0 +1,55 @@
+"""indices compuestos para las consultas por colegio
+
+Revision ID: a4e8f2c61d93
+Revises: 7c2d4e9a1b05
+Create Date: 2026-10-18 11:20:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a4e8f2c61d93'
+down_revision = '7c2d4e9a1b05'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas) — mismo orden que los filtros y ORDER BY de las rutas.
+# Los listados DESC (permisos) recorren el índice hacia atrás, no necesitan DESC.
+INDICES = (
+    ('ix_permisos_colegio_fecha_inicio', 'permisos', ['colegio_id', 'fecha_inicio', 'id']),
+    ('ix_permisos_docente_fecha_inicio', 'permisos', ['docente_id', 'fecha_inicio']),
+    ('ix_estudiantes_colegio_activo_nombre', 'estudiantes', ['colegio_id', 'activo', 'nombre', 'id']),
+    ('ix_estudiantes_sede', 'estudiantes', ['sede_id']),
+    ('ix_estudiantes_docente', 'estudiantes', ['docente_id']),
+    ('ix_docentes_colegio_nombre', 'docentes', ['colegio_id', 'nombre', 'id']),
+    ('ix_docentes_sede', 'docentes', ['sede_id']),
+    ('ix_sedes_colegio', 'sedes', ['colegio_id']),
+    ('ix_jornadas_colegio_activo_nombre', 'jornadas_colegio', ['colegio_id', 'activo', 'nombre']),
+    ('ix_jornadas_sede', 'jornadas_colegio', ['sede_id']),
+    ('ix_usuarios_colegio', 'usuarios', ['colegio_id']),
+)
+
+
+def upgrade():
+    # ✅ Solo crea lo que falta (bases creadas con db.create_all ya los tienen)
+    inspector = sa.inspect(op.get_bind())
+
+    for nombre, tabla, columnas in INDICES:
+        if not inspector.has_table(tabla):
+            continue
+        existentes = {indice['name'] for indice in inspector.get_indexes(tabla)}
+        if nombre not in existentes:
+            op.create_index(nombre, tabla, columnas)
+
+
+def downgrade():
+    # 🔙 reversión segura
+    inspector = sa.inspect(op.get_bind())
+
+    for nombre, tabla, _ in INDICES:
+        if not inspector.has_table(tabla):
+            continue
+        existentes = {indice['name'] for indice in inspector.get_indexes(tabla)}
+        if nombre in existentes:
+            op.drop_index(nombre, table_name=tabla)
@@ -0,0 +1,48 @@
+"""estado de acceso materializado en usuarios y colegios
+
+Revision ID: a7d4e2c9b150
+Revises: f6c2a9d4b318
+Create Date: 2026-10-18 21:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7d4e2c9b150'
+down_revision = 'f6c2a9d4b318'
+branch_labels = None
+depends_on = None
+
+INDICES = {
+    'usuarios': 'ix_usuarios_estado_acceso',
+    'colegios': 'ix_colegios_estado_acceso',
+}
+
+
+def upgrade():
+    # ✅ Estado de acceso (activo / en_prueba / vencido / inactivo) y fin de la prueba
+    inspector = sa.inspect(op.get_bind())
+
+    for tabla, indice in INDICES.items():
+        columnas = {columna['name'] for columna in inspector.get_columns(tabla)}
+        if 'estado_acceso' not in columnas:
+            op.add_column(tabla, sa.Column('estado_acceso', sa.String(length=20), nullable=True))
+        if 'acceso_vence_en' not in columnas:
+            op.add_column(tabla, sa.Column('acceso_vence_en', sa.DateTime(), nullable=True))
+
+        indices = {existente['name'] for existente in inspector.get_indexes(tabla)}
+        if indice not in indices:
+            op.create_index(indice, tabla, ['estado_acceso', 'acceso_vence_en'])
+
+    # ⚠️ Las filas existentes quedan con estado NULL (se calcula al leer) hasta
+    # correr `flask barrer-accesos` o el primer barrido de cada worker
+
+
+def downgrade():
+    # 🔙 reversión segura
+    for tabla, indice in INDICES.items():
+        op.drop_index(indice, table_name=tabla)
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.drop_column('acceso_vence_en')
+            batch_op.drop_column('estado_acceso')
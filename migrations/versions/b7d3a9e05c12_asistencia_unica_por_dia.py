@@ -0,0 +1,64 @@
+"""asistencia unica por estudiante, clase y dia
+
+Revision ID: b7d3a9e05c12
+Revises: a4e8f2c61d93
+Create Date: 2026-10-18 12:05:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3a9e05c12'
+down_revision = 'a4e8f2c61d93'
+branch_labels = None
+depends_on = None
+
+
+# Mismas claves que Asistencia.__table_args__: (condición, columnas del grupo)
+GRUPOS_UNICOS = (
+    ('clase_id IS NOT NULL', 'estudiante_id, clase_id, fecha'),
+    ('clase_id IS NULL', 'estudiante_id, fecha'),
+)
+
+
+def _depurar_duplicados():
+    # ⚠️ asistencia_rapida insertaba una asistencia general en cada escaneo:
+    # de cada grupo repetido se conserva la primera (MIN(id)) y se borra el resto
+    for condicion, columnas in GRUPOS_UNICOS:
+        op.execute(
+            f"DELETE FROM asistencias WHERE {condicion} AND id NOT IN ("
+            f" SELECT MIN(id) FROM asistencias WHERE {condicion} GROUP BY {columnas})"
+        )
+
+
+def upgrade():
+    # ✅ Requisito del INSERT ... ON CONFLICT DO NOTHING del registro por lote
+    inspector = sa.inspect(op.get_bind())
+
+    _depurar_duplicados()
+
+    unicas = {restriccion['name'] for restriccion in inspector.get_unique_constraints('asistencias')}
+    if 'unica_asistencia_por_clase' not in unicas:
+        with op.batch_alter_table('asistencias') as batch_op:
+            batch_op.create_unique_constraint(
+                'unica_asistencia_por_clase',
+                ['estudiante_id', 'clase_id', 'fecha']
+            )
+
+    # NULL no choca en un UNIQUE: índice parcial para la asistencia general
+    indices = {indice['name'] for indice in inspector.get_indexes('asistencias')}
+    if 'unica_asistencia_general' not in indices:
+        op.create_index(
+            'unica_asistencia_general',
+            'asistencias',
+            ['estudiante_id', 'fecha'],
+            unique=True,
+            postgresql_where=sa.text('clase_id IS NULL'),
+            sqlite_where=sa.text('clase_id IS NULL')
+        )
+
+
+def downgrade():
+    # 🔙 reversión segura (la restricción por clase ya existía en producción)
+    op.drop_index('unica_asistencia_general', table_name='asistencias')
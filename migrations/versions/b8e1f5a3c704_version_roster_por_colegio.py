@@ -0,0 +1,58 @@
+"""version del roster por colegio en orden de commit
+
+Revision ID: b8e1f5a3c704
+Revises: a7d4e2c9b150
+Create Date: 2026-10-18 23:30:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8e1f5a3c704'
+down_revision = 'a7d4e2c9b150'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ✅ Contador de versión por colegio (lo sube cada transacción que cambia el roster)
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('versiones_roster'):
+        op.create_table(
+            'versiones_roster',
+            sa.Column('colegio_id', sa.Integer(), primary_key=True),
+            sa.Column('version', sa.Integer(), nullable=False),
+        )
+
+    columnas = {columna['name'] for columna in inspector.get_columns('cambios_roster')}
+    if 'version' not in columnas:
+        op.add_column('cambios_roster', sa.Column('version', sa.Integer(), nullable=True))
+
+        # ⚠️ La versión de los cambios existentes es su id (la que ya tienen
+        # los dispositivos) y cada contador sigue desde el mayor id del colegio
+        op.execute("UPDATE cambios_roster SET version = id")
+        op.execute(
+            "INSERT INTO versiones_roster (colegio_id, version) "
+            "SELECT colegio_id, MAX(id) FROM cambios_roster GROUP BY colegio_id"
+        )
+
+        with op.batch_alter_table('cambios_roster') as batch_op:
+            batch_op.alter_column('version', existing_type=sa.Integer(), nullable=False)
+
+    indices = {indice['name'] for indice in inspector.get_indexes('cambios_roster')}
+    if 'ix_cambios_roster_colegio_id' in indices:
+        op.drop_index('ix_cambios_roster_colegio_id', table_name='cambios_roster')
+    if 'ix_cambios_roster_colegio_version' not in indices:
+        op.create_index('ix_cambios_roster_colegio_version', 'cambios_roster', ['colegio_id', 'version'])
+
+
+def downgrade():
+    # 🔙 reversión segura (las versiones vuelven a ser los ids; los
+    # dispositivos con una versión mayor que su último id descargan el roster completo)
+    op.drop_index('ix_cambios_roster_colegio_version', table_name='cambios_roster')
+    op.create_index('ix_cambios_roster_colegio_id', 'cambios_roster', ['colegio_id', 'id'])
+    with op.batch_alter_table('cambios_roster') as batch_op:
+        batch_op.drop_column('version')
+    op.drop_table('versiones_roster')
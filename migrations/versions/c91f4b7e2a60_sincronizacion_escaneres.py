@@ -0,0 +1,46 @@
+"""cambios de roster para la sincronizacion de escaneres
+
+Revision ID: c91f4b7e2a60
+Revises: b7d3a9e05c12
+Create Date: 2026-10-18 13:10:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c91f4b7e2a60'
+down_revision = 'b7d3a9e05c12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ✅ Versiones del roster: el id de cada cambio es la versión
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('cambios_roster'):
+        op.create_table(
+            'cambios_roster',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('colegio_id', sa.Integer(), nullable=False),
+            sa.Column('estudiante_id', sa.Integer(), nullable=False),
+            sa.Column('creado_en', sa.DateTime(), nullable=False),
+        )
+        op.create_index('ix_cambios_roster_colegio_id', 'cambios_roster', ['colegio_id', 'id'])
+
+    # Un ingreso y una salida por estudiante y día (ON CONFLICT de la subida en lote)
+    indices = {indice['name'] for indice in inspector.get_indexes('ingresos_colegio')}
+    if 'unico_evento_por_dia' not in indices:
+        op.create_index(
+            'unico_evento_por_dia',
+            'ingresos_colegio',
+            ['estudiante_id', 'fecha', 'tipo_evento'],
+            unique=True
+        )
+
+
+def downgrade():
+    # 🔙 reversión segura (unico_evento_por_dia ya existía en producción)
+    op.drop_index('ix_cambios_roster_colegio_id', table_name='cambios_roster')
+    op.drop_table('cambios_roster')
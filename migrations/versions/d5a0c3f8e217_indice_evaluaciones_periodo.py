@@ -0,0 +1,38 @@
+"""índice de evaluaciones por periodo y estudiante (boletines)
+
+Revision ID: d5a0c3f8e217
+Revises: c91f4b7e2a60
+Create Date: 2026-10-18 16:40:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd5a0c3f8e217'
+down_revision = 'c91f4b7e2a60'
+branch_labels = None
+depends_on = None
+
+INDICE = 'ix_evaluaciones_estudiante_periodo_estudiante'
+TABLA = 'evaluaciones_estudiante'
+
+
+def _existe(inspector):
+    return INDICE in {indice['name'] for indice in inspector.get_indexes(TABLA)}
+
+
+def upgrade():
+    # ✅ Solo crea lo que falta (bases creadas con db.create_all ya lo tienen)
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table(TABLA) and not _existe(inspector):
+        op.create_index(INDICE, TABLA, ['periodo_id', 'estudiante_id'])
+
+
+def downgrade():
+    # 🔙 reversión segura
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table(TABLA) and _existe(inspector):
+        op.drop_index(INDICE, table_name=TABLA)
@@ -0,0 +1,68 @@
+"""cierres de periodo y snapshot de resultados
+
+Revision ID: e3b8d1a7c450
+Revises: d5a0c3f8e217
+Create Date: 2026-10-18 18:05:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e3b8d1a7c450'
+down_revision = 'd5a0c3f8e217'
+branch_labels = None
+depends_on = None
+
+NIVEL = sa.Enum('BAJO', 'BASICO', 'ALTO', 'SUPERIOR', name='niveldesempeno')
+
+
+def upgrade():
+    # ✅ Boletines congelados al cerrar un periodo (por colegio)
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('cierres_periodo'):
+        op.create_table(
+            'cierres_periodo',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('periodo_id', sa.Integer(), sa.ForeignKey('periodos.id'), nullable=False),
+            sa.Column('colegio_id', sa.Integer(), sa.ForeignKey('colegios.id'), nullable=False),
+            sa.Column('cerrado_por', sa.Integer(), sa.ForeignKey('usuarios.id'), nullable=True),
+            sa.Column('cerrado_en', sa.DateTime(), nullable=False),
+            sa.Column('total_estudiantes', sa.Integer(), nullable=False, server_default='0'),
+            sa.UniqueConstraint('periodo_id', 'colegio_id', name='unico_cierre_por_colegio'),
+        )
+
+    if not inspector.has_table('resultados_periodo'):
+        op.create_table(
+            'resultados_periodo',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('cierre_id', sa.Integer(), sa.ForeignKey('cierres_periodo.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('periodo_id', sa.Integer(), sa.ForeignKey('periodos.id'), nullable=False),
+            sa.Column('colegio_id', sa.Integer(), sa.ForeignKey('colegios.id'), nullable=False),
+            sa.Column('estudiante_id', sa.Integer(), sa.ForeignKey('estudiantes.id'), nullable=False),
+            sa.Column('grado', sa.String(20), nullable=True),
+            sa.Column('grupo', sa.String(20), nullable=True),
+            sa.Column('materia_id', sa.Integer(), sa.ForeignKey('materias.id'), nullable=True),
+            sa.Column('competencia_id', sa.Integer(), sa.ForeignKey('competencias_materia.id'), nullable=True),
+            sa.Column('promedio', sa.Numeric(4, 2), nullable=True),
+            sa.Column('nivel', NIVEL, nullable=True),
+        )
+        op.create_index(
+            'ix_resultados_periodo_periodo_colegio_grado',
+            'resultados_periodo',
+            ['periodo_id', 'colegio_id', 'grado', 'grupo']
+        )
+        op.create_index(
+            'ix_resultados_periodo_estudiante_periodo',
+            'resultados_periodo',
+            ['estudiante_id', 'periodo_id']
+        )
+        op.create_index('ix_resultados_periodo_cierre', 'resultados_periodo', ['cierre_id'])
+
+
+def downgrade():
+    # 🔙 reversión segura
+    op.drop_table('resultados_periodo')
+    op.drop_table('cierres_periodo')
+    NIVEL.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,52 @@
+"""versión por nota y nota única por indicador y periodo
+
+Revision ID: f6c2a9d4b318
+Revises: e3b8d1a7c450
+Create Date: 2026-10-18 19:30:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f6c2a9d4b318'
+down_revision = 'e3b8d1a7c450'
+branch_labels = None
+depends_on = None
+
+TABLA = 'evaluaciones_estudiante'
+INDICE = 'unica_evaluacion_indicador_periodo'
+COLUMNAS = ('estudiante_id', 'indicador_id', 'periodo_id')
+
+
+def _depurar_duplicados():
+    # ⚠️ La creación de notas sin upsert dejaba repetidos: de cada grupo se
+    # conserva la última nota guardada (MAX(id)) y se borra el resto. Las
+    # filas con alguna clave NULL no chocan en el índice y no se tocan
+    condicion = ' AND '.join(f'{columna} IS NOT NULL' for columna in COLUMNAS)
+    op.execute(
+        f"DELETE FROM {TABLA} WHERE {condicion} AND id NOT IN ("
+        f" SELECT MAX(id) FROM {TABLA} WHERE {condicion} GROUP BY {', '.join(COLUMNAS)})"
+    )
+
+
+def upgrade():
+    # ✅ Matriz de notas: upsert por (estudiante, indicador, periodo) con versión por celda
+    inspector = sa.inspect(op.get_bind())
+
+    columnas = {columna['name'] for columna in inspector.get_columns(TABLA)}
+    if 'version' not in columnas:
+        op.add_column(TABLA, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+    # Una nota por celda de la matriz (la matriz no sabría cuál editar)
+    indices = {indice['name'] for indice in inspector.get_indexes(TABLA)}
+    if INDICE not in indices:
+        _depurar_duplicados()
+        op.create_index(INDICE, TABLA, list(COLUMNAS), unique=True)
+
+
+def downgrade():
+    # 🔙 reversión segura
+    op.drop_index(INDICE, table_name=TABLA)
+    with op.batch_alter_table(TABLA) as batch_op:
+        batch_op.drop_column('version')
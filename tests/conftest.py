@@ -0,0 +1,144 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime, date, time, timedelta
+
+import pytest
+from sqlalchemy import event
+
+# SQLite en memoria y sin hilos de fondo (antes de importar config)
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+os.environ["PORTERIA_LOTE_SEGUNDOS"] = "0"
+os.environ["ESTADISTICAS_REFRESCO_SEGUNDOS"] = "0"
+os.environ["ACCESO_BARRIDO_SEGUNDOS"] = "0"
+
+from app import create_app
+from app.extensions import db, contadores_cache, indice_qr, cache_usuarios, limiter
+from app.models.colegio import Colegio
+from app.models.docente import Docente
+from app.models.estudiante import Estudiante
+from app.models.jornada import Jornada
+from app.models.permiso import Permiso
+from app.models.sede import Sede
+from app.models.usuario import Usuario
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config.update(
+        TESTING=True,
+        WTF_CSRF_ENABLED=False,
+        RATELIMIT_ENABLED=False
+    )
+    limiter.enabled = False
+    return app
+
+
+@pytest.fixture(autouse=True)
+def base(app):
+    """Esquema nuevo y caches vacías en cada prueba"""
+    with app.app_context():
+        db.create_all()
+        contadores_cache.backend.clear()
+        indice_qr.limpiar()
+        cache_usuarios.limpiar()
+        yield db
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def contar_consultas():
+    """Context manager: lista de sentencias SQL ejecutadas dentro del bloque"""
+
+    @contextmanager
+    def _contar():
+        sentencias = []
+
+        def _anotar(conn, cursor, statement, *args):
+            sentencias.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", _anotar)
+        try:
+            yield sentencias
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _anotar)
+
+    return _contar
+
+
+@pytest.fixture
+def colegio():
+    """
+    Colegio con una sede, una jornada (06:30, 10 min de tolerancia),
+    tres docentes, seis permisos alrededor de hoy, cinco estudiantes
+    (tokens QR0..QR4) y un admin a@a.com.
+    """
+    ahora = datetime.utcnow()
+    nuevo = Colegio(nombre="Colegio de prueba", codigo_acceso="COL-1", activo=True, en_prueba=False)
+    db.session.add(nuevo)
+    db.session.flush()
+
+    db.session.add(Usuario(
+        email="a@a.com",
+        password_hash="x",
+        rol="admin_colegio",
+        colegio_id=nuevo.id,
+        is_active=True,
+        is_approved=True,
+        fecha_registro=ahora,
+        fecha_aprobacion=ahora
+    ))
+
+    sede = Sede(nombre="Sede A", colegio_id=nuevo.id, activo=True)
+    db.session.add(sede)
+    db.session.flush()
+
+    jornada = Jornada(
+        nombre="Mañana",
+        hora_inicio=time(6, 30),
+        hora_fin=time(12),
+        tolerancia_minutos=10,
+        colegio_id=nuevo.id,
+        sede_id=sede.id,
+        activo=True
+    )
+    db.session.add(jornada)
+
+    docentes = [
+        Docente(nombre=f"Docente {i}", documento=f"D{i}", colegio_id=nuevo.id, sede_id=sede.id, activo=True)
+        for i in range(3)
+    ]
+    db.session.add_all(docentes)
+    db.session.flush()
+
+    hoy = date.today()
+    for i in range(6):
+        db.session.add(Permiso(
+            docente_id=docentes[i % 3].id,
+            colegio_id=nuevo.id,
+            fecha_inicio=hoy + timedelta(days=i - 3),
+            fecha_fin=hoy + timedelta(days=i - 2),
+            tipo="Salud"
+        ))
+
+    for i in range(5):
+        db.session.add(Estudiante(
+            nombre=f"Estudiante {i}",
+            grado="6",
+            grupo="A",
+            colegio_id=nuevo.id,
+            docente_id=docentes[0].id,
+            jornada_id=jornada.id,
+            sede_id=sede.id,
+            qr_token=f"QR{i}",
+            activo=True
+        ))
+
+    db.session.commit()
+    return nuevo.id
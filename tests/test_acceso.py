@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models.estado_acceso import ESTADO_ACTIVO, ESTADO_EN_PRUEBA, ESTADO_VENCIDO
+from app.models.usuario import Usuario
+from app.services import acceso_service
+
+
+def _usuario_en_prueba_vencida():
+    ahora = datetime.utcnow()
+    usuario = Usuario(
+        email="prueba@a.com",
+        password_hash="x",
+        rol="docente",
+        is_active=True,
+        is_approved=False,
+        fecha_registro=ahora - timedelta(days=30),
+        fecha_expiracion=ahora - timedelta(days=1)
+    )
+    db.session.add(usuario)
+    db.session.commit()
+
+    # Estado materializado antes del vencimiento: el barrido debe corregirlo
+    db.session.execute(
+        update(Usuario.__table__)
+        .where(Usuario.id == usuario.id)
+        .values(estado_acceso=ESTADO_EN_PRUEBA)
+    )
+    db.session.commit()
+    return usuario.id
+
+
+def _estado(usuario_id):
+    return db.session.execute(
+        Usuario.__table__.select().where(Usuario.id == usuario_id)
+    ).mappings().one()["estado_acceso"]
+
+
+def test_barrido_marca_la_prueba_vencida():
+    usuario_id = _usuario_en_prueba_vencida()
+
+    acceso_service.barrer_estados_acceso()
+
+    assert _estado(usuario_id) == ESTADO_VENCIDO
+
+
+def test_barrido_no_pisa_un_cambio_hecho_despues_de_leer(monkeypatch):
+    usuario_id = _usuario_en_prueba_vencida()
+    original = acceso_service._actualizar_estados
+
+    def _aprobar_en_medio(modelo, cambios):
+        # Otra petición aprueba al usuario entre la lectura y el UPDATE del barrido
+        if modelo is Usuario:
+            db.session.execute(
+                update(Usuario.__table__)
+                .where(Usuario.id == usuario_id)
+                .values(is_approved=True, estado_acceso=ESTADO_ACTIVO, acceso_vence_en=None)
+            )
+        original(modelo, cambios)
+
+    monkeypatch.setattr(acceso_service, "_actualizar_estados", _aprobar_en_medio)
+    acceso_service.barrer_estados_acceso()
+
+    assert _estado(usuario_id) == ESTADO_ACTIVO
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+from app.models.asistencia import Asistencia
+from app.services.asistencia_service import registrar_escaneos, REGISTRADA, INVALIDO
+
+# 09:00 en Bogotá (UTC-5)
+AHORA = datetime(2026, 10, 18, 9)
+
+
+def test_timestamp_fuera_de_la_ventana_es_invalido(colegio):
+    resultados = registrar_escaneos([
+        {"qr_token": "QR0", "timestamp": (AHORA - timedelta(days=2)).isoformat()},
+        {"qr_token": "QR1", "timestamp": (AHORA + timedelta(days=365)).isoformat()},
+        {"qr_token": "QR2", "timestamp": (AHORA - timedelta(days=400)).isoformat()},
+        {"qr_token": "QR3", "timestamp": "2026-10-18T14:05:00Z"},
+        {"qr_token": "QR4", "timestamp": "2026-10-18T15:00:00Z"},
+    ], colegio, registrada_por=1, ahora=AHORA)
+
+    assert [r["resultado"] for r in resultados] == [REGISTRADA, INVALIDO, INVALIDO, REGISTRADA, INVALIDO]
+
+
+def test_created_at_en_utc(colegio):
+    antes = datetime.utcnow()
+    registrar_escaneos([{"qr_token": "QR0"}], colegio, registrada_por=1, ahora=AHORA)
+
+    asistencia = Asistencia.query.one()
+    assert antes <= asistencia.created_at <= datetime.utcnow()
+    assert asistencia.fecha == AHORA.date()
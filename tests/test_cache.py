@@ -0,0 +1,35 @@
+from app.services.cache_service import SQLiteBackend
+
+
+def test_sqlite_poda_respeta_max_entradas(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_entradas=10)
+
+    # TTL creciente: las primeras claves son las que vencen antes. La poda
+    # corre por número de escrituras, así que también con una sola clave
+    for indice in range(backend._poda.cada):
+        backend.set(f"clave:{indice}", indice, 60 + indice)
+
+    assert len(backend) == 10
+    assert backend.get(f"clave:{backend._poda.cada - 1}") == backend._poda.cada - 1
+    assert backend.get("clave:0") is None
+
+
+def test_sqlite_poda_con_pocas_claves(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_entradas=10)
+    backend.set("vencida", 1, -1)
+
+    for _ in range(backend._poda.cada - 1):
+        backend.set("contadores:1", {"total": 1}, 60)
+
+    assert len(backend) == 1
+
+
+def test_sqlite_poda_borra_vencidas(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_entradas=10)
+    backend.set("vencida", 1, -1)
+    backend.set("vigente", 2, 60)
+
+    backend._podar(backend._conexion())
+
+    assert len(backend) == 1
+    assert backend.get("vigente") == 2
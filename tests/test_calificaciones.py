@@ -0,0 +1,97 @@
+from datetime import time
+
+import pytest
+
+from app.extensions import db
+from app.models.clase import Clase, DiaSemana
+from app.models.competencia_materia import CompetenciaMateria
+from app.models.evaluacion_estudiante import EvaluacionEstudiante
+from app.models.indicador_logro import IndicadorLogro
+from app.models.materia import Materia
+from app.models.periodo import Periodo
+from app.services import boletin_service
+from app.services.calificaciones_service import aplicar_cambios, GUARDADA, CONFLICTO, INVALIDA
+
+
+@pytest.fixture
+def matriz(colegio):
+    """Clase de 6A (los cinco estudiantes del colegio) con dos indicadores y un periodo"""
+    materia = Materia(nombre="Matemáticas")
+    db.session.add(materia)
+    db.session.flush()
+
+    competencia = CompetenciaMateria(materia_id=materia.id, nombre="Razonamiento")
+    db.session.add(competencia)
+    db.session.flush()
+
+    indicadores = [
+        IndicadorLogro(competencia_id=competencia.id, descripcion=f"Indicador {i}")
+        for i in range(2)
+    ]
+    clase = Clase(
+        grado="6",
+        grupo="A",
+        materia=materia.nombre,
+        materia_id=materia.id,
+        hora_inicio=time(7),
+        hora_fin=time(8),
+        dia=DiaSemana.LUNES,
+        docente_id=1,
+        colegio_id=colegio
+    )
+    periodo = Periodo(nombre="Primero", anio_lectivo=2026)
+    db.session.add_all([*indicadores, clase, periodo])
+    db.session.commit()
+    return clase, periodo.id, indicadores[0].id
+
+
+def _celda(indicador_id, calificacion, version, estudiante_id=1):
+    return {"estudiante_id": estudiante_id, "indicador_id": indicador_id, "calificacion": calificacion, "version": version}
+
+
+def test_version_vieja_devuelve_el_valor_actual(matriz):
+    clase, periodo_id, indicador_id = matriz
+
+    [primero] = aplicar_cambios(clase, periodo_id, [_celda(indicador_id, 4.5, 0)])
+    assert (primero["resultado"], primero["calificacion"], primero["version"]) == (GUARDADA, 4.5, 1)
+
+    # Otro docente editó la celda leyendo la versión 0
+    [segundo] = aplicar_cambios(clase, periodo_id, [_celda(indicador_id, 2, 0)])
+    assert (segundo["resultado"], segundo["calificacion"], segundo["version"]) == (CONFLICTO, 4.5, 1)
+
+    assert EvaluacionEstudiante.query.one().calificacion == 4.5
+
+
+def test_null_borra_la_nota(matriz):
+    clase, periodo_id, indicador_id = matriz
+    aplicar_cambios(clase, periodo_id, [_celda(indicador_id, "3.7", 0)])
+
+    [resultado] = aplicar_cambios(clase, periodo_id, [_celda(indicador_id, None, 1)])
+
+    assert (resultado["resultado"], resultado["calificacion"], resultado["version"]) == (GUARDADA, None, 2)
+    assert EvaluacionEstudiante.query.one().calificacion is None
+
+
+@pytest.mark.parametrize("calificacion", ["NaN", "nan", "Infinity", "5.01", -1, "abc"])
+def test_nota_fuera_de_escala_es_invalida(matriz, calificacion):
+    clase, periodo_id, indicador_id = matriz
+
+    [resultado] = aplicar_cambios(clase, periodo_id, [_celda(indicador_id, calificacion, 0)])
+
+    assert resultado["resultado"] == INVALIDA
+    assert EvaluacionEstudiante.query.count() == 0
+
+
+def test_periodo_cerrado_responde_409(matriz, client):
+    clase, periodo_id, indicador_id = matriz
+    boletin_service.cerrar_periodo(clase.colegio_id, periodo_id, usuario_id=1)
+    with client.session_transaction() as sesion:
+        sesion["_user_id"] = "1"
+
+    respuesta = client.patch(
+        f"/calificaciones/clases/{clase.id}/periodos/{periodo_id}",
+        json={"cambios": [_celda(indicador_id, 4, 0)]}
+    )
+
+    assert respuesta.status_code == 409
+    assert EvaluacionEstudiante.query.count() == 0
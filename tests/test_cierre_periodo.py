@@ -0,0 +1,23 @@
+from app.extensions import db
+from app.models.cierre_periodo import CierrePeriodo
+from app.models.periodo import Periodo
+from app.services import boletin_service
+
+
+def test_cierre_concurrente_no_da_500(colegio, client, monkeypatch):
+    periodo = Periodo(nombre="Primero", anio_lectivo=2026)
+    db.session.add(periodo)
+    db.session.commit()
+    boletin_service.cerrar_periodo(colegio, periodo.id, usuario_id=1)
+
+    # La otra petición pasó la verificación antes de que este cierre existiera
+    monkeypatch.setattr(boletin_service, "obtener_cierre", lambda *_: None)
+    with client.session_transaction() as sesion:
+        sesion["_user_id"] = "1"
+
+    respuesta = client.post(f"/dashboard/boletines/{periodo.id}/cerrar", follow_redirects=False)
+
+    assert respuesta.status_code == 302
+    with client.session_transaction() as sesion:
+        assert ("warning", "El periodo ya está cerrado") in sesion["_flashes"]
+    assert CierrePeriodo.query.count() == 1
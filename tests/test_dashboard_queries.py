@@ -0,0 +1,62 @@
+from app.extensions import db
+from app.models.estudiante import Estudiante
+from app.services.dashboard_service import obtener_estadisticas_colegio
+
+
+def test_miss_usa_a_lo_sumo_dos_consultas(colegio, contar_consultas):
+    db.session.expunge_all()
+
+    with contar_consultas() as sentencias:
+        estadisticas = obtener_estadisticas_colegio(colegio)
+
+    assert len(sentencias) <= 2
+    assert estadisticas.total_sedes == 1
+    assert estadisticas.total_jornadas == 1
+    assert estadisticas.total_docentes == 3
+    assert estadisticas.total_estudiantes == 5
+    assert estadisticas.total_permisos == 6
+
+
+def test_hit_no_consulta_la_base(colegio, contar_consultas):
+    primera = obtener_estadisticas_colegio(colegio)
+
+    # El colegio ya está en la sesión: el hit no va a la base
+    with contar_consultas() as sentencias:
+        segunda = obtener_estadisticas_colegio(colegio)
+
+    assert sentencias == []
+    assert segunda == primera
+
+
+def test_cambio_en_estudiantes_invalida_la_cache(colegio, contar_consultas):
+    obtener_estadisticas_colegio(colegio)
+
+    db.session.get(Estudiante, 1).activo = False
+    db.session.commit()
+
+    with contar_consultas() as sentencias:
+        estadisticas = obtener_estadisticas_colegio(colegio)
+
+    assert sentencias
+    assert estadisticas.total_estudiantes == 4
+
+
+def test_ruta_dashboard_cuenta_todas_sus_consultas(colegio, client, contar_consultas):
+    with client.session_transaction() as sesion:
+        sesion["_user_id"] = "1"
+    db.session.expunge_all()
+
+    # En frío: usuario de la sesión, colegio con sus conteos y últimos permisos con su docente
+    with contar_consultas() as sentencias:
+        respuesta = client.get("/dashboard/")
+
+    assert respuesta.status_code == 200
+    assert len(sentencias) <= 3
+    assert b"Docente 0" in respuesta.data
+
+    # En caliente: usuario y contadores desde cache, solo los últimos permisos
+    with contar_consultas() as sentencias:
+        assert client.get("/dashboard/").status_code == 200
+
+    assert len(sentencias) == 1
+    assert "permisos" in sentencias[0]
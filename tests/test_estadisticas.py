@@ -0,0 +1,26 @@
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import contadores_cache
+from app.services import estadisticas_service
+from app.services.estadisticas_service import obtener_estadisticas_plataforma, CAMPOS_FOTO
+
+
+def test_rollup_vacio_se_refresca_en_linea(colegio):
+    estadisticas = obtener_estadisticas_plataforma()
+
+    assert estadisticas["actualizado_en"]
+    assert all(estadisticas[campo] is not None for campo in CAMPOS_FOTO)
+
+
+def test_carrera_al_crear_la_foto_devuelve_ceros_sin_cachear(colegio, monkeypatch):
+    def _otro_worker_gano(**_):
+        raise IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+
+    monkeypatch.setattr(estadisticas_service, "refrescar_estadisticas", _otro_worker_gano)
+
+    estadisticas = obtener_estadisticas_plataforma()
+
+    assert estadisticas["actualizado_en"] is None
+    assert all(estadisticas[campo] == 0 for campo in CAMPOS_FOTO)
+    assert estadisticas["nuevos_usuarios"] == 0
+    assert contadores_cache.obtener(estadisticas_service.CLAVE_GLOBAL) is None
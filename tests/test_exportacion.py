@@ -0,0 +1,47 @@
+import io
+
+from openpyxl import load_workbook
+
+from app.extensions import db
+from app.models.estudiante import Estudiante
+from app.services.exportacion_service import generar_csv, generar_xlsx
+
+
+def _renombrar(nombres):
+    for estudiante, nombre in zip(Estudiante.query.order_by(Estudiante.id), nombres):
+        estudiante.nombre = nombre
+    db.session.commit()
+
+
+def test_csv_neutraliza_formulas(colegio):
+    _renombrar(["=HYPERLINK(\"http://x\")", "+SUM(A1)", "-2+3", "@cmd", "Ana"])
+
+    contenido = "".join(generar_csv("estudiantes", colegio))
+
+    for texto in ("'=HYPERLINK", "'+SUM(A1)", "'-2+3", "'@cmd"):
+        assert texto in contenido
+    assert ",Ana," in contenido
+
+
+def test_xlsx_guarda_formulas_como_texto(colegio):
+    _renombrar(["=1+1"])
+
+    libro = load_workbook(io.BytesIO(b"".join(generar_xlsx("estudiantes", colegio))))
+    celdas = {celda.value: celda.data_type for fila in libro.active.iter_rows() for celda in fila}
+
+    assert celdas["=1+1"] == "s"
+
+
+def test_xlsx_grande_se_entrega_en_csv(app, client, colegio, monkeypatch):
+    with client.session_transaction() as sesion:
+        sesion["_user_id"] = "1"
+
+    monkeypatch.setitem(app.config, "EXPORTACION_XLSX_MAX_FILAS", 4)
+    respuesta = client.get("/dashboard/exportar/estudiantes.xlsx?desde=2026-01-01")
+    assert respuesta.status_code == 302
+    assert "/dashboard/exportar/estudiantes.csv?desde=2026-01-01" in respuesta.headers["Location"]
+
+    monkeypatch.setitem(app.config, "EXPORTACION_XLSX_MAX_FILAS", 5)
+    respuesta = client.get("/dashboard/exportar/estudiantes.xlsx")
+    assert respuesta.status_code == 200
+    assert respuesta.content_type.startswith("application/vnd.openxmlformats")
@@ -0,0 +1,37 @@
+import io
+
+from app.models.estudiante import Estudiante
+
+
+def _subir(client, contenido, nombre="estudiantes.csv", **formulario):
+    with client.session_transaction() as sesion:
+        sesion["_user_id"] = "1"
+    return client.post(
+        "/estudiantes/importar",
+        data={"archivo": (io.BytesIO(contenido), nombre), **formulario},
+        content_type="multipart/form-data"
+    )
+
+
+def _avisos(client):
+    with client.session_transaction() as sesion:
+        return sesion.get("_flashes", [])
+
+
+def test_importar_estudiantes_por_el_flujo_compartido(colegio, client):
+    respuesta = _subir(
+        client,
+        "nombre,grado,grupo\nNueva Estudiante,7,B\n".encode(),
+        sede_id="1", jornada_id="1", docente_id="1"
+    )
+
+    assert respuesta.status_code == 200
+    assert Estudiante.query.filter_by(nombre="Nueva Estudiante").count() == 1
+
+
+def test_excel_ilegible_vuelve_al_formulario_con_aviso(colegio, client):
+    respuesta = _subir(client, b"no es un zip", nombre="estudiantes.xlsx")
+
+    assert respuesta.status_code == 302
+    assert respuesta.headers["Location"].endswith("/estudiantes/importar")
+    assert ("danger", "No se pudo leer el archivo Excel") in _avisos(client)
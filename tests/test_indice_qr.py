@@ -0,0 +1,39 @@
+from app.extensions import db, indice_qr
+from app.models.estudiante import Estudiante
+
+
+def _revocar_en_otro_worker(colegio_id, estudiante_id):
+    """Cambia el token y deja en memoria el índice viejo, como lo vería otro worker"""
+    viejo = indice_qr._indices[colegio_id]
+    db.session.get(Estudiante, estudiante_id).generar_qr_token()
+    db.session.commit()
+    indice_qr._indices[colegio_id] = viejo
+
+
+def test_token_revocado_en_otro_worker_deja_de_resolver(colegio, monkeypatch):
+    monkeypatch.setattr(indice_qr, "verificacion", 0)
+    assert indice_qr.resolver("QR1", colegio).estudiante_id == 2
+
+    _revocar_en_otro_worker(colegio, 2)
+
+    assert indice_qr.resolver("QR1", colegio) is None
+
+
+def test_dentro_de_la_ventana_no_consulta_la_base(colegio, monkeypatch, contar_consultas):
+    monkeypatch.setattr(indice_qr, "verificacion", 60)
+    indice_qr.resolver("QR1", colegio)
+
+    with contar_consultas() as sentencias:
+        assert indice_qr.resolver_varios({"QR1", "QR2"}, colegio).keys() == {"QR1", "QR2"}
+
+    assert sentencias == []
+
+
+def test_sin_cambios_la_verificacion_es_una_consulta(colegio, monkeypatch, contar_consultas):
+    monkeypatch.setattr(indice_qr, "verificacion", 0)
+    indice_qr.resolver("QR1", colegio)
+
+    with contar_consultas() as sentencias:
+        assert indice_qr.resolver("QR2", colegio) is not None
+
+    assert len(sentencias) == 1 and "versiones_roster" in sentencias[0]
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.docente import Docente
+from app.models.estudiante import Estudiante
+from app.models.permiso import Permiso
+
+# (índice esperado, consulta caliente) — mismos filtros y ORDER BY que las rutas
+CONSULTAS = {
+    "ix_permisos_colegio_fecha_inicio": lambda: (
+        # permiso_routes.listado (página más reciente primero)
+        select(Permiso)
+        .where(Permiso.colegio_id == 1)
+        .order_by(Permiso.fecha_inicio.desc(), Permiso.id.desc())
+        .limit(20)
+    ),
+    "ix_permisos_docente_fecha_inicio": lambda: (
+        # docente_routes.ver
+        select(Permiso)
+        .where(Permiso.docente_id == 1)
+        .order_by(Permiso.fecha_inicio.desc())
+    ),
+    "ix_estudiantes_colegio_activo_nombre": lambda: (
+        # estudiantes_routes.listar (página de activos)
+        select(Estudiante)
+        .where(Estudiante.colegio_id == 1, Estudiante.activo.is_(True))
+        .order_by(Estudiante.nombre, Estudiante.id)
+        .limit(20)
+    ),
+    "ix_docentes_colegio_nombre": lambda: (
+        # docente_routes.listar (paginado por nombre, id)
+        select(Docente)
+        .where(Docente.colegio_id == 1)
+        .order_by(Docente.nombre, Docente.id)
+        .limit(20)
+    ),
+}
+
+
+def _plan(consulta):
+    sql = consulta.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    filas = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return "\n".join(fila[-1] for fila in filas)
+
+
+@pytest.mark.parametrize("indice", CONSULTAS)
+def test_consulta_caliente_usa_su_indice(colegio, indice):
+    plan = _plan(CONSULTAS[indice]())
+
+    assert f"USING INDEX {indice}" in plan or f"USING COVERING INDEX {indice}" in plan, plan
+    assert "TEMP B-TREE FOR ORDER BY" not in plan, plan
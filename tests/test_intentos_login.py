@@ -0,0 +1,217 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from app.extensions import db
+from app.models.usuario import Usuario
+from app.services.auth_service import login_usuario, MAX_INTENTOS, MENSAJE_IP_BLOQUEADA
+from app.services.hash_service import hasher_contrasenas
+from app.services import intentos_service
+from app.services.intentos_service import contador_intentos, MemoriaIntentos, SQLiteIntentos
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONTRASENA = "clave-correcta"
+METODO_RAPIDO = "pbkdf2:sha256:1000"
+
+
+@pytest.fixture(autouse=True)
+def contador_limpio(monkeypatch):
+    """Contador en memoria nuevo y hash barato (sin rehash al ingresar)"""
+    monkeypatch.setattr(contador_intentos, "backend", MemoriaIntentos())
+    monkeypatch.setattr(contador_intentos, "max_ip", 50)
+
+    metodo, hilos, espera = hasher_contrasenas.metodo, hasher_contrasenas.hilos, hasher_contrasenas.espera
+    hasher_contrasenas.configurar(METODO_RAPIDO, 1, 10)
+    yield
+    hasher_contrasenas.configurar(metodo, hilos, espera)
+
+
+@pytest.fixture
+def usuario(colegio):
+    usuario = Usuario.query.filter_by(email="a@a.com").one()
+    usuario.password_hash = hasher_contrasenas.generar(CONTRASENA)
+    db.session.commit()
+    return usuario
+
+
+def _escrituras(sentencias):
+    return [s for s in sentencias if s.lstrip().upper().startswith(("UPDATE", "INSERT", "DELETE"))]
+
+
+def test_fallos_no_escriben_hasta_bloquear(usuario, contar_consultas):
+    with contar_consultas() as sentencias:
+        for _ in range(MAX_INTENTOS - 1):
+            assert login_usuario("a@a.com", "mala", ip="10.0.0.1") == (False, "Credenciales inválidas")
+
+    assert _escrituras(sentencias) == []
+
+    with contar_consultas() as sentencias:
+        ok, mensaje = login_usuario("a@a.com", "mala", ip="10.0.0.1")
+
+    assert not ok and "bloqueado" in mensaje
+    escrituras = _escrituras(sentencias)
+    assert len(escrituras) == 1 and escrituras[0].lstrip().upper().startswith("UPDATE USUARIOS")
+
+    db.session.refresh(usuario)
+    assert usuario.failed_attempts == MAX_INTENTOS
+    assert usuario.locked_until is not None
+
+
+def test_login_exitoso_limpio_no_escribe(usuario, contar_consultas):
+    with contar_consultas() as sentencias:
+        ok, resultado = login_usuario("a@a.com", CONTRASENA, ip="10.0.0.1")
+
+    assert ok and resultado.id == usuario.id
+    assert _escrituras(sentencias) == []
+
+
+def test_login_exitoso_desbloquea_con_una_escritura(usuario, contar_consultas):
+    login_usuario("a@a.com", "mala", ip="10.0.0.1")
+    usuario.failed_attempts = 2
+    db.session.commit()
+
+    with contar_consultas() as sentencias:
+        ok, _ = login_usuario("a@a.com", CONTRASENA, ip="10.0.0.1")
+
+    assert ok
+    assert len(_escrituras(sentencias)) == 1
+    assert contador_intentos.backend.contar("email:a@a.com", contador_intentos.ventana) == 0
+
+
+def test_ip_sobre_el_limite_no_consulta_la_base(usuario, monkeypatch, contar_consultas):
+    monkeypatch.setattr(contador_intentos, "max_ip", 3)
+
+    # Correos distintos: el bloqueo por correo no interviene
+    for indice in range(3):
+        login_usuario(f"otro{indice}@a.com", "mala", ip="10.0.0.9")
+
+    with contar_consultas() as sentencias:
+        resultado = login_usuario("a@a.com", CONTRASENA, ip="10.0.0.9")
+
+    assert resultado == (False, MENSAJE_IP_BLOQUEADA)
+    assert sentencias == []
+
+    # Otra IP sigue entrando
+    assert login_usuario("a@a.com", CONTRASENA, ip="10.0.0.10")[0]
+
+
+def test_ip_bloqueada_no_cuenta_contra_el_correo(usuario, monkeypatch):
+    monkeypatch.setattr(contador_intentos, "max_ip", 1)
+    login_usuario("a@a.com", "mala", ip="10.0.0.9")
+
+    for _ in range(MAX_INTENTOS):
+        login_usuario("a@a.com", "mala", ip="10.0.0.9")
+
+    db.session.refresh(usuario)
+    assert usuario.locked_until is None
+    assert contador_intentos.backend.contar("email:a@a.com", contador_intentos.ventana) == 1
+
+
+def test_sqlite_cuenta_entre_procesos(tmp_path):
+    ruta = str(tmp_path / "intentos.sqlite3")
+    codigo = textwrap.dedent(f"""
+        from app.services.intentos_service import SQLiteIntentos
+        backend = SQLiteIntentos({ruta!r})
+        for _ in range(20):
+            backend.registrar("email:a@a.com", 900, 100)
+    """)
+
+    procesos = [
+        subprocess.Popen([sys.executable, "-c", codigo], cwd=RAIZ)
+        for _ in range(2)
+    ]
+    assert [proceso.wait(timeout=60) for proceso in procesos] == [0, 0]
+
+    assert SQLiteIntentos(ruta).contar("email:a@a.com", 900) == 40
+
+
+def test_ip_del_cliente_detras_del_proxy(usuario, client, monkeypatch):
+    monkeypatch.setattr(contador_intentos, "max_ip", 3)
+
+    # Mismo proxy (REMOTE_ADDR), clientes distintos en X-Forwarded-For
+    for _ in range(3):
+        client.post(
+            "/login",
+            data={"email": "a@a.com", "password": "mala"},
+            headers={"X-Forwarded-For": "203.0.113.7"},
+            environ_base={"REMOTE_ADDR": "10.0.0.1"}
+        )
+
+    assert contador_intentos.ip_bloqueada("203.0.113.7")
+    assert not contador_intentos.ip_bloqueada("10.0.0.1")
+
+    respuesta = client.post(
+        "/login",
+        data={"email": "a@a.com", "password": CONTRASENA},
+        headers={"X-Forwarded-For": "198.51.100.4"},
+        environ_base={"REMOTE_ADDR": "10.0.0.1"}
+    )
+    assert respuesta.status_code == 302
+
+
+class RelojFalso:
+    """Reemplaza el módulo time de intentos_service: avanza solo cuando se pide"""
+
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def monotonic(self):
+        return self.ahora
+
+    def time(self):
+        return self.ahora
+
+
+@pytest.mark.parametrize("nombre", ["memoria", "sqlite"])
+def test_ventana_deslizante_con_miles_de_intentos(nombre, tmp_path, monkeypatch):
+    reloj = RelojFalso()
+    monkeypatch.setattr(intentos_service, "time", reloj)
+    backend = MemoriaIntentos() if nombre == "memoria" else SQLiteIntentos(str(tmp_path / "i.sqlite3"))
+
+    # Un intento por segundo durante 5000 s con ventana de 900 s
+    for segundo in range(5000):
+        fallos = backend.registrar("email:a@a.com", 900, 2000)
+        assert fallos == min(segundo + 1, 900)
+        reloj.ahora += 1
+
+    # Sin intentos nuevos la ventana se vacía sola
+    reloj.ahora += 900
+    assert backend.contar("email:a@a.com", 900) == 0
+
+
+def test_relleno_de_credenciales_desde_una_ip(usuario, monkeypatch):
+    """Miles de correos distintos desde una IP: la IP se corta, nadie queda bloqueado"""
+    monkeypatch.setattr(contador_intentos, "max_ip", 50)
+
+    resultados = [
+        login_usuario(f"victima{indice}@a.com", "mala", ip="10.0.0.66")
+        for indice in range(3000)
+    ]
+
+    assert resultados.count((False, "Credenciales inválidas")) == 50
+    assert resultados.count((False, MENSAJE_IP_BLOQUEADA)) == 2950
+    assert contador_intentos.backend.contar("email:victima0@a.com", contador_intentos.ventana) == 1
+
+    # El dueño real entra desde otra red
+    assert login_usuario("a@a.com", CONTRASENA, ip="10.0.0.67")[0]
+
+
+def test_ataque_repartido_contra_un_correo(usuario, contar_consultas):
+    """Miles de IPs contra un correo: se bloquea tras MAX_INTENTOS y no se escribe más"""
+    with contar_consultas() as sentencias:
+        mensajes = [
+            login_usuario("a@a.com", "mala", ip=f"10.1.{indice // 250}.{indice % 250}")[1]
+            for indice in range(2000)
+        ]
+
+    assert mensajes[:MAX_INTENTOS - 1] == ["Credenciales inválidas"] * (MAX_INTENTOS - 1)
+    assert "bloqueado" in mensajes[MAX_INTENTOS - 1]
+    assert all(mensaje.startswith("Usuario bloqueado") for mensaje in mensajes[MAX_INTENTOS:])
+    assert len(_escrituras(sentencias)) == 1
+
+    # Ninguna de esas IPs acumuló fallos suficientes para cortarse
+    assert not contador_intentos.ip_bloqueada("10.1.0.0")
@@ -0,0 +1,38 @@
+import pytest
+
+from app.extensions import limiter
+from app.services.intentos_service import contador_intentos, MemoriaIntentos
+
+
+@pytest.fixture
+def limites_activos(monkeypatch):
+    """Rate limit encendido con contadores vacíos (el storage es un archivo compartido)"""
+    monkeypatch.setattr(contador_intentos, "backend", MemoriaIntentos())
+    limiter.reset()
+    limiter.enabled = True
+    yield
+    limiter.enabled = False
+    limiter.reset()
+
+
+def _login(client, email):
+    return client.post(
+        "/login",
+        data={"email": email, "password": "mala"},
+        headers={"X-Forwarded-For": "203.0.113.20"}
+    )
+
+
+def test_docentes_tras_la_misma_ip_no_se_frenan(client, limites_activos):
+    # Entrada de las 7am: muchos docentes del mismo colegio (misma IP por NAT)
+    codigos = [_login(client, f"docente{indice}@colegio.edu").status_code for indice in range(30)]
+
+    # El límite excedido redirige al login con un aviso (auth_routes.handle_rate_limit)
+    assert codigos == [200] * 30
+
+
+def test_mismo_correo_y_misma_ip_se_limita(client, limites_activos):
+    codigos = [_login(client, "docente@colegio.edu").status_code for _ in range(11)]
+
+    assert codigos[:10] == [200] * 10
+    assert codigos[10] == 302
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app.routes import colegio_routes, docente_routes, estudiantes_routes, permiso_routes
+
+# (módulo de la ruta, URL, variable de la plantilla, relación que el listado no carga)
+LISTADOS = [
+    (estudiantes_routes, "/estudiantes/", "estudiantes", "jornada"),
+    (docente_routes, "/docentes/", "docentes", "clases"),
+    (colegio_routes, "/dashboard/docentes", "docentes", "permisos"),
+    (permiso_routes, "/dashboard/permisos/", "docentes", "clases"),
+]
+
+
+@pytest.mark.parametrize("modulo, url, variable, relacion", LISTADOS)
+def test_relacion_no_cargada_falla_en_el_listado(colegio, client, monkeypatch, modulo, url, variable, relacion):
+    errores = []
+
+    def _plantilla(_, **contexto):
+        # Lo que haría una plantilla que recorre el listado y toca otra relación
+        filas = contexto[variable]
+        assert filas
+        try:
+            getattr(filas[0], relacion)
+        except InvalidRequestError as error:
+            errores.append(error)
+        return ""
+
+    monkeypatch.setattr(modulo, "render_template", _plantilla)
+    with client.session_transaction() as sesion:
+        sesion["_user_id"] = "1"
+
+    assert client.get(url).status_code == 200
+    assert len(errores) == 1
+    assert "lazy='raise'" in str(errores[0])
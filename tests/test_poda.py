@@ -0,0 +1,19 @@
+from app.utils import poda
+from app.utils.poda import PodaPeriodica
+
+
+def test_poda_cada_n_escrituras():
+    periodica = PodaPeriodica(cada=5, segundos=3600)
+
+    assert [periodica.toca() for _ in range(15)] == ([False] * 4 + [True]) * 3
+
+
+def test_poda_por_tiempo(monkeypatch):
+    reloj = [100.0]
+    monkeypatch.setattr(poda.time, "monotonic", lambda: reloj[0])
+    periodica = PodaPeriodica(cada=1000, segundos=60)
+
+    assert not periodica.toca()
+    reloj[0] += 61
+    assert periodica.toca()
+    assert not periodica.toca()
@@ -0,0 +1,50 @@
+import json
+import os
+
+import pytest
+
+from app.models.ingreso_colegio import IngresoColegio
+from app.services import asistencia_service
+from app.services.porteria_service import buffer_porteria, encolar_eventos, ENCOLADO
+from app.utils.fechas import ahora_local
+
+
+@pytest.fixture(autouse=True)
+def buffer_vacio(tmp_path):
+    maximo, segundos, respaldo = buffer_porteria.maximo, buffer_porteria.segundos, buffer_porteria.respaldo
+    buffer_porteria.configurar(200, 0, str(tmp_path / "respaldo"))
+    yield buffer_porteria
+    buffer_porteria.vaciar()
+    buffer_porteria.configurar(maximo, segundos, respaldo)
+
+
+def test_timestamp_ilegible_se_rechaza_al_encolar(colegio):
+    resultados = encolar_eventos([
+        {"qr_token": "QR0", "tipo": "ingreso", "timestamp": "ayer a las 7"},
+        {"qr_token": "QR1", "tipo": "ingreso", "timestamp": ahora_local().isoformat()},
+        {"qr_token": "QR2", "tipo": "ingreso"},
+    ], colegio)
+
+    assert [r["resultado"] for r in resultados] == [asistencia_service.INVALIDO, ENCOLADO, ENCOLADO]
+    assert buffer_porteria.metricas()["pendientes"] == 2
+
+    assert buffer_porteria.vaciar() == 2
+    assert {i.estudiante_id for i in IngresoColegio.query} == {2, 3}
+
+
+def test_linea_corrupta_del_respaldo_va_a_cuarentena(colegio, buffer_vacio):
+    os.makedirs(buffer_vacio.respaldo)
+    evento = {"qr_token": "QR0", "tipo": "ingreso", "timestamp": ahora_local().isoformat(), "metodo": "QR"}
+    with open(os.path.join(buffer_vacio.respaldo, "porteria-1.jsonl"), "w", encoding="utf-8") as archivo:
+        archivo.write(json.dumps({"colegio_id": colegio, "evento": evento}) + "\n")
+        archivo.write('{"colegio_id": 1, "evento": {"qr_tok')
+
+    assert buffer_vacio.reprocesar_respaldo() == 1
+    assert IngresoColegio.query.count() == 1
+    assert os.listdir(buffer_vacio.respaldo) == ["cuarentena.jsonl"]
+
+    with open(os.path.join(buffer_vacio.respaldo, "cuarentena.jsonl"), encoding="utf-8") as archivo:
+        assert archivo.read() == '{"colegio_id": 1, "evento": {"qr_tok\n'
+
+    # El siguiente barrido no vuelve a tocar la cuarentena
+    assert buffer_vacio.reprocesar_respaldo() == 0